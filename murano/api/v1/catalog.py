@@ -14,9 +14,9 @@
 #    under the License.
 
 import cgi
-import jsonschema
 import os
-import tempfile
+
+import jsonschema
 
 from oslo.config import cfg
 from oslo.db import exception as db_exc
@@ -25,11 +25,13 @@ from webob import exc
 import murano.api.v1
 from murano.api.v1 import schemas
 from murano.common import policy
+from murano.common import process_pool
 from murano.common import wsgi
 from murano.db.catalog import api as db_api
 from murano.openstack.common import exception
 from murano.openstack.common.gettextutils import _
 from murano.openstack.common import log as logging
+from murano.packages import compiled_classes
 from murano.packages import exceptions as pkg_exc
 from murano.packages import load_utils
 
@@ -42,6 +44,44 @@ LIST_PARAMS = murano.api.v1.LIST_PARAMS
 ORDER_VALUES = murano.api.v1.ORDER_VALUES
 PKG_PARAMS_MAP = murano.api.v1.PKG_PARAMS_MAP
 
+VALIDATION_POOL = None
+
+
+def get_validation_pool():
+    global VALIDATION_POOL
+
+    workers = CONF.packages_opts.package_validation_workers
+    if VALIDATION_POOL is None and workers > 0 and hasattr(os, 'fork'):
+        VALIDATION_POOL = process_pool.ProcessPool(workers)
+    return VALIDATION_POOL
+
+
+def _load_package_meta(content):
+    """Validate the package archive and return its catalog fields.
+
+    Any validation error is raised as PackageLoadError with the message of
+    the error only, so that it can be passed back from the validation
+    process whatever the original error was.
+    """
+    try:
+        package = load_utils.load_from_archive(content)
+        package_meta = {}
+        for k, v in PKG_PARAMS_MAP.iteritems():
+            if hasattr(package, k):
+                package_meta[v] = getattr(package, k)
+    except Exception as e:
+        raise pkg_exc.PackageLoadError(str(e))
+
+    try:
+        package_meta['compiled_classes'] = \
+            compiled_classes.compile_package(package)
+    except Exception:
+        # the engine parses class files itself when there is no
+        # pre-parsed form of the classes
+        LOG.exception(_('Unable to compile classes of package '
+                        '{0}').format(package.full_name))
+    return package_meta
+
 
 def _check_content_type(req, content_type):
     try:
@@ -180,6 +220,26 @@ class Controller(object):
         result['packages'] = [package.to_dict() for package in packages]
         return result
 
+    def resolve_classes(self, req, body):
+        """Resolve packages for a list of class names in one request.
+
+           Request body: {"class_names": ["com.example.Foo", ...]}
+           Classes that have no package visible to the tenant are omitted
+           from the result.
+        """
+        policy.check("search_packages", req.context)
+
+        class_names = body.get('class_names') if isinstance(
+            body, dict) else None
+        if not isinstance(class_names, list) or not all(
+                isinstance(name, basestring) for name in class_names):
+            msg = _("'class_names' must be a list of class names")
+            LOG.error(msg)
+            raise exc.HTTPBadRequest(explanation=msg)
+
+        classes = db_api.package_resolve_classes(class_names, req.context)
+        return {'classes': classes}
+
     def upload(self, req, body=None):
         """Upload new file archive for the new package
            together with package metadata.
@@ -197,29 +257,27 @@ class Controller(object):
         else:
             package_meta = {}
 
-        with tempfile.NamedTemporaryFile(delete=False) as tempf:
-            LOG.debug("Storing package archive in a temporary file")
-            content = file_obj.file.read()
-            if not content:
-                msg = _("Uploading file can't be empty")
-                LOG.error(msg)
-                raise exc.HTTPBadRequest(msg)
-            tempf.write(content)
-            package_meta['archive'] = content
+        content = file_obj.file.read()
+        if not content:
+            msg = _("Uploading file can't be empty")
+            LOG.error(msg)
+            raise exc.HTTPBadRequest(msg)
+        package_meta['archive'] = content
+        pool = get_validation_pool()
         try:
-            pkg_to_upload = load_utils.load_from_file(
-                tempf.name, target_dir=None, drop_dir=True)
+            if pool is None:
+                pkg_meta = _load_package_meta(content)
+            else:
+                if pool.waiting:
+                    LOG.debug('{0} packages wait for validation'.format(
+                        pool.waiting))
+                pkg_meta = pool.execute(_load_package_meta, content)
         except pkg_exc.PackageLoadError as e:
             LOG.exception(e)
             raise exc.HTTPBadRequest(e)
-        finally:
-            LOG.debug("Deleting package archive temporary file")
-            os.remove(tempf.name)
 
         # extend dictionary for update db
-        for k, v in PKG_PARAMS_MAP.iteritems():
-            if hasattr(pkg_to_upload, k):
-                package_meta[v] = getattr(pkg_to_upload, k)
+        package_meta.update(pkg_meta)
 
         if req.params.get('is_public', '').lower() == 'true':
             policy.check('publicize_image', req.context)
@@ -237,27 +295,44 @@ class Controller(object):
         target = {'package_id': package_id}
         policy.check("get_package_ui", req.context, target)
 
-        package = db_api.package_get(package_id, req.context)
+        package = db_api.package_get(package_id, req.context,
+                                     undefer=['ui_definition'])
         return package.ui_definition
 
     def get_logo(self, req, package_id):
         target = {'package_id': package_id}
         policy.check("get_package_logo", req.context, target)
 
-        package = db_api.package_get(package_id, req.context)
+        package = db_api.package_get(package_id, req.context,
+                                     undefer=['logo'])
         return package.logo
 
     def get_supplier_logo(self, req, package_id):
-        package = db_api.package_get(package_id, req.context)
+        package = db_api.package_get(package_id, req.context,
+                                     undefer=['supplier_logo'])
         return package.supplier_logo
 
     def download(self, req, package_id):
         target = {'package_id': package_id}
         policy.check("download_package", req.context, target)
 
-        package = db_api.package_get(package_id, req.context)
+        package = db_api.package_get(package_id, req.context,
+                                     undefer=['archive'])
         return package.archive
 
+    def get_compiled_classes(self, req, package_id):
+        target = {'package_id': package_id}
+        policy.check("download_package", req.context, target)
+
+        package = db_api.package_get(package_id, req.context,
+                                     undefer=['compiled_classes'])
+        if package.compiled_classes is None:
+            msg = _("Package '{0}' has no compiled classes").format(
+                package_id)
+            LOG.error(msg)
+            raise exc.HTTPNotFound(msg)
+        return package.compiled_classes
+
     def delete(self, req, package_id):
         target = {'package_id': package_id}
         policy.check("delete_package", req.context, target)
@@ -275,7 +350,8 @@ class PackageSerializer(wsgi.ResponseSerializer):
     def serialize(self, action_result, accept, action):
         if action == 'get_ui':
             accept = 'text/plain'
-        elif action in ('download', 'get_logo', 'get_supplier_logo'):
+        elif action in ('download', 'get_logo', 'get_supplier_logo',
+                        'get_compiled_classes'):
             accept = 'application/octet-stream'
         return super(PackageSerializer, self).serialize(action_result,
                                                         accept,
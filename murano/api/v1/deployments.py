@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 from sqlalchemy import desc
+from sqlalchemy import orm as sa_orm
 from webob import exc
 
 from murano.api.v1 import request_statistics
@@ -21,6 +22,7 @@ from murano.common import utils
 from murano.common import wsgi
 from murano.db import models
 from murano.db import session as db_session
+from murano.db import snapshots
 
 from murano.openstack.common.gettextutils import _
 from murano.openstack.common import log as logging
@@ -36,17 +38,33 @@ class Controller(object):
         target = {"environment_id": environment_id}
         policy.check("list_deployments", request.context, target)
 
+        include_description = request.GET.get(
+            'include_description', '').lower() == 'true'
+
         unit = db_session.get_session()
         verify_and_get_env(unit, environment_id, request)
+
         query = unit.query(models.Task) \
             .filter_by(environment_id=environment_id) \
             .order_by(desc(models.Task.created))
-        result = query.all()
+        if not include_description:
+            query = query.options(sa_orm.defer(models.Task.snapshot))
+
         # show only tasks with 'deploy' action
-        result = [task for task in result
-                  if (task.action or {}).get('method', 'deploy') == 'deploy']
-        deployments = [set_dep_state(deployment, unit).to_dict() for deployment
-                       in result]
+        tasks = [task for task in query
+                 if (task.action or {}).get('method', 'deploy') == 'deploy']
+        if include_description:
+            # objects shared by the deployments are loaded once
+            descriptions = snapshots.load(
+                unit, [task.snapshot for task in tasks])
+        deployments = []
+        for i, task in enumerate(tasks):
+            deployment = task.to_dict()
+            deployment['state'] = _get_state(task)
+            if include_description:
+                deployment['description'] = _patch_description(
+                    descriptions[i])
+            deployments.append(deployment)
         return {'deployments': deployments}
 
     @request_statistics.stats_count(API_NAME, 'Statuses')
@@ -64,7 +82,7 @@ class Controller(object):
 
         if 'service_id' in request.GET:
             service_id_set = set(request.GET.getall('service_id'))
-            environment = deployment.description
+            environment = _patch_description(deployment.description)
             entity_ids = []
             for service in environment.get('services', []):
                 if service['?']['id'] in service_id_set:
@@ -106,8 +124,6 @@ def verify_and_get_deployment(db_session, environment_id, deployment_id):
                    ' in environment {1}').format(deployment_id,
                                                  environment_id))
         raise exc.HTTPBadRequest
-
-    deployment.description = _patch_description(deployment.description)
     return deployment
 
 
@@ -115,29 +131,15 @@ def create_resource():
     return wsgi.Resource(Controller())
 
 
-def set_dep_state(deployment, unit):
-    num_errors = unit.query(models.Status).filter_by(
-        level='error',
-        task_id=deployment.id).count()
-
-    num_warnings = unit.query(models.Status).filter_by(
-        level='warning',
-        task_id=deployment.id).count()
-
+def _get_state(deployment):
     if deployment.finished:
-        if num_errors:
-            deployment.state = 'completed_w_errors'
-        elif num_warnings:
-            deployment.state = 'completed_w_warnings'
-        else:
-            deployment.state = 'success'
-    else:
-        if num_errors:
-            deployment.state = 'running_w_errors'
-        elif num_warnings:
-            deployment.state = 'running_w_warnings'
-        else:
-            deployment.state = 'running'
-
-    deployment.description = _patch_description(deployment.description)
-    return deployment
+        if deployment.error_count:
+            return 'completed_w_errors'
+        elif deployment.warning_count:
+            return 'completed_w_warnings'
+        return 'success'
+    if deployment.error_count:
+        return 'running_w_errors'
+    elif deployment.warning_count:
+        return 'running_w_warnings'
+    return 'running'
@@ -153,6 +153,10 @@ class API(wsgi.Router):
                        controller=catalog_resource,
                        action='show_categories',
                        conditions={'method': ['GET']})
+        mapper.connect('/catalog/packages/resolve',
+                       controller=catalog_resource,
+                       action='resolve_classes',
+                       conditions={'method': ['POST']})
         mapper.connect('/catalog/packages/{package_id}',
                        controller=catalog_resource,
                        action='get',
@@ -185,6 +189,10 @@ class API(wsgi.Router):
                        controller=catalog_resource,
                        action='get_supplier_logo',
                        conditions={'method': ['GET']})
+        mapper.connect('/catalog/packages/{package_id}/classes',
+                       controller=catalog_resource,
+                       action='get_compiled_classes',
+                       conditions={'method': ['GET']})
         mapper.connect('/catalog/packages/{package_id}/download',
                        controller=catalog_resource,
                        action='download',
@@ -36,6 +36,7 @@ from murano.common import config
 from murano.common import policy
 from murano.common import server
 from murano.common import statservice as stats
+from murano.common import worker_service
 from murano.common import wsgi
 from murano.openstack.common import log
 from murano.openstack.common import service
@@ -48,15 +49,28 @@ def main():
         request_statistics.init_stats()
         policy.init()
 
-        launcher = service.ServiceLauncher()
-
         app = config.load_paste_app('murano')
         port, host = (config.CONF.bind_port, config.CONF.bind_host)
+        api_service = wsgi.Service(app, port, host)
 
-        launcher.launch_service(wsgi.Service(app, port, host))
-        launcher.launch_service(server.get_rpc_service())
-        launcher.launch_service(server.get_notification_service())
-        launcher.launch_service(stats.StatsCollectingService())
+        workers = config.CONF.api_workers
+        if workers > 1:
+            # the socket is bound before forking to be shared by workers
+            api_service.listen()
+            launcher = service.ProcessLauncher()
+            launcher.launch_service(
+                worker_service.WorkerService(
+                    workers, lambda slot: [
+                        api_service, stats.StatsCollectingService(slot)]),
+                workers=workers)
+            launcher.launch_service(server.get_worker_service())
+        else:
+            launcher = service.ServiceLauncher()
+            launcher.launch_service(api_service)
+            launcher.launch_service(server.get_rpc_service())
+            launcher.launch_service(server.get_notification_service())
+            launcher.launch_service(server.get_status_buffer())
+            launcher.launch_service(stats.StatsCollectingService())
 
         launcher.wait()
     except RuntimeError as e:
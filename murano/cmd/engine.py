@@ -44,8 +44,16 @@ def main():
         config.parse_args()
         log.setup('murano')
 
-        launcher = service.ServiceLauncher()
-        launcher.launch_service(engine.get_rpc_service())
+        engine.preload_packages()
+
+        workers = config.CONF.engine.workers
+        if workers > 1:
+            launcher = service.ProcessLauncher()
+            launcher.launch_service(engine.get_worker_service(workers),
+                                    workers=workers)
+        else:
+            launcher = service.ServiceLauncher()
+            launcher.launch_service(engine.get_rpc_service())
 
         launcher.wait()
     except RuntimeError as e:
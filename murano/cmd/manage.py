@@ -27,6 +27,7 @@ from oslo.db import exception as db_exception
 from murano.common import consts
 from murano.db.catalog import api as db_catalog_api
 from murano.openstack.common import log as logging
+from murano.packages import compiled_classes
 from murano.packages import load_utils
 from murano import version
 
@@ -76,6 +77,11 @@ def _do_import_package(_dir, categories, update=False):
         'archive': pkg.blob,
         'categories': categories or []
     }
+    try:
+        package['compiled_classes'] = compiled_classes.compile_package(pkg)
+    except Exception:
+        LOG.exception("Unable to compile classes of package {0}".format(
+            pkg.full_name))
 
     # note(ruhe): the second parameter is tenant_id
     # it is a required field in the DB, that's why we pass an empty string
@@ -40,6 +40,13 @@ bind_opts = [
                help='Port the bind the Murano API server to.'),
 ]
 
+api_opts = [
+    cfg.IntOpt('api_workers', default=1,
+               help='Number of Murano API worker processes. With more than '
+                    'one worker the engine results and notifications are '
+                    'consumed in a separate process.'),
+]
+
 rabbit_opts = [
     cfg.StrOpt('host', default='localhost',
                help='The RabbitMQ broker address which used for communication '
@@ -190,7 +197,51 @@ engine_opts = [
                help=_('Path to class configuration files')),
     cfg.BoolOpt('use_trusts', default=False,
                 help=_("Create resources using trust token rather "
-                       "than user's token"))
+                       "than user's token")),
+    cfg.BoolOpt('inline_method_calls', default=True,
+                help=_('Execute MuranoPL method calls in the calling green '
+                       'thread instead of spawning a new green thread for '
+                       'each call')),
+    cfg.IntOpt('packages_prefetch_pool_size', default=8,
+               help=_('Number of packages downloaded concurrently when '
+                      'prefetching packages for the object model before '
+                      'execution. Set to 0 to disable prefetching')),
+    cfg.ListOpt('load_packages_from', default=[],
+                help=_('List of directories to load local packages from. '
+                       'Local packages are loaded and compiled when the '
+                       'engine starts, are kept in memory and take '
+                       'precedence over packages from the catalog')),
+    cfg.ListOpt('preload_packages', default=[],
+                help=_('Fully qualified names of catalog packages to load '
+                       'and compile when the engine starts. Preloaded '
+                       'packages are never evicted from the package cache')),
+    cfg.IntOpt('workers', default=1,
+               help=_('Number of engine worker processes')),
+    cfg.BoolOpt('route_tasks', default=False,
+                help=_('Route all tasks of an environment to the same '
+                       'engine worker. The API service must be configured '
+                       'with the same number of workers as the engine, '
+                       'tasks are rejected by the API otherwise'))
+]
+
+status_reports_opts = [
+    cfg.IntOpt('batch_size', default=100,
+               help=_('Maximum number of deployment status reports of the '
+                      'engine buffered before they are written to the '
+                      'database in a single transaction')),
+    cfg.FloatOpt('flush_interval', default=1.0,
+                 help=_('Maximum time in seconds deployment status reports '
+                        'are buffered. Set to 0 to write every report as '
+                        'soon as it is received'))
+]
+
+session_opts = [
+    cfg.IntOpt('patches_limit', default=50,
+               help=_('Maximum number of changes to the environment of a '
+                      'configuration session stored as patches. Once the '
+                      'limit is reached the whole environment description '
+                      'is stored. Set to 0 to always store the whole '
+                      'description'))
 ]
 
 # TODO(sjmc7): move into engine opts?
@@ -203,9 +254,21 @@ packages_opts = [
     cfg.StrOpt('packages_cache', default=None,
                help='Location (directory) for Murano package cache.'),
 
+    cfg.BoolOpt('persistent_packages_cache', default=False,
+                help='Keep downloaded packages in the cache between engine '
+                     'restarts.'),
+
+    cfg.IntOpt('packages_cache_size', default=512,
+               help='Maximum size of Murano package cache, Mb'),
+
     cfg.IntOpt('package_size_limit', default=5,
                help='Maximum application package size, Mb'),
 
+    cfg.IntOpt('package_validation_workers', default=4,
+               help='Maximum number of uploaded packages validated '
+                    'concurrently in child processes of the API. Set to 0 '
+                    'to validate packages in the API process itself.'),
+
     cfg.IntOpt('limit_param_default', default=20,
                help='Default value for package pagination in API.'),
 
@@ -225,6 +288,7 @@ murano_metadata_url = [
 CONF = cfg.CONF
 CONF.register_opts(paste_deploy_opts, group='paste_deploy')
 CONF.register_cli_opts(bind_opts)
+CONF.register_opts(api_opts)
 CONF.register_opts(rabbit_opts, group='rabbitmq')
 CONF.register_opts(heat_opts, group='heat')
 CONF.register_opts(mistral_opts, group='mistral')
@@ -232,6 +296,8 @@ CONF.register_opts(neutron_opts, group='neutron')
 CONF.register_opts(keystone_opts, group='keystone')
 CONF.register_opts(murano_opts, group='murano')
 CONF.register_opts(engine_opts, group='engine')
+CONF.register_opts(status_reports_opts, group='status_reports')
+CONF.register_opts(session_opts, group='session')
 CONF.register_opts(file_server)
 CONF.register_cli_opts(murano_metadata_url)
 CONF.register_cli_opts(metadata_dir)
@@ -13,6 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import resource
+import time
+import types
 import uuid
 
 import eventlet.debug
@@ -23,6 +27,7 @@ from oslo.serialization import jsonutils
 from murano.common import config
 from murano.common.helpers import token_sanitizer
 from murano.common import rpc
+from murano.common import worker_service
 from murano.dsl import dsl_exception
 from murano.dsl import executor
 from murano.dsl import results_serializer
@@ -37,6 +42,7 @@ from murano.openstack.common.gettextutils import _
 from murano.openstack.common import log as logging
 
 RPC_SERVICE = None
+LOCAL_PACKAGE_LOADERS = None
 
 LOG = logging.getLogger(__name__)
 
@@ -64,6 +70,11 @@ class TaskProcessingEndpoint(object):
         finally:
             rpc.api().process_result(result, task['id'])
 
+    @staticmethod
+    def get_workers(context):
+        """Return the number of workers listening on their own queues."""
+        return config.CONF.engine.workers
+
 
 def _prepare_rpc_service(server_id):
     endpoints = [TaskProcessingEndpoint()]
@@ -81,6 +92,83 @@ def get_rpc_service():
     return RPC_SERVICE
 
 
+def get_worker_service(workers):
+    """Return the service run by each of the forked engine workers.
+
+    Besides the common task queue a worker listens on the queue of its
+    slot, which the API uses to route all tasks of an environment to the
+    same worker if engine.route_tasks is enabled.
+    """
+    return worker_service.WorkerService(
+        workers, lambda slot: [
+            _prepare_rpc_service(rpc.get_engine_worker_id(slot))])
+
+
+def get_local_package_loaders():
+    global LOCAL_PACKAGE_LOADERS
+
+    if LOCAL_PACKAGE_LOADERS is None:
+        LOCAL_PACKAGE_LOADERS = [
+            package_loader.DirectoryPackageLoader(path)
+            for path in config.CONF.engine.load_packages_from]
+    return LOCAL_PACKAGE_LOADERS
+
+
+def preload_packages():
+    """Load and compile local packages and packages configured to preload.
+
+    Classes of the packages are put into the class table shared by all
+    tasks, so the first deployment after a restart does not have to build
+    them. Catalog packages are fetched with the service credentials and
+    are never released from the package cache.
+    """
+    local_loaders = get_local_package_loaders()
+    names = config.CONF.engine.preload_packages
+    if not local_loaders and not names:
+        return
+
+    started = time.time()
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    clients = []
+
+    def murano_client_factory():
+        if not clients:
+            clients.append(client_manager.get_service_murano_client())
+        return clients[0]
+
+    api_loader = package_loader.ApiPackageLoader(murano_client_factory)
+    pkg_loader = package_loader.CombinedPackageLoader(api_loader,
+                                                      local_loaders)
+    packages = []
+    for loader in local_loaders:
+        packages.extend(loader.packages)
+    for name in names:
+        try:
+            packages.append(pkg_loader.get_package(name))
+        except Exception:
+            LOG.exception(_('Unable to preload package {0}').format(name))
+
+    class_loader = package_class_loader.PackageClassLoader(pkg_loader)
+    system_objects.register(class_loader)
+    classes = 0
+    for package in packages:
+        for class_name in package.classes:
+            try:
+                class_loader.get_class(class_name)
+                classes += 1
+            except Exception:
+                LOG.exception(_('Unable to preload class {0}').format(
+                    class_name))
+
+    elapsed = time.time() - started
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - max_rss
+    LOG.info(_('Preloaded {packages} packages ({classes} classes) in '
+               '{elapsed:.2f} s, maximum resident memory grew by {memory} '
+               'KB').format(packages=len(packages), classes=classes,
+                            elapsed=elapsed, memory=memory))
+
+
 class Environment:
     def __init__(self, object_id):
         self.object_id = object_id
@@ -117,8 +205,10 @@ class TaskExecutor(object):
 
             murano_client_factory = lambda: \
                 self._environment.clients.get_murano_client(self._environment)
-            with package_loader.ApiPackageLoader(
-                    murano_client_factory) as pkg_loader:
+            api_loader = package_loader.ApiPackageLoader(
+                murano_client_factory)
+            with package_loader.CombinedPackageLoader(
+                    api_loader, get_local_package_loaders()) as pkg_loader:
                 return self._execute(pkg_loader)
         finally:
             if self._model['Objects'] is None:
@@ -126,9 +216,18 @@ class TaskExecutor(object):
 
     def _execute(self, pkg_loader):
         class_loader = package_class_loader.PackageClassLoader(pkg_loader)
-        system_objects.register(class_loader, pkg_loader)
-
-        exc = executor.MuranoDslExecutor(class_loader, self.environment)
+        system_objects.register(class_loader)
+
+        pool_size = config.CONF.engine.packages_prefetch_pool_size
+        if pool_size > 0:
+            class_names = set(self._list_types(self.model.get('Objects')))
+            class_names.update(self._list_types(
+                self.model.get('ObjectsCopy')))
+            class_loader.prefetch(class_names, pool_size)
+
+        exc = executor.MuranoDslExecutor(
+            class_loader, self.environment,
+            inline_calls=config.CONF.engine.inline_method_calls)
         obj = exc.load(self.model)
 
         try:
@@ -150,6 +249,21 @@ class TaskExecutor(object):
         result['SystemData'] = self._environment.system_attributes
         return result
 
+    def _list_types(self, data):
+        if isinstance(data, types.DictionaryType):
+            for val in data.itervalues():
+                for res in self._list_types(val):
+                    yield res
+            sys_dict = data.get('?')
+            if isinstance(sys_dict, types.DictionaryType) \
+                    and isinstance(sys_dict.get('type'), types.StringTypes):
+                yield sys_dict['type']
+        elif isinstance(data, collections.Iterable) and not isinstance(
+                data, types.StringTypes):
+            for val in data:
+                for res in self._list_types(val):
+                    yield res
+
     def _invoke(self, mpl_executor):
         obj = mpl_executor.object_store.get(self.action['object_id'])
         method_name, args = self.action['method'], self.action['args']
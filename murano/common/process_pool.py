@@ -0,0 +1,101 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import cPickle as pickle
+import os
+
+from eventlet.green import os as green_os
+from eventlet import greenio
+from eventlet import semaphore
+
+from murano.openstack.common.gettextutils import _
+
+
+class ProcessPool(object):
+    """Executes functions in forked child processes.
+
+    Keeps CPU bound work off the eventlet hub of the calling process.
+    At most max_size children run at the same time, further calls wait
+    for one of them to finish. Arguments are inherited by the child,
+    results and exceptions are passed back pickled.
+    """
+
+    def __init__(self, max_size):
+        self._semaphore = semaphore.Semaphore(max_size)
+        self._waiting = 0
+        self._running = 0
+
+    @property
+    def waiting(self):
+        return self._waiting
+
+    @property
+    def running(self):
+        return self._running
+
+    def execute(self, func, *args, **kwargs):
+        self._waiting += 1
+        try:
+            self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        try:
+            return self._execute(func, args, kwargs)
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    @staticmethod
+    def _execute(func, args, kwargs):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _run_child(write_fd, func, args, kwargs)
+        os.close(write_fd)
+        pipe = greenio.GreenPipe(read_fd, 'rb')
+        try:
+            data = pipe.read()
+        finally:
+            pipe.close()
+            green_os.waitpid(pid, 0)
+        if not data:
+            raise RuntimeError(
+                _('Process {0} exited without a result').format(pid))
+        success, result = pickle.loads(data)
+        if not success:
+            raise result
+        return result
+
+
+def _run_child(write_fd, func, args, kwargs):
+    status = 0
+    try:
+        try:
+            result = (True, func(*args, **kwargs))
+            data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            try:
+                data = pickle.dumps((False, e), pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                data = pickle.dumps((False, RuntimeError(unicode(e))),
+                                    pickle.HIGHEST_PROTOCOL)
+        with os.fdopen(write_fd, 'wb') as pipe:
+            pipe.write(data)
+    except BaseException:
+        status = 1
+    finally:
+        # skip the cleanup of the state inherited from the parent
+        os._exit(status)
@@ -12,14 +12,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import zlib
+
 from oslo import messaging
 from oslo.messaging import rpc
 from oslo.messaging import target
 
 from murano.common import config
+from murano.openstack.common.gettextutils import _
 
 TRANSPORT = None
 
+# number of engine workers confirmed by the engine
+_engine_workers = None
+
+
+class WorkersMismatchError(RuntimeError):
+    pass
+
 
 class ApiClient(object):
     def __init__(self, transport):
@@ -37,7 +47,35 @@ class EngineClient(object):
         self._client = rpc.RPCClient(transport, client_target, timeout=15)
 
     def handle_task(self, task):
-        return self._client.cast({}, 'handle_task', task=task)
+        client = self._client
+        workers = config.CONF.engine.workers
+        if config.CONF.engine.route_tasks and workers > 1:
+            # tasks are environment bound, keep each environment on the
+            # same worker to let it reuse the packages it has loaded
+            self._check_workers(workers)
+            worker = (zlib.crc32(str(task['id'])) & 0xffffffff) % workers
+            client = client.prepare(server=get_engine_worker_id(worker))
+        return client.cast({}, 'handle_task', task=task)
+
+    def _check_workers(self, workers):
+        """Check that the engine listens on the queues tasks are routed to.
+
+        Routed tasks are cast, so tasks sent to queues of workers the
+        engine does not run would be lost silently.
+        """
+        global _engine_workers
+        if _engine_workers != workers:
+            engine_workers = self._client.call({}, 'get_workers')
+            if engine_workers != workers:
+                raise WorkersMismatchError(
+                    _('Tasks cannot be routed to {0} engine workers, the '
+                      'engine runs {1} workers').format(workers,
+                                                        engine_workers))
+            _engine_workers = engine_workers
+
+
+def get_engine_worker_id(index):
+    return 'engine-worker-{0}'.format(index)
 
 
 def api():
@@ -12,8 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import uuid
 
+from eventlet import semaphore
 from oslo import messaging
 from oslo.messaging.notify import dispatcher as oslo_dispatcher
 from oslo.messaging import target
@@ -23,17 +25,20 @@ from sqlalchemy import desc
 
 from murano.common import config
 from murano.common.helpers import token_sanitizer
+from murano.common import worker_service
 from murano.db import models
 from murano.db.services import environments
 from murano.db.services import instances
 from murano.db import session
 from murano.openstack.common.gettextutils import _
 from murano.openstack.common import log as logging
+from murano.openstack.common import service
 from murano.services import states
 
 
 RPC_SERVICE = None
 NOTIFICATION_SERVICE = None
+STATUS_BUFFER = None
 
 LOG = logging.getLogger(__name__)
 
@@ -45,6 +50,9 @@ class ResultEndpoint(object):
         LOG.debug('Got result from orchestration '
                   'engine:\n{0}'.format(secure_result))
 
+        # reports of the deployment have to be counted before it is closed
+        get_status_buffer().flush()
+
         unit = session.get_session()
         environment = unit.query(models.Environment).get(environment_id)
 
@@ -74,10 +82,8 @@ class ResultEndpoint(object):
         deployment = get_last_deployment(unit, environment.id)
         deployment.finished = timeutils.utcnow()
 
-        num_errors = unit.query(models.Status)\
-            .filter_by(level='error', task_id=deployment.id).count()
-        num_warnings = unit.query(models.Status)\
-            .filter_by(level='warning', task_id=deployment.id).count()
+        num_errors = deployment.error_count
+        num_warnings = deployment.warning_count
 
         final_status_text = action_name + ' finished'
         if num_errors:
@@ -170,16 +176,92 @@ def report_notification(report):
     report['entity_id'] = report['id']
     del report['id']
 
-    status = models.Status()
-    status.update(report)
-
+    get_status_buffer().add(report)
+
+
+class StatusBuffer(service.Service):
+    """Write-behind buffer of the status reports of the engine.
+
+    Reports are written in a single transaction once batch_size of them
+    are collected or flush_interval seconds have passed, whichever comes
+    first. The deployment a report belongs to is looked up once per
+    environment in the batch. If the batch cannot be written its reports
+    are written one at a time.
+    """
+
+    def __init__(self, batch_size, flush_interval):
+        super(StatusBuffer, self).__init__()
+        self._batch_size = batch_size if flush_interval > 0 else 1
+        self._flush_interval = flush_interval
+        self._reports = []
+        self._lock = semaphore.Semaphore()
+
+    def start(self):
+        super(StatusBuffer, self).start()
+        if self._flush_interval > 0:
+            self.tg.add_timer(self._flush_interval, self.flush)
+
+    def stop(self):
+        super(StatusBuffer, self).stop()
+        self.flush()
+
+    def add(self, report):
+        # keep the order of the reports received within a batch
+        report['created'] = report['updated'] = timeutils.utcnow()
+        self._reports.append(report)
+        if len(self._reports) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            reports, self._reports = self._reports, []
+            if not reports:
+                return
+            try:
+                _save_reports(reports)
+            except Exception:
+                if len(reports) == 1:
+                    LOG.exception(_('Unable to save status report'))
+                    return
+                LOG.exception(_('Unable to save {0} status reports, saving '
+                                'them one by one').format(len(reports)))
+                # a single malformed report must not cost the whole batch
+                for report in reports:
+                    try:
+                        _save_reports([report])
+                    except Exception:
+                        LOG.exception(_('Unable to save status report'))
+
+
+def _save_reports(reports):
+    columns = models.Status.__table__.c
     unit = session.get_session()
-    #connect with deployment
     with unit.begin():
-        running_deployment = get_last_deployment(unit,
-                                                 status.environment_id)
-        status.task_id = running_deployment.id
-        unit.add(status)
+        task_ids = {}
+        levels = collections.defaultdict(collections.Counter)
+        statuses = []
+        for report in reports:
+            environment_id = report['environment_id']
+            if environment_id not in task_ids:
+                deployment = get_last_deployment(unit, environment_id)
+                task_ids[environment_id] = deployment and deployment.id
+            task_id = task_ids[environment_id]
+            if task_id is None:
+                LOG.warning(_('Status report of environment {0} without '
+                              'deployment skipped').format(environment_id))
+                continue
+            status = dict((k, v) for k, v in report.iteritems()
+                          if k in columns)
+            status['task_id'] = task_id
+            statuses.append(status)
+            levels[task_id][status.get('level')] += 1
+
+        if not statuses:
+            return
+        connection = unit.connection()
+        connection.execute(models.Status.__table__.insert(), statuses)
+        for task_id, task_levels in levels.iteritems():
+            models.count_statuses(connection, task_id, task_levels)
 
 
 def get_last_deployment(unit, env_id):
@@ -221,3 +303,22 @@ def get_notification_service():
     if NOTIFICATION_SERVICE is None:
         NOTIFICATION_SERVICE = _prepare_notification_service(str(uuid.uuid4()))
     return NOTIFICATION_SERVICE
+
+
+def get_status_buffer():
+    global STATUS_BUFFER
+
+    if STATUS_BUFFER is None:
+        STATUS_BUFFER = StatusBuffer(
+            config.CONF.status_reports.batch_size,
+            config.CONF.status_reports.flush_interval)
+    return STATUS_BUFFER
+
+
+def get_worker_service():
+    """Return the service consuming results and notifications in a
+    process separate from the API workers.
+    """
+    return worker_service.WorkerService(
+        1, lambda slot: [get_rpc_service(), get_notification_service(),
+                         get_status_buffer()])
@@ -19,6 +19,7 @@ import socket
 import time
 
 from murano.api import v1
+from murano.api.v1 import catalog
 from murano.api.v1 import request_statistics
 from murano.common import config
 
@@ -33,10 +34,13 @@ LOG = logging.getLogger(__name__)
 
 
 class StatsCollectingService(service.Service):
-    def __init__(self):
+    def __init__(self, worker=None):
         super(StatsCollectingService, self).__init__()
         request_statistics.init_stats()
         self._hostname = socket.gethostname()
+        if worker is not None:
+            # every API worker process counts its own requests
+            self._hostname = '{0}-{1}'.format(self._hostname, worker)
         self._stats_db = db_stats.Statistics()
         self._prev_time = time.time()
 
@@ -62,6 +66,10 @@ class StatsCollectingService(service.Service):
                    v1.stats.error_count,
                    v1.stats.average_time,
                    v1.stats.requests_per_tenant))
+        validation_pool = catalog.get_validation_pool()
+        if validation_pool is not None:
+            LOG.debug("Package validation: running %d, waiting %d" %
+                      (validation_pool.running, validation_pool.waiting))
         try:
             stats = self._stats_db.get_stats_by_host(self._hostname)
             if stats is None:
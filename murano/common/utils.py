@@ -13,6 +13,7 @@
 #    under the License.
 
 import collections
+import copy
 import functools as func
 import types
 
@@ -138,6 +139,26 @@ class TraverseHelper(object):
         else:
             raise ValueError(_('Source object or path is malformed'))
 
+    @staticmethod
+    def apply(changes, source):
+        """Applies list of changes to source.
+
+        :param changes: list of (operation, path, value), where operation
+            is one of update, insert, extend and remove. Value is ignored
+            for remove.
+        :param source: python object (list or dict)
+        """
+        for operation, path, value in changes:
+            if operation == 'remove':
+                TraverseHelper.remove(path, source)
+            elif operation in ('update', 'insert', 'extend'):
+                # values are not shared with the changes, which are stored
+                getattr(TraverseHelper, operation)(
+                    path, copy.deepcopy(value), source)
+            else:
+                raise ValueError(
+                    _('Unknown operation {0}').format(operation))
+
 
 def is_different(obj1, obj2):
     """Stripped-down version of deep.diff comparator
@@ -0,0 +1,92 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import errno
+import multiprocessing
+import os
+
+from murano.openstack.common.gettextutils import _
+from murano.openstack.common import log as logging
+from murano.openstack.common import service
+
+LOG = logging.getLogger(__name__)
+
+
+class WorkerSlots(object):
+    """Numbered slots of the worker processes forked from one parent.
+
+    Slots are shared between the processes, a respawned worker takes over
+    the slot of the one that has died.
+    """
+
+    def __init__(self, count):
+        # pids of the workers holding the slots
+        self._pids = multiprocessing.Array('i', count)
+
+    def take(self):
+        pid = os.getpid()
+        with self._pids.get_lock():
+            for index, owner in enumerate(self._pids):
+                if not owner or owner == pid or not _is_alive(owner):
+                    self._pids[index] = pid
+                    return index
+        raise RuntimeError(_('No free worker slot'))
+
+
+class WorkerService(service.Service):
+    """Service run by each process forked by the ProcessLauncher.
+
+    The services of a worker are created by the factory when the worker
+    starts, so that their connections are not shared with the parent.
+    The factory is called with the slot number of the worker.
+    """
+
+    def __init__(self, workers, factory):
+        super(WorkerService, self).__init__()
+        self._slots = WorkerSlots(workers)
+        self._factory = factory
+        self._services = []
+
+    def start(self):
+        super(WorkerService, self).start()
+        slot = self._slots.take()
+        LOG.debug('Starting worker {0} in process {1}'.format(
+            slot, os.getpid()))
+        self._services = self._factory(slot)
+        for worker_service in self._services:
+            worker_service.start()
+
+    def stop(self):
+        for worker_service in self._services:
+            worker_service.stop()
+        super(WorkerService, self).stop()
+
+    def wait(self):
+        for worker_service in self._services:
+            worker_service.wait()
+        super(WorkerService, self).wait()
+
+    def reset(self):
+        super(WorkerService, self).reset()
+        for worker_service in self._services:
+            if isinstance(worker_service, service.Service):
+                worker_service.reset()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
@@ -79,6 +79,7 @@ class Service(service.Service):
         self._port = port
         self._host = host
         self._backlog = backlog if backlog else CONF.backlog
+        self._socket = None
         super(Service, self).__init__(threads)
 
     def _get_socket(self, host, port, backlog):
@@ -129,9 +130,19 @@ class Service(service.Service):
 
         """
         super(Service, self).start()
-        self._socket = self._get_socket(self._host, self._port, self._backlog)
+        self.listen()
         self.tg.add_thread(self._run, self.application, self._socket)
 
+    def listen(self):
+        """Bind the listening socket unless it is already bound.
+
+        Call before forking worker processes to share the socket
+        between them.
+        """
+        if self._socket is None:
+            self._socket = self._get_socket(
+                self._host, self._port, self._backlog)
+
     @property
     def backlog(self):
         return self._backlog
@@ -15,6 +15,7 @@
 from oslo.config import cfg
 from oslo.db.sqlalchemy import utils
 from sqlalchemy import or_
+from sqlalchemy import orm as sa_orm
 from sqlalchemy.orm import attributes
 # TODO(ruhe) use exception declared in openstack/common/db
 from webob import exc
@@ -34,11 +35,13 @@ SEARCH_MAPPING = {'fqn': 'fully_qualified_name',
 LOG = logging.getLogger(__name__)
 
 
-def _package_get(package_id_or_name, session):
+def _package_get(package_id_or_name, session, undefer=()):
     # TODO(sjmc7): update openstack/common and pull in
     # uuidutils, check that package_id_or_name resembles a
     # UUID before trying to treat it as one
-    package = session.query(models.Package).get(package_id_or_name)
+    query = session.query(models.Package).options(
+        *[sa_orm.undefer(column) for column in undefer])
+    package = query.get(package_id_or_name)
     if not package:
         # Try using the FQN name instead. Since FQNs right now are unique,
         # don't need to do any logic to figure out if we have the right one.
@@ -46,7 +49,7 @@ def _package_get(package_id_or_name, session):
         #  Heat does this in nicer way, giving each stack an unambiguous ID of
         # stack_name/id and redirecting to it in the API. We need to do some
         # reworking for precedence rules later, so maybe take a look at this
-        package = session.query(models.Package).filter_by(
+        package = query.filter_by(
             fully_qualified_name=package_id_or_name
         ).first()
 
@@ -76,13 +79,15 @@ def _authorize_package(package, context, allow_public=False):
             raise exc.HTTPForbidden(msg)
 
 
-def package_get(package_id_or_name, context):
+def package_get(package_id_or_name, context, undefer=()):
     """Return package details
        :param package_id: ID or name of a package, string
+       :param undefer: names of blob columns to load with the package,
+        other blobs can't be accessed once the package is returned
        :returns: detailed information about package, dict
     """
     session = db_session.get_session()
-    package = _package_get(package_id_or_name, session)
+    package = _package_get(package_id_or_name, session, undefer)
     _authorize_package(package, context, allow_public=True)
     return package
 
@@ -325,6 +330,43 @@ def package_search(filters, context, limit=None):
     return query.all()
 
 
+def package_resolve_classes(class_names, context):
+    """Find packages defining the given classes in a single query.
+      * The same visibility rules as in package_search are applied to
+        enabled packages.
+      * If a class is defined in several packages the first one by package
+        name wins, as with package_search ordered by name.
+       :param class_names: names of the classes to resolve, list
+       :returns: information about owning packages by class name, dict
+    """
+    if not class_names:
+        return {}
+    session = db_session.get_session()
+    pkg = models.Package
+    cls = models.Class
+
+    query = session.query(cls.name, pkg.id, pkg.fully_qualified_name,
+                          pkg.updated).join(pkg, cls.package_id == pkg.id)
+    #NOTE(efedorova): is needed for SA 0.7.9, but could be done
+    # simpler in SA 0.8. See http://goo.gl/9stlKu for a details
+    query = query.filter(pkg.__table__.c.enabled)
+    if not context.is_admin:
+        query = query.filter(or_(pkg.is_public,
+                                 pkg.owner_id == context.tenant))
+    query = query.filter(cls.name.in_(set(class_names)))
+    query = query.order_by(pkg.name, pkg.id)
+
+    result = {}
+    for class_name, package_id, fqn, updated in query:
+        if class_name not in result:
+            result[class_name] = {
+                'id': package_id,
+                'fully_qualified_name': fqn,
+                'updated': updated
+            }
+    return result
+
+
 def package_upload(values, tenant_id):
     """Upload a package with new application
        :param values: parameters describing the new package
@@ -0,0 +1,41 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Add compiled_classes column to package table.
+
+Revision ID: 005
+Revises: table package
+Create Date: 2014-12-01 12:00:00.000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column(
+        'package',
+        sa.Column('compiled_classes', sa.types.Text(), nullable=True)
+    )
+    ### end Alembic commands ###
+
+
+def downgrade():
+    op.drop_column('package', 'compiled_classes')
+    ### end Alembic commands ###
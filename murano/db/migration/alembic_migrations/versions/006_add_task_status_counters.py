@@ -0,0 +1,60 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Add counters of status reports by level to task table.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2014-12-08 12:00:00.000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+
+from alembic import op
+import sqlalchemy as sa
+
+COUNTERS = {
+    'error': 'error_count',
+    'warning': 'warning_count',
+    'info': 'info_count'
+}
+
+
+def upgrade():
+    for column in COUNTERS.itervalues():
+        op.add_column(
+            'task',
+            sa.Column(column, sa.Integer(), nullable=False,
+                      server_default='0')
+        )
+
+    task = sa.sql.table('task', sa.sql.column('id'),
+                        *[sa.sql.column(c) for c in COUNTERS.itervalues()])
+    status = sa.sql.table('status', sa.sql.column('task_id'),
+                          sa.sql.column('level'))
+    for level, column in COUNTERS.iteritems():
+        count = sa.select([sa.func.count()]).where(
+            sa.and_(status.c.task_id == task.c.id,
+                    status.c.level == level)).as_scalar()
+        op.execute(task.update().values({column: count}))
+    ### end Alembic commands ###
+
+
+def downgrade():
+    for column in COUNTERS.itervalues():
+        op.drop_column('task', column)
+    ### end Alembic commands ###
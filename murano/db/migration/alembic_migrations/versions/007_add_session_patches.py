@@ -0,0 +1,60 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Add session_patch table and patch_count column to session table.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2014-12-10 12:00:00.000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+
+from alembic import op
+import sqlalchemy as sa
+
+MYSQL_ENGINE = 'InnoDB'
+MYSQL_CHARSET = 'utf8'
+
+
+def upgrade():
+    op.add_column(
+        'session',
+        sa.Column('patch_count', sa.Integer(), nullable=False,
+                  server_default='0')
+    )
+    op.create_table(
+        'session_patch',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('changes', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        mysql_engine=MYSQL_ENGINE,
+        mysql_charset=MYSQL_CHARSET
+    )
+    op.create_index('ix_session_patch_session_id',
+                    'session_patch',
+                    ['session_id'])
+    ### end Alembic commands ###
+
+
+def downgrade():
+    # the index backs the foreign key on MySQL and is dropped with the table
+    op.drop_table('session_patch')
+    op.drop_column('session', 'patch_count')
+    ### end Alembic commands ###
@@ -0,0 +1,162 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Add object_chunk table and store task descriptions as snapshots.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2014-12-12 12:00:00.000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+
+import collections
+import hashlib
+import types
+
+from alembic import op
+from oslo.serialization import jsonutils
+import sqlalchemy as sa
+
+MYSQL_ENGINE = 'InnoDB'
+MYSQL_CHARSET = 'utf8'
+
+# snapshots of this revision, murano.db.snapshots may change later
+REFERENCE = '?chunk'
+
+
+class JsonBlob(sa.TypeDecorator):
+    """Plain JSON, the format of values at this revision."""
+    impl = sa.Text
+
+    def process_bind_param(self, value, dialect):
+        return jsonutils.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            return jsonutils.loads(value)
+        return None
+
+
+task = sa.sql.table('task', sa.sql.column('id'),
+                    sa.sql.column('description', JsonBlob()))
+
+object_chunk = sa.sql.table('object_chunk',
+                            sa.sql.column('hash'),
+                            sa.sql.column('content', JsonBlob()),
+                            sa.sql.column('ref_count'))
+
+
+def _split(value, chunks):
+    if isinstance(value, types.DictType):
+        result = dict((k, _split(v, chunks)) for k, v in value.iteritems())
+        header = value.get('?')
+        if isinstance(header, types.DictType) and 'id' in header:
+            chunk_hash = hashlib.sha1(
+                jsonutils.dumps(result, sort_keys=True)).hexdigest()
+            chunks[chunk_hash] = result
+            return {REFERENCE: chunk_hash}
+        return result
+    elif isinstance(value, types.ListType):
+        return [_split(t, chunks) for t in value]
+    return value
+
+
+def _join(value, chunks):
+    if isinstance(value, types.DictType):
+        if len(value) == 1 and REFERENCE in value:
+            return _join(chunks[value[REFERENCE]], chunks)
+        return dict((k, _join(v, chunks)) for k, v in value.iteritems())
+    elif isinstance(value, types.ListType):
+        return [_join(t, chunks) for t in value]
+    return value
+
+
+def _get_references(value):
+    if isinstance(value, types.DictType):
+        if len(value) == 1 and REFERENCE in value:
+            return [value[REFERENCE]]
+        values = value.itervalues()
+    elif isinstance(value, types.ListType):
+        values = value
+    else:
+        return []
+    result = []
+    for t in values:
+        result.extend(_get_references(t))
+    return result
+
+
+def _store(connection, description):
+    chunks = collections.OrderedDict()
+    snapshot = _split(description, chunks)
+    references = collections.Counter(_get_references(snapshot))
+    for content in chunks.itervalues():
+        references.update(_get_references(content))
+    # parents go first, so that references of their stored children are
+    # not counted again
+    for chunk_hash, content in reversed(chunks.items()):
+        ref_count = connection.execute(
+            sa.select([object_chunk.c.ref_count]).where(
+                object_chunk.c.hash == chunk_hash)).scalar()
+        if ref_count is None:
+            connection.execute(object_chunk.insert().values(
+                hash=chunk_hash, content=content,
+                ref_count=references[chunk_hash]))
+        else:
+            # children of a stored chunk are referenced by it already
+            for child_hash in _get_references(content):
+                references[child_hash] -= 1
+            connection.execute(
+                object_chunk.update()
+                .where(object_chunk.c.hash == chunk_hash)
+                .values(ref_count=ref_count + references[chunk_hash]))
+    return snapshot
+
+
+def _convert_descriptions(convert):
+    connection = op.get_bind()
+    task_ids = [row.id for row in connection.execute(sa.select([task.c.id]))]
+    for task_id in task_ids:
+        description = connection.execute(
+            sa.select([task.c.description]).where(
+                task.c.id == task_id)).scalar()
+        connection.execute(task.update().where(task.c.id == task_id).values(
+            description=convert(connection, description)))
+
+
+def upgrade():
+    op.create_table(
+        'object_chunk',
+        sa.Column('hash', sa.String(length=40), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('hash'),
+        mysql_engine=MYSQL_ENGINE,
+        mysql_charset=MYSQL_CHARSET
+    )
+    _convert_descriptions(_store)
+    ### end Alembic commands ###
+
+
+def downgrade():
+    chunks = dict((row.hash, row.content) for row in op.get_bind().execute(
+        sa.select([object_chunk.c.hash, object_chunk.c.content])))
+    _convert_descriptions(
+        lambda connection, snapshot: _join(snapshot, chunks))
+    op.drop_table('object_chunk')
+    ### end Alembic commands ###
@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compress descriptions of environments and sessions and object chunks.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2014-12-15 12:00:00.000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+
+import base64
+import zlib
+
+from alembic import op
+from oslo.serialization import jsonutils
+import sqlalchemy as sa
+
+BATCH_SIZE = 100
+
+# codecs of this revision, murano.db.sqla.types may change later
+ZLIB_JSON_HEADER = 'zjson:'
+COMPRESSION_LEVEL = 6
+MIN_COMPRESSED_SIZE = 256
+
+# compressed columns by table with the primary key columns
+COLUMNS = [
+    ('environment', 'id', 'description'),
+    ('session', 'id', 'description'),
+    ('object_chunk', 'hash', 'content')
+]
+
+
+def _encode_json(value):
+    return jsonutils.dumps(value)
+
+
+def _encode_zlib_json(value):
+    data = jsonutils.dumps(value, separators=(',', ':'))
+    if len(data) < MIN_COMPRESSED_SIZE:
+        return data
+    return ZLIB_JSON_HEADER + base64.b64encode(
+        zlib.compress(data, COMPRESSION_LEVEL))
+
+
+def _decode(data):
+    if data.startswith(ZLIB_JSON_HEADER):
+        return jsonutils.loads(zlib.decompress(
+            base64.b64decode(data[len(ZLIB_JSON_HEADER):])))
+    return jsonutils.loads(data)
+
+
+def _convert(table_name, key, column, encode):
+    """Rewrite values of column with encode in batches of rows.
+
+    Values are updated only if they were not changed since they were
+    read, so the rows may be updated concurrently.
+    """
+    connection = op.get_bind()
+    table = sa.sql.table(table_name, sa.sql.column(key),
+                         sa.sql.column(column))
+    update = table.update().where(sa.and_(
+        table.c[key] == sa.bindparam('row_key'),
+        table.c[column] == sa.bindparam('old_value'))).values(
+        {column: sa.bindparam('new_value')})
+
+    last_key = None
+    while True:
+        query = sa.select([table.c[key], table.c[column]]).order_by(
+            table.c[key]).limit(BATCH_SIZE)
+        if last_key is not None:
+            query = query.where(table.c[key] > last_key)
+        rows = connection.execute(query).fetchall()
+        if not rows:
+            break
+        params = []
+        for row_key, value in rows:
+            if value is None:
+                continue
+            new_value = encode(_decode(value))
+            if new_value != value:
+                params.append({'row_key': row_key, 'old_value': value,
+                               'new_value': new_value})
+        if params:
+            connection.execute(update, params)
+        last_key = rows[-1][0]
+
+
+def upgrade():
+    for table_name, key, column in COLUMNS:
+        _convert(table_name, key, column, _encode_zlib_json)
+    ### end Alembic commands ###
+
+
+def downgrade():
+    for table_name, key, column in COLUMNS:
+        _convert(table_name, key, column, _encode_json)
+    ### end Alembic commands ###
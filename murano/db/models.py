@@ -21,7 +21,9 @@ import sqlalchemy as sa
 from sqlalchemy.ext import declarative
 from sqlalchemy import orm as sa_orm
 
+from murano.common import utils
 from murano.common import uuidutils
+from murano.db import snapshots
 from murano.db.sqla import types as st
 
 
@@ -63,7 +65,8 @@ class Environment(Base, TimestampMixin):
     name = sa.Column(sa.String(255), nullable=False)
     tenant_id = sa.Column(sa.String(36), nullable=False)
     version = sa.Column(sa.BigInteger, nullable=False, default=0)
-    description = sa.Column(st.JsonBlob(), nullable=False, default={})
+    description = sa.Column(st.CompressedJsonBlob(), nullable=False,
+                            default={})
     networking = sa.Column(st.JsonBlob(), nullable=True, default={})
 
     sessions = sa_orm.relationship("Session", backref='environment',
@@ -88,18 +91,70 @@ class Session(Base, TimestampMixin):
 
     user_id = sa.Column(sa.String(36), nullable=False)
     state = sa.Column(sa.String(36), nullable=False)
-    description = sa.Column(st.JsonBlob(), nullable=False)
+    base_description = sa.Column('description', st.CompressedJsonBlob(),
+                                 nullable=False)
     version = sa.Column(sa.BigInteger, nullable=False, default=0)
+    # number of patches to apply to the base description
+    patch_count = sa.Column(sa.Integer, nullable=False, default=0,
+                            server_default='0')
+
+    patches = sa_orm.relationship('SessionPatch', order_by='SessionPatch.id',
+                                  cascade='save-update, merge, delete, '
+                                          'delete-orphan')
+
+    _applied_patches = 0
+
+    @property
+    def description(self):
+        """Base description with the patches applied.
+
+        Patches are applied to the base description in memory when it is
+        read. The base description is written back on compaction only.
+        """
+        if (self.patch_count or 0) > self._applied_patches:
+            patches = self.patches
+            for patch in patches[self._applied_patches:]:
+                utils.TraverseHelper.apply(patch.changes,
+                                           self.base_description['Objects'])
+            self._applied_patches = len(patches)
+        return self.base_description
+
+    @description.setter
+    def description(self, value):
+        self.base_description = value
+        # the value may be the base description modified in place
+        sa_orm.attributes.flag_modified(self, 'base_description')
+        if self.patch_count:
+            self.patches = []
+            self.patch_count = 0
+        self._applied_patches = 0
+
+    def compact(self):
+        """Store the description with the patches applied as the base."""
+        if self.patch_count:
+            self.description = self.description
 
     def to_dict(self):
         dictionary = super(Session, self).to_dict()
-        del dictionary['description']
+        for key in ('base_description', 'patches', '_applied_patches'):
+            dictionary.pop(key, None)
         #object relations may be not loaded yet
         if 'environment' in dictionary:
             del dictionary['environment']
         return dictionary
 
 
+class SessionPatch(Base):
+    """Changes made to the environment description of a session."""
+    __tablename__ = 'session_patch'
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+    session_id = sa.Column(sa.String(36), sa.ForeignKey('session.id'),
+                           nullable=False, index=True)
+    # list of (operation, path, value) as of TraverseHelper.apply
+    changes = sa.Column(st.JsonBlob(), nullable=False)
+
+
 class Task(Base, TimestampMixin):
     __tablename__ = 'task'
 
@@ -107,15 +162,47 @@ class Task(Base, TimestampMixin):
                    default=uuidutils.generate_uuid)
     started = sa.Column(sa.DateTime, default=timeutils.utcnow, nullable=False)
     finished = sa.Column(sa.DateTime, default=None, nullable=True)
-    description = sa.Column(st.JsonBlob(), nullable=False)
+    # description with objects replaced by references to object chunks
+    snapshot = sa.Column('description', st.JsonBlob(), nullable=False)
     environment_id = sa.Column(sa.String(255), sa.ForeignKey('environment.id'))
     action = sa.Column(st.JsonBlob())
+    # maintained by inserts of statuses
+    error_count = sa.Column(sa.Integer, nullable=False, default=0,
+                            server_default='0')
+    warning_count = sa.Column(sa.Integer, nullable=False, default=0,
+                              server_default='0')
+    info_count = sa.Column(sa.Integer, nullable=False, default=0,
+                           server_default='0')
 
     statuses = sa_orm.relationship("Status", backref='task',
                                    cascade='save-update, merge, delete')
 
+    _description_changed = False
+    _previous_snapshot = None
+
+    @property
+    def description(self):
+        """Object model of the snapshot, loaded from object chunks once."""
+        if '_description' not in self.__dict__:
+            unit = sa_orm.object_session(self)
+            self._description = snapshots.load(unit, [self.snapshot])[0]
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        if not self._description_changed:
+            # chunks of the stored snapshot are released on flush
+            self._previous_snapshot = self.snapshot
+        self._description = value
+        self._description_changed = True
+        sa_orm.attributes.flag_modified(self, 'snapshot')
+
     def to_dict(self):
         dictionary = super(Task, self).to_dict()
+        for key in ('snapshot', '_description_changed', '_previous_snapshot'):
+            dictionary.pop(key, None)
+        if '_description' in dictionary:
+            dictionary['description'] = dictionary.pop('_description')
         if 'statuses' in dictionary:
             del dictionary['statuses']
         if 'environment' in dictionary:
@@ -123,6 +210,30 @@ class Task(Base, TimestampMixin):
         return dictionary
 
 
+@sa.event.listens_for(Task, 'before_insert')
+@sa.event.listens_for(Task, 'before_update')
+def _store_description(mapper, connection, task):
+    if task._description_changed:
+        task.snapshot = snapshots.store(connection, task._description)
+        snapshots.release(connection, task._previous_snapshot)
+        task._description_changed = False
+        task._previous_snapshot = None
+
+
+@sa.event.listens_for(Task, 'before_delete')
+def _release_description(mapper, connection, task):
+    snapshots.release(connection, task.snapshot)
+
+
+class ObjectChunk(Base):
+    """Object of object model snapshots, see murano.db.snapshots."""
+    __tablename__ = 'object_chunk'
+
+    hash = sa.Column(sa.String(40), primary_key=True)
+    content = sa.Column(st.CompressedJsonBlob(), nullable=False)
+    ref_count = sa.Column(sa.Integer, nullable=False, default=0)
+
+
 class Status(Base, TimestampMixin):
     __tablename__ = 'status'
 
@@ -144,6 +255,37 @@ class Status(Base, TimestampMixin):
         return dictionary
 
 
+STATUS_COUNTERS = {
+    'error': 'error_count',
+    'warning': 'warning_count',
+    'info': 'info_count'
+}
+
+
+def count_statuses(connection, task_id, levels):
+    """Add numbers of inserted statuses by level to the task counters.
+
+    The counters are incremented in the database, so call within the
+    transaction of the insert.
+    """
+    table = Task.__table__
+    values = {}
+    for level, count in levels.iteritems():
+        counter = STATUS_COUNTERS.get(level)
+        if counter is not None:
+            values[counter] = table.c[counter] + count
+    if not values or task_id is None:
+        return
+    values['updated'] = table.c.updated
+    connection.execute(
+        table.update().where(table.c.id == task_id).values(values))
+
+
+@sa.event.listens_for(Status, 'after_insert')
+def _count_status(mapper, connection, status):
+    count_statuses(connection, status.task_id, {status.level: 1})
+
+
 class ApiStats(Base, TimestampMixin):
     __tablename__ = 'apistats'
 
@@ -210,7 +352,8 @@ class Package(Base, TimestampMixin):
     id = sa.Column(sa.String(36),
                    primary_key=True,
                    default=uuidutils.generate_uuid)
-    archive = sa.Column(st.LargeBinary())
+    # blobs are loaded on access, see catalog.api.package_get
+    archive = sa_orm.deferred(sa.Column(st.LargeBinary()))
     fully_qualified_name = sa.Column(sa.String(128),
                                      nullable=False,
                                      index=True,
@@ -228,10 +371,11 @@ class Package(Base, TimestampMixin):
                                secondary=package_to_tag,
                                cascade='save-update, merge',
                                lazy='joined')
-    logo = sa.Column(st.LargeBinary(), nullable=True)
+    logo = sa_orm.deferred(sa.Column(st.LargeBinary(), nullable=True))
     owner_id = sa.Column(sa.String(36), nullable=False)
-    ui_definition = sa.Column(sa.Text)
-    supplier_logo = sa.Column(sa.LargeBinary, nullable=True)
+    ui_definition = sa_orm.deferred(sa.Column(sa.Text))
+    supplier_logo = sa_orm.deferred(sa.Column(sa.LargeBinary, nullable=True))
+    compiled_classes = sa_orm.deferred(sa.Column(sa.Text, nullable=True))
     categories = sa_orm.relationship("Category",
                                      secondary=package_to_category,
                                      cascade='save-update, merge',
@@ -245,7 +389,8 @@ class Package(Base, TimestampMixin):
                             'archive',
                             'logo',
                             'ui_definition',
-                            'supplier_logo']
+                            'supplier_logo',
+                            'compiled_classes']
         nested_objects = ['categories', 'tags', 'class_definitions']
         for key in not_serializable:
             if key in d.keys():
@@ -288,7 +433,7 @@ class Class(Base, TimestampMixin):
 
 def register_models(engine):
     """Creates database tables for all models with the given engine."""
-    models = (Environment, Status, Session, Task,
+    models = (Environment, Status, Session, Task, ObjectChunk,
               ApiStats, Package, Category, Class, Instance)
     for model in models:
         model.metadata.create_all(engine)
@@ -296,7 +441,7 @@ def register_models(engine):
 
 def unregister_models(engine):
     """Drops database tables for all models with the given engine."""
-    models = (Environment, Status, Session, Task,
+    models = (Environment, Status, Session, Task, ObjectChunk,
               ApiStats, Package, Category, Class)
     for model in models:
         model.metadata.drop_all(engine)
@@ -65,47 +65,49 @@ class CoreServices(object):
     @staticmethod
     def post_data(environment_id, session_id, data, path):
         get_description = envs.EnvironmentServices.get_environment_description
-        save_description = envs.EnvironmentServices.\
-            save_environment_description
+        save_changes = envs.EnvironmentServices.save_environment_changes
 
         env_description = get_description(environment_id, session_id)
         if env_description is None:
             raise exc.HTTPMethodNotAllowed
+        changes = []
         if not 'services' in env_description:
-            env_description['services'] = []
+            changes.append(('update', '/services', []))
 
         if path == '/services':
             if isinstance(data, types.ListType):
-                utils.TraverseHelper.extend(path, data, env_description)
+                changes.append(('extend', path, data))
             else:
-                utils.TraverseHelper.insert(path, data, env_description)
+                changes.append(('insert', path, data))
 
-        save_description(session_id, env_description)
+        if changes:
+            utils.TraverseHelper.apply(changes, env_description)
+            save_changes(session_id, env_description, changes)
 
         return data
 
     @staticmethod
     def put_data(environment_id, session_id, data, path):
         get_description = envs.EnvironmentServices.get_environment_description
-        save_description = envs.EnvironmentServices.\
-            save_environment_description
+        save_changes = envs.EnvironmentServices.save_environment_changes
 
         env_description = get_description(environment_id, session_id)
 
-        utils.TraverseHelper.update(path, data, env_description)
-        env_description['?']['updated'] = str(timeutils.utcnow())
+        changes = [('update', path, data),
+                   ('update', '/?/updated', str(timeutils.utcnow()))]
+        utils.TraverseHelper.apply(changes, env_description)
 
-        save_description(session_id, env_description)
+        save_changes(session_id, env_description, changes)
 
         return data
 
     @staticmethod
     def delete_data(environment_id, session_id, path):
         get_description = envs.EnvironmentServices.get_environment_description
-        save_description = envs.EnvironmentServices.\
-            save_environment_description
+        save_changes = envs.EnvironmentServices.save_environment_changes
 
         env_description = get_description(environment_id, session_id)
 
-        utils.TraverseHelper.remove(path, env_description)
-        save_description(session_id, env_description)
+        changes = [('remove', path, None)]
+        utils.TraverseHelper.apply(changes, env_description)
+        save_changes(session_id, env_description, changes)
@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
+from murano.common import config
 from murano.common import uuidutils
 from murano.db import models
 from murano.db.services import sessions
@@ -36,8 +39,10 @@ class EnvironmentServices(object):
         environments = unit.query(models.Environment). \
             filter_by(**filters).all()
 
+        statuses = EnvironmentServices.get_statuses(
+            [env['id'] for env in environments])
         for env in environments:
-            env['status'] = EnvironmentServices.get_status(env['id'])
+            env['status'] = statuses[env['id']]
 
         return environments
 
@@ -56,24 +61,29 @@ class EnvironmentServices(object):
         :param environment_id: Id of environment for which we checking status.
         :return: Environment status
         """
-        #Deploying: there is at least one valid session with status `deploying`
-        session_list = sessions.SessionServices.get_sessions(environment_id)
-        has_opened = False
-        for session in session_list:
-            if session.state == states.SessionState.DEPLOYING:
-                return states.EnvironmentStatus.DEPLOYING
-            elif session.state == states.SessionState.DELETING:
-                return states.EnvironmentStatus.DELETING
-            elif session.state == states.SessionState.DEPLOY_FAILURE:
-                return states.EnvironmentStatus.DEPLOY_FAILURE
-            elif session.state == states.SessionState.DELETE_FAILURE:
-                return states.EnvironmentStatus.DELETE_FAILURE
-            elif session.state == states.SessionState.OPENED:
-                has_opened = True
-        if has_opened:
-            return states.EnvironmentStatus.PENDING
-
-        return states.EnvironmentStatus.READY
+        unit = db_session.get_session()
+        query = unit.query(models.Session.state).filter(
+            models.Session.environment_id == environment_id)
+        return _get_status([state for state, in _order_sessions(query)])
+
+    @staticmethod
+    def get_statuses(environment_ids):
+        """Returns statuses of several environments using a single query.
+
+        :param environment_ids: List of environment ids
+        :return: Dict of environment statuses by environment id
+        """
+        session_states = collections.defaultdict(list)
+        if environment_ids:
+            unit = db_session.get_session()
+            query = unit.query(
+                models.Session.environment_id, models.Session.state).filter(
+                models.Session.environment_id.in_(environment_ids))
+            for environment_id, state in _order_sessions(query):
+                session_states[environment_id].append(state)
+
+        return dict((env_id, _get_status(session_states[env_id]))
+                    for env_id in environment_ids)
 
     @staticmethod
     def create(environment_params, tenant_id):
@@ -192,6 +202,36 @@ class EnvironmentServices(object):
             session.description = environment
         session.save(unit)
 
+    @staticmethod
+    def save_environment_changes(session_id, environment, changes):
+        """Saves changes made to environment description of the session.
+
+           Changes are stored as a patch to the session description, unless
+           the description was read from the environment rather than from
+           the session or the session has too many patches already.
+
+           :param session_id: Session Id
+           :param environment: Content of environment with changes applied
+           :param changes: Changes as of TraverseHelper.apply
+        """
+        unit = db_session.get_session()
+        session = unit.query(models.Session).get(session_id)
+        if (session.state == states.SessionState.DEPLOYED or
+                not sessions.SessionServices.validate(session) or
+                session.patch_count >= config.CONF.session.patches_limit):
+            EnvironmentServices.save_environment_description(
+                session_id, environment)
+            return
+
+        with unit.begin():
+            unit.add(models.SessionPatch(session_id=session_id,
+                                         changes=changes))
+            # incremented in the database, concurrent requests may add
+            # patches to the same session
+            unit.query(models.Session).filter_by(id=session_id).update(
+                {models.Session.patch_count: models.Session.patch_count + 1},
+                synchronize_session=False)
+
     @staticmethod
     def generate_default_networks(env_name):
         # TODO(ativelkov):
@@ -217,8 +257,38 @@ class EnvironmentServices(object):
         environment = unit.query(models.Environment).get(
             session.environment_id)
 
+        if session.patch_count:
+            # deployed description is stored in one piece
+            with unit.begin():
+                session.compact()
+
         if (session.description['Objects'] is None and
                 'ObjectsCopy' not in session.description):
             EnvironmentServices.remove(session.environment_id)
         else:
             sessions.SessionServices.deploy(session, environment, unit, token)
+
+
+def _order_sessions(query):
+    # the same order as of SessionServices.get_sessions
+    return query.order_by(models.Session.version.desc(),
+                          models.Session.updated.desc())
+
+
+def _get_status(session_states):
+    has_opened = False
+    for state in session_states:
+        if state == states.SessionState.DEPLOYING:
+            return states.EnvironmentStatus.DEPLOYING
+        elif state == states.SessionState.DELETING:
+            return states.EnvironmentStatus.DELETING
+        elif state == states.SessionState.DEPLOY_FAILURE:
+            return states.EnvironmentStatus.DEPLOY_FAILURE
+        elif state == states.SessionState.DELETE_FAILURE:
+            return states.EnvironmentStatus.DELETE_FAILURE
+        elif state == states.SessionState.OPENED:
+            has_opened = True
+    if has_opened:
+        return states.EnvironmentStatus.PENDING
+
+    return states.EnvironmentStatus.READY
@@ -0,0 +1,233 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Content addressed storage of object model snapshots.
+
+An object model is split into chunks, one per object. Objects nested into
+an object are replaced in its chunk with references to their chunks, so a
+chunk is identified by the hash of its content and objects that did not
+change between snapshots are stored once. Chunks count references to them
+from snapshots and from other chunks and are deleted once the count drops
+to zero.
+"""
+
+import collections
+import contextlib
+import hashlib
+import types
+
+from oslo.db import exception as db_exc
+from oslo.serialization import jsonutils
+import sqlalchemy as sa
+
+from murano.db.sqla import types as st
+
+REFERENCE = '?chunk'
+
+# maximum number of hashes in a single IN clause
+_BATCH_SIZE = 500
+
+CHUNKS = sa.sql.table('object_chunk',
+                      sa.sql.column('hash'),
+                      sa.sql.column('content', st.CompressedJsonBlob()),
+                      sa.sql.column('ref_count'))
+
+
+def get_hash(content):
+    return hashlib.sha1(jsonutils.dumps(content, sort_keys=True)).hexdigest()
+
+
+def split(value):
+    """Split object model into chunks.
+
+    :param value: object model
+    :return: tuple of the object model with objects replaced by references
+        and an ordered dict of chunks by their hashes
+    """
+    chunks = collections.OrderedDict()
+    return _split(value, chunks), chunks
+
+
+def join(value, chunks):
+    """Return object model with references replaced by the objects."""
+    if isinstance(value, types.DictType):
+        if _is_reference(value):
+            return join(chunks[value[REFERENCE]], chunks)
+        return dict((k, join(v, chunks)) for k, v in value.iteritems())
+    elif isinstance(value, types.ListType):
+        return [join(t, chunks) for t in value]
+    return value
+
+
+def get_references(value):
+    """Return hashes of chunks referenced by value (no nested ones)."""
+    if isinstance(value, types.DictType):
+        if _is_reference(value):
+            return [value[REFERENCE]]
+        values = value.itervalues()
+    elif isinstance(value, types.ListType):
+        values = value
+    else:
+        return []
+    result = []
+    for t in values:
+        result.extend(get_references(t))
+    return result
+
+
+def store(connection, value):
+    """Store chunks of object model missing in the database.
+
+    Chunks that are already stored are locked until the end of the
+    transaction, so that concurrent transactions cannot delete them before
+    the references are added. Chunks inserted by a concurrent transaction
+    meanwhile are referenced instead.
+
+    :return: snapshot to be stored instead of the object model
+    """
+    snapshot, chunks = split(value)
+    if not chunks:
+        return snapshot
+
+    references = collections.Counter(get_references(snapshot))
+    # parents go before their children, so that references from inserted
+    # chunks are counted by the time their children are inserted
+    pending = list(reversed(chunks.keys()))
+    while pending:
+        existing = set(row.hash for row in _fetch(
+            connection, [CHUNKS.c.hash], pending, lock=True))
+        inserted = set()
+        conflicts = False
+        for chunk_hash in pending:
+            if chunk_hash in existing or not references[chunk_hash]:
+                continue
+            try:
+                with _savepoint(connection):
+                    connection.execute(CHUNKS.insert().values(
+                        hash=chunk_hash, content=chunks[chunk_hash],
+                        ref_count=references[chunk_hash]))
+            except db_exc.DBDuplicateEntry:
+                # inserted by a concurrent transaction, the chunks left are
+                # checked again
+                conflicts = True
+                continue
+            inserted.add(chunk_hash)
+            del references[chunk_hash]
+            references.update(get_references(chunks[chunk_hash]))
+        if not conflicts:
+            break
+        pending = [h for h in pending
+                   if h not in existing and h not in inserted]
+    _add_references(connection, references)
+    return snapshot
+
+
+def release(connection, snapshot):
+    """Release chunks referenced by snapshot, deleting unreferenced ones."""
+    references = collections.Counter(get_references(snapshot))
+    while references:
+        _add_references(connection, dict(
+            (h, -count) for h, count in references.iteritems()))
+        released = _fetch(connection, [CHUNKS.c.hash, CHUNKS.c.content],
+                          references.keys(), CHUNKS.c.ref_count <= 0,
+                          lock=True)
+        references = collections.Counter()
+        for row in released:
+            references.update(get_references(row.content))
+        _delete(connection, [row.hash for row in released])
+
+
+def load(connection, snapshots):
+    """Return object models of snapshots.
+
+    Chunks shared by the snapshots are fetched once.
+    """
+    chunks = {}
+    pending = set()
+    for snapshot in snapshots:
+        pending.update(get_references(snapshot))
+    while pending:
+        rows = _fetch(connection, [CHUNKS.c.hash, CHUNKS.c.content], pending)
+        pending = set()
+        for row in rows:
+            chunks[row.hash] = row.content
+            pending.update(get_references(row.content))
+        pending.difference_update(chunks)
+    return [join(snapshot, chunks) for snapshot in snapshots]
+
+
+def _split(value, chunks):
+    if isinstance(value, types.DictType):
+        result = dict((k, _split(v, chunks)) for k, v in value.iteritems())
+        if _is_object(value):
+            chunk_hash = get_hash(result)
+            chunks[chunk_hash] = result
+            return {REFERENCE: chunk_hash}
+        return result
+    elif isinstance(value, types.ListType):
+        return [_split(t, chunks) for t in value]
+    return value
+
+
+def _is_object(value):
+    header = value.get('?')
+    return isinstance(header, types.DictType) and 'id' in header
+
+
+def _is_reference(value):
+    return len(value) == 1 and REFERENCE in value
+
+
+def _batches(hashes):
+    hashes = list(hashes)
+    for i in xrange(0, len(hashes), _BATCH_SIZE):
+        yield hashes[i:i + _BATCH_SIZE]
+
+
+def _fetch(connection, columns, hashes, *criteria, **kwargs):
+    result = []
+    for batch in _batches(hashes):
+        query = sa.select(columns).where(
+            sa.and_(CHUNKS.c.hash.in_(batch), *criteria))
+        if kwargs.get('lock'):
+            query = query.with_for_update()
+        result.extend(connection.execute(query).fetchall())
+    return result
+
+
+@contextlib.contextmanager
+def _savepoint(connection):
+    # pysqlite does not support savepoints, but SQLite only rolls back the
+    # failed statement and serializes writing transactions anyway
+    if connection.dialect.name == 'sqlite':
+        yield
+    else:
+        with connection.begin_nested():
+            yield
+
+
+def _add_references(connection, references):
+    params = [{'chunk_hash': h, 'count': count}
+              for h, count in references.iteritems() if count]
+    if params:
+        connection.execute(
+            CHUNKS.update()
+            .where(CHUNKS.c.hash == sa.bindparam('chunk_hash'))
+            .values(ref_count=CHUNKS.c.ref_count + sa.bindparam('count')),
+            params)
+
+
+def _delete(connection, hashes):
+    for batch in _batches(hashes):
+        connection.execute(CHUNKS.delete().where(CHUNKS.c.hash.in_(batch)))
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import zlib
+
 from oslo.serialization import jsonutils
 import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
@@ -19,13 +22,77 @@ def LargeBinary():
     return sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql')
 
 
+class JsonCodec(object):
+    """Plain JSON, the format of values stored without a header."""
+    header = ''
+
+    def encode(self, value):
+        return jsonutils.dumps(value)
+
+    def decode(self, data):
+        return jsonutils.loads(data)
+
+
+class ZlibJsonCodec(object):
+    """Compact JSON compressed with zlib.
+
+    Compressed data is base64 encoded, so that it can be stored in the
+    existing text columns. Values with JSON shorter than min_size are
+    stored as plain JSON, which is smaller for them.
+    """
+    header = 'zjson:'
+
+    def __init__(self, level=6, min_size=256):
+        self.level = level
+        self.min_size = min_size
+
+    def encode(self, value):
+        data = jsonutils.dumps(value, separators=(',', ':'))
+        if len(data) < self.min_size:
+            return data
+        return self.header + base64.b64encode(
+            zlib.compress(data, self.level))
+
+    def decode(self, data):
+        return jsonutils.loads(zlib.decompress(
+            base64.b64decode(data[len(self.header):])))
+
+
+JSON = JsonCodec()
+ZLIB_JSON = ZlibJsonCodec()
+
+# codecs of the stored values by their headers, JSON goes last as the one
+# without a header
+CODECS = [ZLIB_JSON, JSON]
+
+
+def decode(data):
+    for codec in CODECS:
+        if data.startswith(codec.header):
+            return codec.decode(data)
+
+
 class JsonBlob(sa.TypeDecorator):
+    """JSON serialized value.
+
+    Values are written with the codec of the column and read with the
+    codec matching their header, so the codec of a column can be changed
+    without conversion of the stored values.
+    """
     impl = sa.Text
 
+    def __init__(self, codec=JSON, *args, **kwargs):
+        super(JsonBlob, self).__init__(*args, **kwargs)
+        self.codec = codec
+
     def process_bind_param(self, value, dialect):
-        return jsonutils.dumps(value)
+        return self.codec.encode(value)
 
     def process_result_value(self, value, dialect):
         if value is not None:
-            return jsonutils.loads(value)
+            return decode(value)
         return None
+
+
+def CompressedJsonBlob():
+    return JsonBlob(ZLIB_JSON)
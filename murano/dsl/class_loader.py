@@ -25,9 +25,15 @@ import murano.dsl.murano_object as murano_object
 import murano.dsl.namespace_resolver as namespace_resolver
 import murano.dsl.principal_objects as principal_objects
 import murano.dsl.typespec as typespec
+import murano.dsl.yaql_functions as yaql_functions
 
 
 class MuranoClassLoader(object):
+    # base yaql contexts holding the standard function tables, one per
+    # class loader type; they are shared by all instances and must not be
+    # modified once created
+    _base_contexts = {}
+
     def __init__(self):
         self._loaded_types = {}
         self._packages_cache = {}
@@ -92,14 +98,30 @@ class MuranoClassLoader(object):
     def load_package(self, class_name):
         raise NotImplementedError()
 
+    def get_base_context(self):
+        loader_type = type(self)
+        context = MuranoClassLoader._base_contexts.get(loader_type)
+        if context is None:
+            context = self.create_base_context()
+            MuranoClassLoader._base_contexts[loader_type] = context
+        return context
+
+    def create_base_context(self):
+        context = yaql.create_context(True)
+        yaql_functions.register(context)
+        return context
+
     def create_root_context(self):
-        return yaql.create_context(True)
+        return yaql.context.Context(parent_context=self.get_base_context())
 
     def get_class_config(self, name):
         return {}
 
     def create_local_context(self, parent_context, murano_class):
-        return yaql.context.Context(parent_context=parent_context)
+        context = yaql.context.Context(parent_context=parent_context)
+        # class-bound functions are shared by all local contexts of the class
+        context.functions = murano_class.context_functions
+        return context
 
     def _fix_parameters(self, kwargs):
         result = {}
@@ -122,6 +144,10 @@ class MuranoClassLoader(object):
                 name = cls.__class__._murano_class_name
 
         m_class = self.get_class(name, create_missing=True)
+        if m_class.native_class is cls:
+            # class is shared with another loader that imported it already
+            return
+        m_class.native_class = cls
         if inspect.isclass(cls):
             if issubclass(cls, murano_object.MuranoObject):
                 m_class.object_class = cls
@@ -14,9 +14,10 @@
 
 import collections
 import inspect
+import itertools
+import logging
 import sys
 import types
-import uuid
 
 import eventlet
 import eventlet.event
@@ -28,19 +29,24 @@ import murano.dsl.dsl_exception as dsl_exception
 import murano.dsl.expressions as expressions
 import murano.dsl.helpers as helpers
 import murano.dsl.murano_method as murano_method
-import murano.dsl.murano_object as murano_object
 import murano.dsl.object_store as object_store
 import murano.dsl.principal_objects.stack_trace as trace
-import murano.dsl.yaql_functions as yaql_functions
 
-from murano.openstack.common import log as logging
+from murano.openstack.common import log
 
-LOG = logging.getLogger(__name__)
+LOG = log.getLogger(__name__)
+
+# Number of nested MuranoPL method calls executed inline on the stack of
+# the calling green thread before the call is moved to a fresh green thread
+MAX_INLINE_DEPTH = 16
+
+_thread_markers = itertools.count()
 
 
 class MuranoDslExecutor(object):
-    def __init__(self, class_loader, environment=None):
+    def __init__(self, class_loader, environment=None, inline_calls=True):
         self._class_loader = class_loader
+        self._inline_calls = inline_calls
         self._object_store = object_store.ObjectStore(class_loader)
         self._attribute_store = attribute_store.AttributeStore()
         self._root_context = class_loader.create_root_context()
@@ -50,7 +56,6 @@ class MuranoDslExecutor(object):
         self._root_context.set_data(self._object_store, '?objectStore')
         self._root_context.set_data(self._attribute_store, '?attributeStore')
         self._locks = {}
-        yaql_functions.register(self._root_context)
         self._root_context = yaql.context.Context(self._root_context)
 
     @property
@@ -108,66 +113,82 @@ class MuranoDslExecutor(object):
 
         murano_class = method.murano_class
         current_thread = eventlet.greenthread.getcurrent()
-        if not hasattr(current_thread, '_muranopl_thread_marker'):
+        thread_marker = getattr(current_thread, '_muranopl_thread_marker',
+                                None)
+        if thread_marker is None:
             thread_marker = current_thread._muranopl_thread_marker = \
-                uuid.uuid4().hex
-        else:
-            thread_marker = current_thread._muranopl_thread_marker
+                next(_thread_markers)
 
         method_id = id(body)
         this_id = this.object_id
+        lock_key = (method_id, this_id)
 
         while True:
-            event, marker = self._locks.get((method_id, this_id), (None, None))
-            if event:
-                if marker == thread_marker:
-                    return self._invoke_method_implementation_gt(
-                        body, this, params, murano_class, context)
-                event.wait()
-            else:
+            lock = self._locks.get(lock_key)
+            if lock is None:
                 break
+            if lock[0] == thread_marker:
+                return self._invoke_method_implementation_gt(
+                    body, this, params, murano_class, context)
+            if lock[1] is None:
+                lock[1] = eventlet.event.Event()
+            lock[1].wait()
+
+        # [owner thread marker, event created on first contention]
+        lock = self._locks[lock_key] = [thread_marker, None]
+        debug = LOG.isEnabledFor(logging.DEBUG)
+        if debug:
+            # noinspection PyProtectedMember
+            method_info = '{0}.{1} ({2})'.format(
+                murano_class.name, method._name, hash(lock_key))
+            # Prepare caller information
+            caller_ctx = helpers.get_caller_context(context)
+            if caller_ctx:
+                caller_info = trace.compose_stack_frame(caller_ctx)
+                LOG.debug(
+                    '{0}: Begin execution: {1} called from {2}'.format(
+                        thread_marker, method_info, trace.format_frame(
+                            caller_info)))
+            else:
+                LOG.debug(
+                    '{0}: Begin execution: {1}'.format(
+                        thread_marker, method_info))
 
-        event = eventlet.event.Event()
-        self._locks[(method_id, this_id)] = (event, thread_marker)
-        # noinspection PyProtectedMember
-        method_info = '{0}.{1} ({2})'.format(murano_class.name, method._name,
-                                             hash((method_id, this_id)))
-        # Prepare caller information
-        caller_ctx = helpers.get_caller_context(context)
-        if caller_ctx:
-            caller_info = trace.compose_stack_frame(caller_ctx)
-            LOG.debug(
-                '{0}: Begin execution: {1} called from {2}'.format(
-                    thread_marker, method_info, trace.format_frame(
-                        caller_info)))
-        else:
-            LOG.debug(
-                '{0}: Begin execution: {1}'.format(
-                    thread_marker, method_info))
-
+        depth = getattr(current_thread, '_muranopl_inline_depth', 0)
         try:
-            gt = eventlet.spawn(self._invoke_method_implementation_gt, body,
-                                this, params, murano_class, context,
-                                thread_marker)
-            result = gt.wait()
+            if self._inline_calls and depth < MAX_INLINE_DEPTH:
+                current_thread._muranopl_inline_depth = depth + 1
+                try:
+                    result = self._invoke_method_implementation_gt(
+                        body, this, params, murano_class, context)
+                finally:
+                    current_thread._muranopl_inline_depth = depth
+            else:
+                gt = eventlet.spawn(self._invoke_method_implementation_gt,
+                                    body, this, params, murano_class,
+                                    context, thread_marker)
+                result = gt.wait()
         except Exception as e:
-            LOG.debug(
-                "{0}: End execution: {1} with exception {2}".format(
-                    thread_marker, method_info, e))
+            if debug:
+                LOG.debug(
+                    "{0}: End execution: {1} with exception {2}".format(
+                        thread_marker, method_info, e))
             raise
         else:
-            LOG.debug(
-                "{0}: End execution: {1}".format(thread_marker, method_info))
+            if debug:
+                LOG.debug("{0}: End execution: {1}".format(
+                    thread_marker, method_info))
         finally:
-            del self._locks[(method_id, this_id)]
-            event.send()
+            del self._locks[lock_key]
+            if lock[1] is not None:
+                lock[1].send()
 
         return result
 
     def _invoke_method_implementation_gt(self, body, this,
                                          params, murano_class, context,
                                          thread_marker=None):
-        if thread_marker:
+        if thread_marker is not None:
             current_thread = eventlet.greenthread.getcurrent()
             current_thread._muranopl_thread_marker = thread_marker
         if callable(body):
@@ -234,20 +255,6 @@ class MuranoDslExecutor(object):
         new_context.set_data(this, '?this')
         new_context.set_data(murano_class, '?type')
         new_context.set_data(context, '?callerContext')
-
-        @yaql.context.EvalArg('obj', arg_type=murano_object.MuranoObject)
-        @yaql.context.EvalArg('property_name', arg_type=str)
-        def obj_attribution(obj, property_name):
-            return obj.get_property(property_name, murano_class)
-
-        @yaql.context.EvalArg('prefix', str)
-        @yaql.context.EvalArg('name', str)
-        def validate(prefix, name):
-            return murano_class.namespace_resolver.resolve_name(
-                '%s:%s' % (prefix, name))
-
-        new_context.register_function(obj_attribution, '#operator_.')
-        new_context.register_function(validate, '#validate')
         for key, value in kwargs.iteritems():
             new_context.set_data(value, key)
         return new_context
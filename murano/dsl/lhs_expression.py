@@ -40,7 +40,7 @@ class LhsExpression(object):
                                    yaql.expressions.Expression)):
             self._expression = expression
         else:
-            self._expression = yaql.parse(str(expression))
+            self._expression = yaql_expression.parse(str(expression))
         self._current_obj = None
         self._current_obj_name = None
 
@@ -29,24 +29,44 @@ class CodeBlock(expressions.DslExpression):
         if not isinstance(body, types.ListType):
             body = [body]
         self.code_block = map(expressions.parse_expression, body)
+        self._statements = map(_compile_statement, self.code_block)
 
     def execute(self, context, murano_class):
-        for expr in self.code_block:
-            def action():
-                try:
-                    expr.execute(context, murano_class)
-                except (dsl_exception.MuranoPlException,
-                        exceptions.InternalFlowException):
-                    raise
-                except Exception as ex:
-                    raise dsl_exception.MuranoPlException.\
-                        from_python_exception(ex, context)
-
-            if hasattr(expr, 'virtual_instruction'):
-                instruction = expr.virtual_instruction
-                helpers.execute_instruction(instruction, action, context)
-            else:
-                action()
+        for statement in self._statements:
+            statement(context, murano_class)
+
+
+def _compile_statement(expr):
+    # Statements are linked once when the class is loaded so that
+    # execution does not need to re-inspect expressions on every pass
+    execute = expr.execute
+    instruction = getattr(expr, 'virtual_instruction', None)
+
+    if instruction is None:
+        def statement(context, murano_class):
+            try:
+                execute(context, murano_class)
+            except (dsl_exception.MuranoPlException,
+                    exceptions.InternalFlowException):
+                raise
+            except Exception as ex:
+                raise dsl_exception.MuranoPlException.\
+                    from_python_exception(ex, context)
+    else:
+        def statement(context, murano_class):
+            old_instruction = context.get_data('$?currentInstruction')
+            context.set_data(instruction, '?currentInstruction')
+            try:
+                execute(context, murano_class)
+            except (dsl_exception.MuranoPlException,
+                    exceptions.InternalFlowException):
+                raise
+            except Exception as ex:
+                raise dsl_exception.MuranoPlException.\
+                    from_python_exception(ex, context)
+            context.set_data(old_instruction, '?currentInstruction')
+
+    return statement
 
 
 class MethodBlock(CodeBlock):
@@ -205,15 +225,16 @@ class MatchMacro(expressions.DslExpression):
         if not isinstance(Match, types.DictionaryType):
             raise exceptions.DslSyntaxError(
                 'Match value must be of dictionary type')
-        self._switch = Match
+        self._switch = [(key, CodeBlock(value))
+                        for key, value in Match.iteritems()]
         self._value = Value
         self._default = None if Default is None else CodeBlock(Default)
 
     def execute(self, context, murano_class):
         match_value = helpers.evaluate(self._value, context)
-        for key, value in self._switch.iteritems():
+        for key, code in self._switch:
             if key == match_value:
-                CodeBlock(value).execute(context, murano_class)
+                code.execute(context, murano_class)
                 return
         if self._default is not None:
             self._default.execute(context, murano_class)
@@ -224,25 +245,26 @@ class SwitchMacro(expressions.DslExpression):
         if not isinstance(Switch, types.DictionaryType):
             raise exceptions.DslSyntaxError(
                 'Switch value must be of dictionary type')
-        self._switch = Switch
-        for key, value in self._switch.iteritems():
+        for key in Switch.iterkeys():
             if not isinstance(key, (yaql_expression.YaqlExpression,
                                     types.BooleanType)):
                 raise exceptions.DslSyntaxError(
                     'Switch cases must be must be either '
                     'boolean or expression')
+        self._switch = [(key, CodeBlock(value))
+                        for key, value in Switch.iteritems()]
         self._default = None if Default is None else CodeBlock(Default)
 
     def execute(self, context, murano_class):
         matched = False
-        for key, value in self._switch.iteritems():
+        for key, code in self._switch:
             res = helpers.evaluate(key, context)
             if not isinstance(res, types.BooleanType):
                 raise exceptions.DslInvalidOperationError(
                     'Switch case must be evaluated to boolean type')
             if res:
                 matched = True
-                CodeBlock(value).execute(context, murano_class)
+                code.execute(context, murano_class)
 
         if self._default is not None and not matched:
             self._default.execute(context, murano_class)
@@ -14,6 +14,9 @@
 
 import collections
 import inspect
+import weakref
+
+import yaql.context
 
 import murano.dsl.exceptions as exceptions
 import murano.dsl.helpers as helpers
@@ -33,7 +36,6 @@ class MuranoClass(object):
     def __init__(self, class_loader, namespace_resolver, name, package,
                  parents=None):
         self._package = package
-        self._class_loader = class_loader
         self._methods = {}
         self._namespace_resolver = namespace_resolver
         self._name = namespace_resolver.resolve_name(name)
@@ -50,6 +52,18 @@ class MuranoClass(object):
         bases = tuple(parents_class) or (murano_object.MuranoObject,)
 
         self.object_class = type(class_name, bases, {})
+        # Python class the native implementation was imported from
+        self.native_class = None
+
+        self._children = weakref.WeakSet()
+        for parent in self._parents:
+            parent._children.add(self)
+        self._mro = None
+        self._ancestors = None
+        self._single_method_cache = {}
+        self._all_methods_cache = {}
+        self._property_cache = {}
+        self._context_functions = None
 
     @property
     def name(self):
@@ -71,12 +85,41 @@ class MuranoClass(object):
     def methods(self):
         return self._methods
 
+    @property
+    def context_functions(self):
+        """yaql function table bound to this class.
+
+        The table is shared by all local contexts that execute code of
+        the class and is built on first use.
+        """
+        if self._context_functions is None:
+            self._context_functions = self._create_context_functions()
+        return self._context_functions
+
+    def _create_context_functions(self):
+        @yaql.context.EvalArg('obj', arg_type=murano_object.MuranoObject)
+        @yaql.context.EvalArg('property_name', arg_type=str)
+        def obj_attribution(obj, property_name):
+            return obj.get_property(property_name, self)
+
+        @yaql.context.EvalArg('prefix', str)
+        @yaql.context.EvalArg('name', str)
+        def validate(prefix, name):
+            return self.namespace_resolver.resolve_name(
+                '%s:%s' % (prefix, name))
+
+        context = yaql.context.Context()
+        context.register_function(obj_attribution, '#operator_.')
+        context.register_function(validate, '#validate')
+        return context.functions
+
     def get_method(self, name):
         return self._methods.get(name)
 
     def add_method(self, name, payload):
         method = murano_method.MuranoMethod(self, name, payload)
         self._methods[name] = method
+        self._invalidate_caches()
         return method
 
     @property
@@ -87,10 +130,37 @@ class MuranoClass(object):
         if not isinstance(property_typespec, typespec.PropertySpec):
             raise TypeError('property_typespec')
         self._properties[name] = property_typespec
+        self._invalidate_caches()
 
     def get_property(self, name):
         return self._properties[name]
 
+    @property
+    def mro(self):
+        """Linearized list of this class and all of its ancestors.
+
+        Classes are listed in breadth-first order starting from this class
+        with every class appearing only once. Parents never change after
+        the class was created so the list is computed only once.
+        """
+        if self._mro is None:
+            mro = []
+            queue = collections.deque([self])
+            while queue:
+                c = queue.popleft()
+                if c not in mro:
+                    mro.append(c)
+                queue.extend(c.parents)
+            self._mro = mro
+        return self._mro
+
+    def _invalidate_caches(self):
+        self._single_method_cache.clear()
+        self._all_methods_cache.clear()
+        self._property_cache.clear()
+        for child in list(self._children):
+            child._invalidate_caches()
+
     def _find_method_chains(self, name):
         initial = [self.methods[name]] if name in self.methods else []
         yielded = False
@@ -111,6 +181,16 @@ class MuranoClass(object):
             [p.find_method(name) for p in self._parents])))
 
     def find_single_method(self, name):
+        try:
+            method, error = self._single_method_cache[name]
+        except KeyError:
+            method, error = self._resolve_single_method(name)
+            self._single_method_cache[name] = method, error
+        if error is not None:
+            raise error(name)
+        return method
+
+    def _resolve_single_method(self, name):
         chains = sorted(self._find_method_chains(name), key=lambda t: len(t))
         result = []
 
@@ -133,31 +213,26 @@ class MuranoClass(object):
             if add:
                 result.append(chains[i][0])
         if len(result) < 1:
-            raise exceptions.NoMethodFound(name)
+            return None, exceptions.NoMethodFound
         elif len(result) > 1:
-            raise exceptions.AmbiguousMethodName(name)
-        return result[0]
+            return None, exceptions.AmbiguousMethodName
+        return result[0], None
 
     def find_all_methods(self, name):
-        result = []
-        queue = collections.deque([self])
-        while queue:
-            c = queue.popleft()
-            if name in c.methods:
-                method = c.methods[name]
-                if method not in result:
-                    result.append(method)
-            queue.extend(c.parents)
+        result = self._all_methods_cache.get(name)
+        if result is None:
+            # cached result is shared by the callers
+            result = tuple(c.methods[name] for c in self.mro
+                           if name in c.methods)
+            self._all_methods_cache[name] = result
         return result
 
     def find_property(self, name):
-        result = []
-        types = collections.deque([self])
-        while len(types) > 0:
-            mc = types.popleft()
-            if name in mc.properties and mc not in result:
-                result.append(mc)
-            types.extend(mc.parents)
+        result = self._property_cache.get(name)
+        if result is None:
+            # cached result is shared by the callers
+            result = tuple(c for c in self.mro if name in c._properties)
+            self._property_cache[name] = result
         return result
 
     def invoke(self, name, executor, this, parameters):
@@ -168,13 +243,15 @@ class MuranoClass(object):
 
     def is_compatible(self, obj):
         if isinstance(obj, murano_object.MuranoObject):
-            return self.is_compatible(obj.type)
+            obj = obj.type
         if obj is self:
             return True
-        for parent in obj.parents:
-            if self.is_compatible(parent):
-                return True
-        return False
+        return self in obj._get_ancestors()
+
+    def _get_ancestors(self):
+        if self._ancestors is None:
+            self._ancestors = frozenset(self.mro)
+        return self._ancestors
 
     def new(self, owner, object_store, context, parameters=None,
             object_id=None, **kwargs):
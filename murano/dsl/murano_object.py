@@ -117,18 +117,17 @@ class MuranoObject(object):
         start_type, derived = self.__type, False
         if caller_class is not None and caller_class.is_compatible(self):
             start_type, derived = caller_class, True
-        if name in start_type.properties:
+        declared_properties = start_type.find_property(name)
+        if declared_properties and declared_properties[0] is start_type:
             return self.cast(start_type)._get_property_value(name)
+        elif len(declared_properties) == 1:
+            return self.cast(declared_properties[0]).__properties[name]
+        elif len(declared_properties) > 1:
+            raise exceptions.AmbiguousPropertyNameError(name)
+        elif derived:
+            return self.cast(caller_class)._get_property_value(name)
         else:
-            declared_properties = start_type.find_property(name)
-            if len(declared_properties) == 1:
-                return self.cast(declared_properties[0]).__properties[name]
-            elif len(declared_properties) > 1:
-                raise exceptions.AmbiguousPropertyNameError(name)
-            elif derived:
-                return self.cast(caller_class)._get_property_value(name)
-            else:
-                raise exceptions.PropertyReadError(name, start_type)
+            raise exceptions.PropertyReadError(name, start_type)
 
     def _get_property_value(self, name):
         try:
@@ -27,266 +27,365 @@ import murano.dsl.yaql_expression as yaql_expression
 NoValue = object()
 
 
+class ObjRef(object):
+    def __init__(self, object_id):
+        self.object_id = object_id
+
+
+class ContractState(object):
+    """Per-call state of a contract validation.
+
+    Contract functions are shared between all contracts and receive the
+    state of the validation being performed through the yaql context.
+    """
+
+    __slots__ = ('root_context', 'this', 'owner', 'object_store',
+                 'namespace_resolver', 'default')
+
+    def __init__(self, root_context, this, owner, object_store,
+                 namespace_resolver, default):
+        self.root_context = root_context
+        self.this = this
+        self.owner = owner
+        self.object_store = object_store
+        self.namespace_resolver = namespace_resolver
+        self.default = default
+
+
+def _get_state(context):
+    return context.get_data('$?contractState')
+
+
+@yaql.context.ContextAware()
+def _int(context, value):
+    value = value()
+    if value is NoValue:
+        value = _get_state(context).default
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except Exception:
+        raise exceptions.ContractViolationException(
+            'Value {0} violates int() contract'.format(value))
+
+
+@yaql.context.ContextAware()
+def _string(context, value):
+    value = value()
+    if value is NoValue:
+        value = _get_state(context).default
+    if value is None:
+        return None
+    try:
+        return unicode(value)
+    except Exception:
+        raise exceptions.ContractViolationException(
+            'Value {0} violates string() contract'.format(value))
+
+
+@yaql.context.ContextAware()
+def _bool(context, value):
+    value = value()
+    if value is NoValue:
+        value = _get_state(context).default
+    if value is None:
+        return None
+    return True if value else False
+
+
+def _not_null(value):
+    value = value()
+
+    if isinstance(value, ObjRef):
+        return value
+
+    if value is None:
+        raise exceptions.ContractViolationException(
+            'null value violates notNull() contract')
+    return value
+
+
+def _error():
+    raise exceptions.ContractViolationException('error() contract')
+
+
+def _check(value, predicate):
+    value = value()
+    if isinstance(value, ObjRef) or predicate(value):
+        return value
+    else:
+        raise exceptions.ContractViolationException(
+            "Value {0} doesn't match predicate".format(value))
+
+
+def _is_object_or_ref(value):
+    # murano_object imports this module so the type cannot be referenced
+    # at decoration time
+    return isinstance(value, (murano.dsl.murano_object.MuranoObject,
+                              ObjRef, types.NoneType))
+
+
+def _is_owned(obj, this):
+    p = obj.owner
+    while p is not None:
+        if p is this:
+            return True
+        p = p.owner
+    return False
+
+
+@yaql.context.EvalArg('obj', custom_validator=_is_object_or_ref)
+@yaql.context.ContextAware()
+def _owned(context, obj):
+    if isinstance(obj, ObjRef):
+        return obj
+
+    if obj is None:
+        return None
+
+    if _is_owned(obj, _get_state(context).this):
+        return obj
+
+    raise exceptions.ContractViolationException(
+        'Object {0} violates owned() contract'.format(obj.object_id))
+
+
+@yaql.context.EvalArg('obj', custom_validator=_is_object_or_ref)
+@yaql.context.ContextAware()
+def _not_owned(context, obj):
+    if isinstance(obj, ObjRef):
+        return obj
+
+    if obj is None:
+        return None
+
+    if not _is_owned(obj, _get_state(context).this):
+        return obj
+
+    raise exceptions.ContractViolationException(
+        'Object {0} violates notOwned() contract'.format(obj.object_id))
+
+
+@yaql.context.EvalArg('name', arg_type=str)
+@yaql.context.ContextAware()
+def _class(context, value, name):
+    return _class2(context, value, name, None)
+
+
+@yaql.context.EvalArg('name', arg_type=str)
+@yaql.context.EvalArg('default_name', arg_type=(str, types.NoneType))
+@yaql.context.ContextAware()
+def _class2(context, value, name, default_name):
+    state = _get_state(context)
+    namespace_resolver = state.namespace_resolver
+    object_store = state.object_store
+    name = namespace_resolver.resolve_name(name)
+    if not default_name:
+        default_name = name
+    else:
+        default_name = namespace_resolver.resolve_name(default_name)
+    value = value()
+    class_loader = murano.dsl.helpers.get_class_loader(state.root_context)
+    murano_class = class_loader.get_class(name)
+    if not murano_class:
+        raise exceptions.NoClassFound(
+            'Class {0} cannot be found'.format(name))
+    if value is None:
+        return None
+    if isinstance(value, murano.dsl.murano_object.MuranoObject):
+        obj = value
+    elif isinstance(value, types.DictionaryType):
+        if '?' not in value:
+            new_value = {'?': {
+                'id': uuid.uuid4().hex,
+                'type': default_name
+            }}
+            new_value.update(value)
+            value = new_value
+
+        obj = object_store.load(value, state.owner, state.root_context,
+                                defaults=state.default)
+    elif isinstance(value, types.StringTypes):
+        obj = object_store.get(value)
+        if obj is None:
+            if not object_store.initializing:
+                raise exceptions.NoObjectFoundError(value)
+            else:
+                return ObjRef(value)
+    else:
+        raise exceptions.ContractViolationException(
+            'Value {0} cannot be represented as class {1}'.format(
+                value, name))
+    if not murano_class.is_compatible(obj):
+        raise exceptions.ContractViolationException(
+            'Object of type {0} is not compatible with '
+            'requested type {1}'.format(obj.type.name, name))
+    return obj
+
+
+@yaql.context.EvalArg('prefix', str)
+@yaql.context.EvalArg('name', str)
+@yaql.context.ContextAware()
+def _validate(context, prefix, name):
+    return _get_state(context).namespace_resolver.resolve_name(
+        '%s:%s' % (prefix, name))
+
+
+def _create_contract_functions():
+    context = yaql.context.Context()
+    context.register_function(_validate, '#validate')
+    context.register_function(_int, 'int')
+    context.register_function(_string, 'string')
+    context.register_function(_bool, 'bool')
+    context.register_function(_check, 'check')
+    context.register_function(_not_null, 'notNull')
+    context.register_function(_error, 'error')
+    context.register_function(_class, 'class')
+    context.register_function(_class2, 'class')
+    context.register_function(_owned, 'owned')
+    context.register_function(_not_owned, 'notOwned')
+    return context.functions
+
+
+# contract function table shared by all contract contexts, must not be
+# modified after it was built
+_contract_functions = _create_contract_functions()
+
+
+class ContractContext(yaql.context.Context):
+    def __init__(self, parent_context, state):
+        # yaql contexts are old-style classes
+        yaql.context.Context.__init__(self, parent_context)
+        self.functions = _contract_functions
+        self.set_data(state, '?contractState')
+
+    def register_function(self, function, name):
+        raise TypeError('Contract function table is read-only')
+
+
 class TypeScheme(object):
-    class ObjRef(object):
-        def __init__(self, object_id):
-            self.object_id = object_id
+    ObjRef = ObjRef
 
     def __init__(self, spec):
         self._spec = spec
+        self._validator = self._compile(spec)
 
     @staticmethod
     def prepare_context(root_context, this, owner, object_store,
                         namespace_resolver, default):
-        def _int(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            try:
-                return int(value)
-            except Exception:
-                raise exceptions.ContractViolationException(
-                    'Value {0} violates int() contract'.format(value))
-
-        def _string(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            try:
-                return unicode(value)
-            except Exception:
-                raise exceptions.ContractViolationException(
-                    'Value {0} violates string() contract'.format(value))
-
-        def _bool(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            return True if value else False
-
-        def _not_null(value):
-            value = value()
+        return ContractContext(root_context, ContractState(
+            root_context, this, owner, object_store,
+            namespace_resolver, default))
 
-            if isinstance(value, TypeScheme.ObjRef):
-                return value
-
-            if value is None:
-                raise exceptions.ContractViolationException(
-                    'null value violates notNull() contract')
-            return value
+    def _compile(self, spec):
+        if isinstance(spec, yaql_expression.YaqlExpression):
+            return self._compile_expression(spec)
+        elif isinstance(spec, types.DictionaryType):
+            return self._compile_dict(spec)
+        elif isinstance(spec, types.ListType):
+            return self._compile_list(spec)
+        elif isinstance(spec, (types.IntType,
+                               types.StringTypes,
+                               types.NoneType)):
+            return self._compile_scalar(spec)
+        else:
+            return lambda data, context: None
 
-        def _error():
-            raise exceptions.ContractViolationException('error() contract')
+    def _compile_expression(self, spec):
+        def validate(data, context):
+            child_context = yaql.context.Context(parent_context=context)
+            child_context.set_data(data)
+            return spec.evaluate(context=child_context)
+        return validate
 
-        def _check(value, predicate):
-            value = value()
-            if isinstance(value, TypeScheme.ObjRef) or predicate(value):
-                return value
-            else:
-                raise exceptions.ContractViolationException(
-                    "Value {0} doesn't match predicate".format(value))
-
-        @yaql.context.EvalArg('obj', arg_type=(
-            murano.dsl.murano_object.MuranoObject,
-            TypeScheme.ObjRef,
-            types.NoneType
-        ))
-        def _owned(obj):
-            if isinstance(obj, TypeScheme.ObjRef):
-                return obj
-
-            if obj is None:
-                return None
-
-            p = obj.owner
-            while p is not None:
-                if p is this:
-                    return obj
-                p = p.owner
-
-            raise exceptions.ContractViolationException(
-                'Object {0} violates owned() contract'.format(
-                    obj.object_id))
-
-        @yaql.context.EvalArg('obj', arg_type=(
-            murano.dsl.murano_object.MuranoObject,
-            TypeScheme.ObjRef,
-            types.NoneType
-        ))
-        def _not_owned(obj):
-            if isinstance(obj, TypeScheme.ObjRef):
-                return obj
-
-            if obj is None:
-                return None
-
-            try:
-                _owned(obj)
-            except exceptions.ContractViolationException:
-                return obj
-            else:
-                raise exceptions.ContractViolationException(
-                    'Object {0} violates notOwned() contract'.format(
-                        obj.object_id))
-
-        @yaql.context.EvalArg('name', arg_type=str)
-        def _class(value, name):
-            return _class2(value, name, None)
-
-        @yaql.context.EvalArg('name', arg_type=str)
-        @yaql.context.EvalArg('default_name', arg_type=(str, types.NoneType))
-        def _class2(value, name, default_name):
-            name = namespace_resolver.resolve_name(name)
-            if not default_name:
-                default_name = name
-            else:
-                default_name = namespace_resolver.resolve_name(default_name)
-            value = value()
-            class_loader = murano.dsl.helpers.get_class_loader(root_context)
-            murano_class = class_loader.get_class(name)
-            if not murano_class:
-                raise exceptions.NoClassFound(
-                    'Class {0} cannot be found'.format(name))
-            if value is None:
-                return None
-            if isinstance(value, murano.dsl.murano_object.MuranoObject):
-                obj = value
-            elif isinstance(value, types.DictionaryType):
-                if '?' not in value:
-                    new_value = {'?': {
-                        'id': uuid.uuid4().hex,
-                        'type': default_name
-                    }}
-                    new_value.update(value)
-                    value = new_value
-
-                obj = object_store.load(value, owner, root_context,
-                                        defaults=default)
-            elif isinstance(value, types.StringTypes):
-                obj = object_store.get(value)
-                if obj is None:
-                    if not object_store.initializing:
-                        raise exceptions.NoObjectFoundError(value)
-                    else:
-                        return TypeScheme.ObjRef(value)
-            else:
-                raise exceptions.ContractViolationException(
-                    'Value {0} cannot be represented as class {1}'.format(
-                        value, name))
-            if not murano_class.is_compatible(obj):
-                raise exceptions.ContractViolationException(
-                    'Object of type {0} is not compatible with '
-                    'requested type {1}'.format(obj.type.name, name))
-            return obj
-
-        @yaql.context.EvalArg('prefix', str)
-        @yaql.context.EvalArg('name', str)
-        def _validate(prefix, name):
-            return namespace_resolver.resolve_name(
-                '%s:%s' % (prefix, name))
-
-        context = yaql.context.Context(parent_context=root_context)
-        context.register_function(_validate, '#validate')
-        context.register_function(_int, 'int')
-        context.register_function(_string, 'string')
-        context.register_function(_bool, 'bool')
-        context.register_function(_check, 'check')
-        context.register_function(_not_null, 'notNull')
-        context.register_function(_error, 'error')
-        context.register_function(_class, 'class')
-        context.register_function(_class2, 'class')
-        context.register_function(_owned, 'owned')
-        context.register_function(_not_owned, 'notOwned')
-        return context
-
-    def _map_dict(self, data, spec, context):
-        if data is None or data is NoValue:
-            data = {}
-        if not isinstance(data, types.DictionaryType):
-            raise exceptions.ContractViolationException(
-                'Supplied is not of a dictionary type')
-        if not spec:
-            return data
-        result = {}
-        yaql_key = None
+    def _compile_dict(self, spec):
+        key_validators = []
+        yaql_keys = []
         for key, value in spec.iteritems():
             if isinstance(key, yaql_expression.YaqlExpression):
-                if yaql_key is not None:
-                    raise exceptions.DslContractSyntaxError(
-                        'Dictionary contract '
-                        'cannot have more than one expression keys')
-                else:
-                    yaql_key = key
+                yaql_keys.append(key)
             else:
-                result[key] = self._map(data.get(key), value, context)
-
-        if yaql_key is not None:
-            yaql_value = spec[yaql_key]
-            for key, value in data.iteritems():
-                if key in result:
-                    continue
-                result[self._map(key, yaql_key, context)] = \
-                    self._map(value, yaql_value, context)
-
-        return result
+                key_validators.append((key, self._compile(value)))
+        if len(yaql_keys) > 1:
+            syntax_error = exceptions.DslContractSyntaxError(
+                'Dictionary contract '
+                'cannot have more than one expression keys')
+        else:
+            syntax_error = None
+        if len(yaql_keys) == 1:
+            yaql_key_validator = self._compile(yaql_keys[0])
+            yaql_value_validator = self._compile(spec[yaql_keys[0]])
+        else:
+            yaql_key_validator = yaql_value_validator = None
 
-    def _map_list(self, data, spec, context):
-        if not isinstance(data, types.ListType):
+        def validate(data, context):
             if data is None or data is NoValue:
-                data = []
-            else:
-                data = [data]
-        if len(spec) < 1:
-            return data
-        result = []
+                data = {}
+            if not isinstance(data, types.DictionaryType):
+                raise exceptions.ContractViolationException(
+                    'Supplied is not of a dictionary type')
+            if not spec:
+                return data
+            if syntax_error is not None:
+                raise syntax_error
+            result = {}
+            for key, validator in key_validators:
+                result[key] = validator(data.get(key), context)
+
+            if yaql_key_validator is not None:
+                for key, value in data.iteritems():
+                    if key in result:
+                        continue
+                    result[yaql_key_validator(key, context)] = \
+                        yaql_value_validator(value, context)
+
+            return result
+        return validate
+
+    def _compile_list(self, spec):
         shift = 0
         max_length = sys.maxint
         min_length = 0
-        if isinstance(spec[-1], types.IntType):
+        if spec and isinstance(spec[-1], types.IntType):
             min_length = spec[-1]
             shift += 1
         if len(spec) >= 2 and isinstance(spec[-2], types.IntType):
             max_length = min_length
             min_length = spec[-2]
             shift += 1
+        item_validators = map(self._compile, spec)
 
-        if not min_length <= len(data) <= max_length:
-            raise exceptions.ContractViolationException(
-                'Array length {0} is not within [{1}..{2}] range'.format(
-                    len(data), min_length, max_length))
-
-        for index, item in enumerate(data):
-            spec_item = spec[-1 - shift] \
-                if index >= len(spec) - shift else spec[index]
-            result.append(self._map(item, spec_item, context))
-        return result
-
-    def _map_scalar(self, data, spec):
-        if data != spec:
-            raise exceptions.ContractViolationException(
-                'Value {0} is not equal to {1}'.format(data, spec))
-        else:
-            return data
+        def validate(data, context):
+            if not isinstance(data, types.ListType):
+                if data is None or data is NoValue:
+                    data = []
+                else:
+                    data = [data]
+            if not item_validators:
+                return data
 
-    def _map(self, data, spec, context):
-        child_context = yaql.context.Context(parent_context=context)
-        if isinstance(spec, yaql_expression.YaqlExpression):
-            child_context.set_data(data)
-            return spec.evaluate(context=child_context)
-        elif isinstance(spec, types.DictionaryType):
-            return self._map_dict(data, spec, child_context)
-        elif isinstance(spec, types.ListType):
-            return self._map_list(data, spec, child_context)
-        elif isinstance(spec, (types.IntType,
-                               types.StringTypes,
-                               types.NoneType)):
-            return self._map_scalar(data, spec)
+            if not min_length <= len(data) <= max_length:
+                raise exceptions.ContractViolationException(
+                    'Array length {0} is not within [{1}..{2}] range'.format(
+                        len(data), min_length, max_length))
+
+            result = []
+            for index, item in enumerate(data):
+                validator = item_validators[-1 - shift] \
+                    if index >= len(spec) - shift else item_validators[index]
+                result.append(validator(item, context))
+            return result
+        return validate
+
+    def _compile_scalar(self, spec):
+        def validate(data, context):
+            if data != spec:
+                raise exceptions.ContractViolationException(
+                    'Value {0} is not equal to {1}'.format(data, spec))
+            else:
+                return data
+        return validate
 
     def __call__(self, data, context, this, owner, object_store,
                  namespace_resolver, default):
@@ -299,4 +398,4 @@ class TypeScheme(object):
 
         context = self.prepare_context(
             context, this, owner, object_store, namespace_resolver, default)
-        return self._map(data, self._spec, context)
+        return self._validator(data, context)
@@ -12,7 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import re
+import threading
 import types
 
 import yaql
@@ -20,11 +22,88 @@ import yaql.exceptions
 import yaql.expressions
 
 
+PARSE_CACHE_SIZE = 16384
+
+
+class ParsedExpressionCache(object):
+    """Bounded LRU cache of parsed YAQL expressions keyed by source text.
+
+    Parsed expression trees are not modified during evaluation so they
+    can be shared between all YaqlExpression instances and tasks.
+    Grammar and lexical errors are cached as well so that strings that
+    are not expressions are rejected by match() without re-parsing.
+    """
+
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def __len__(self):
+        return len(self._cache)
+
+    def parse(self, expression):
+        if isinstance(expression, types.UnicodeType):
+            # unicode and str keys of the same ASCII text collide in the
+            # cache while producing trees with differently typed constants
+            try:
+                expression = str(expression)
+            except UnicodeEncodeError:
+                pass
+        with self._lock:
+            result = self._cache.pop(expression, None)
+            if result is not None:
+                self._cache[expression] = result
+                self._hits += 1
+            else:
+                self._misses += 1
+        if result is None:
+            try:
+                result = yaql.parse(expression)
+            except (yaql.exceptions.YaqlGrammarException,
+                    yaql.exceptions.YaqlLexicalException) as e:
+                result = e
+            with self._lock:
+                self._cache[expression] = result
+                while len(self._cache) > self._capacity:
+                    self._cache.popitem(last=False)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+parse_cache = ParsedExpressionCache(PARSE_CACHE_SIZE)
+
+
+def parse(expression):
+    return parse_cache.parse(expression)
+
+
 class YaqlExpression(object):
     def __init__(self, expression):
         if isinstance(expression, types.StringTypes):
             self._expression = str(expression)
-            self._parsed_expression = yaql.parse(self._expression)
+            self._parsed_expression = parse(self._expression)
             self._file_position = None
         elif isinstance(expression, YaqlExpression):
             self._expression = expression._expression
@@ -62,7 +141,7 @@ class YaqlExpression(object):
         if re.match('^[\s\w\d.:]*$', expr):
             return False
         try:
-            yaql.parse(expr)
+            parse(expr)
             return True
         except yaql.exceptions.YaqlGrammarException:
             return False
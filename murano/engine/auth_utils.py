@@ -36,6 +36,11 @@ def get_client_for_admin(project_name):
     return _admin_client(project_name=project_name)
 
 
+def get_client_for_service():
+    settings = _get_keystone_settings()
+    return _admin_client(project_name=settings['project_name'])
+
+
 def _admin_client(trust_id=None, project_name=None):
     settings = _get_keystone_settings()
 
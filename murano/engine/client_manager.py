@@ -30,6 +30,30 @@ from murano.engine import auth_utils
 from murano.engine import environment
 
 
+def _create_murano_client(keystone_client, auth_token):
+    murano_settings = config.CONF.murano
+
+    murano_url = \
+        murano_settings.url or keystone_client.service_catalog.url_for(
+            service_type='application_catalog',
+            endpoint_type=murano_settings.endpoint_type)
+
+    return muranoclient.Client(
+        endpoint=murano_url,
+        key_file=murano_settings.key_file or None,
+        cacert=murano_settings.cacert or None,
+        cert_file=murano_settings.cert_file or None,
+        insecure=murano_settings.insecure,
+        auth_url=keystone_client.auth_url,
+        token=auth_token)
+
+
+def get_service_murano_client():
+    """Murano client authenticated with the engine service credentials."""
+    keystone_client = auth_utils.get_client_for_service()
+    return _create_murano_client(keystone_client, keystone_client.auth_token)
+
+
 class ClientManager(object):
     def __init__(self):
         self._trusts_keystone_client = None
@@ -128,24 +152,8 @@ class ClientManager(object):
         if not config.CONF.engine.use_trusts:
             use_trusts = False
 
-        def factory(keystone_client, auth_token):
-            murano_settings = config.CONF.murano
-
-            murano_url = \
-                murano_settings.url or keystone_client.service_catalog.url_for(
-                    service_type='application_catalog',
-                    endpoint_type=murano_settings.endpoint_type)
-
-            return muranoclient.Client(
-                endpoint=murano_url,
-                key_file=murano_settings.key_file or None,
-                cacert=murano_settings.cacert or None,
-                cert_file=murano_settings.cert_file or None,
-                insecure=murano_settings.insecure,
-                auth_url=keystone_client.auth_url,
-                token=auth_token)
-
-        return self._get_client(context, 'murano', use_trusts, factory)
+        return self._get_client(context, 'murano', use_trusts,
+                                _create_murano_client)
 
     def get_mistral_client(self, context, use_trusts=True):
         if not mistralclient:
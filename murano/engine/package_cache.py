@@ -0,0 +1,413 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import atexit
+import collections
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+from eventlet import semaphore
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where directories with open files cannot be renamed, so
+    # package directories in use are not removed anyway
+    fcntl = None
+
+from murano.common import config
+from murano.engine import yaql_yaml_loader
+from murano.openstack.common import log as logging
+from murano.packages import exceptions as pkg_exc
+from murano.packages import load_utils
+
+LOG = logging.getLogger(__name__)
+
+_CACHE = None
+
+ARCHIVE_NAME = 'package.zip'
+COMPILED_CLASSES_NAME = 'classes.json'
+LOCK_NAME = '.lock'
+TEMPORARY_PREFIX = 'tmp-'
+
+
+class _CacheEntry(object):
+    def __init__(self, package, directory, size, lock):
+        self.package = package
+        self.directory = directory
+        self.size = size
+        self.lock = lock
+        self.references = 0
+        self.stale = False
+
+
+class _DirectoryLock(object):
+    """Lock of a package directory shared by the processes using it.
+
+    Every process using a package directory holds a shared lock of the
+    lock file in it. The directory is removed by the process that gets an
+    exclusive lock, i.e. the last one using it, whichever has created it.
+    The directory is renamed before removal, so that no other process
+    finds a partially removed package.
+    """
+
+    def __init__(self, directory, lock_file):
+        self._directory = directory
+        self._lock_file = lock_file
+
+    @classmethod
+    def acquire(cls, directory):
+        """Returns lock of directory or None if it is being removed."""
+        path = os.path.join(directory, LOCK_NAME)
+        lock_file = None
+        try:
+            lock_file = open(path, 'a')
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            # the directory may have been renamed for removal meanwhile
+            if os.fstat(lock_file.fileno()).st_ino != os.stat(path).st_ino:
+                lock_file.close()
+                return None
+        except (IOError, OSError):
+            if lock_file is not None:
+                lock_file.close()
+            return None
+        return cls(directory, lock_file)
+
+    def remove(self):
+        """Releases the lock, removing the directory if it is not used.
+
+        :return: whether the directory was removed
+        """
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                # open files prevent the rename on Windows
+                self._lock_file.close()
+            removed = os.path.join(os.path.dirname(self._directory),
+                                   TEMPORARY_PREFIX + uuid.uuid4().hex)
+            os.rename(self._directory, removed)
+        except (IOError, OSError):
+            # used by other processes
+            return False
+        finally:
+            self._lock_file.close()
+        shutil.rmtree(removed, ignore_errors=True)
+        return True
+
+
+class PackageCache(object):
+    """Process-wide cache of packages downloaded from the catalog.
+
+    Packages are keyed by package id and version (the catalog 'updated'
+    timestamp), so an updated package is never served from a stale entry.
+    Package archives are kept on disk and read without extraction. Entries
+    that are not referenced by any running task are evicted in LRU order
+    once the total size of the cache exceeds the configured limit. When the
+    cache is persistent the stored archives are reused after a restart.
+
+    A persistent cache directory may be shared by several engine processes.
+    Package directories found in it count towards the size of the cache
+    and are evicted first, oldest first. A package directory is only
+    removed once no process uses it, see _DirectoryLock.
+    """
+
+    def __init__(self, directory, max_size, persistent=False):
+        self._directory = os.path.abspath(directory)
+        self._max_size = max_size
+        self._persistent = persistent
+        self._entries = collections.OrderedDict()
+        # sizes of package directories found on disk by their paths
+        self._disk_entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = semaphore.Semaphore()
+        self._key_locks = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        if not os.path.isdir(self._directory):
+            os.makedirs(self._directory)
+        LOG.debug('Package cache is located at: {0}'.format(self._directory))
+        if persistent:
+            self._find_disk_entries()
+            self._evict()
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def evictions(self):
+        return self._evictions
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'size': self._size,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions
+        }
+
+    def acquire(self, package_id, version, download,
+                download_compiled=None):
+        """Returns package and marks it as used until released.
+
+        :param download: callable returning package archive data, called
+                         only when the package is not in the cache
+        :param download_compiled: optional callable returning pre-parsed
+                                  package classes or None, called together
+                                  with download
+        """
+        key = (package_id, version)
+        package = self._reference(key)
+        if package is not None:
+            return package
+
+        with self._get_key_lock(key):
+            package = self._reference(key)
+            if package is not None:
+                return package
+            directory = self._get_package_directory(package_id, version)
+            package = None
+            lock = None
+            if os.path.isdir(directory):
+                lock = _DirectoryLock.acquire(directory)
+                if lock is not None:
+                    package = self._load(directory)
+                    if package is None:
+                        lock.remove()
+                        lock = None
+            if package is None:
+                with self._lock:
+                    self._misses += 1
+                try:
+                    package = self._download(
+                        directory, download, download_compiled)
+                except Exception:
+                    with self._lock:
+                        self._key_locks.pop(key, None)
+                    raise
+                # None if the package is read from a temporary copy that
+                # has been removed already
+                lock = _DirectoryLock.acquire(directory)
+            else:
+                with self._lock:
+                    self._hits += 1
+            self._add(key, package, directory, lock)
+            return package
+
+    def release(self, package_id, version):
+        with self._lock:
+            key = (package_id, version)
+            entry = self._entries.get(key)
+            if entry is not None and entry.references > 0:
+                entry.references -= 1
+                if entry.stale and not entry.references:
+                    self._remove(key)
+            self._evict()
+
+    def _reference(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            entry.references += 1
+            self._hits += 1
+            return entry.package
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = semaphore.Semaphore()
+            return lock
+
+    def _get_package_directory(self, package_id, version):
+        return os.path.join(self._directory, package_id,
+                            hashlib.md5(str(version)).hexdigest())
+
+    def _load(self, directory):
+        compiled = None
+        compiled_path = os.path.join(directory, COMPILED_CLASSES_NAME)
+        if os.path.isfile(compiled_path):
+            with open(compiled_path) as f:
+                compiled = f.read()
+        try:
+            return load_utils.load_from_file(
+                os.path.join(directory, ARCHIVE_NAME),
+                loader=yaql_yaml_loader.YaqlYamlLoader,
+                compiled_classes=compiled)
+        except pkg_exc.PackageLoadError:
+            LOG.exception('Unable to load package from cache')
+            return None
+
+    def _find_disk_entries(self):
+        directories = []
+        for package_id in os.listdir(self._directory):
+            package_dir = os.path.join(self._directory, package_id)
+            if not os.path.isdir(package_dir):
+                continue
+            for name in os.listdir(package_dir):
+                directory = os.path.join(package_dir, name)
+                if (not name.startswith(TEMPORARY_PREFIX) and
+                        os.path.isdir(directory)):
+                    directories.append(
+                        (os.path.getmtime(directory), directory))
+        for _, directory in sorted(directories):
+            size = _get_directory_size(directory)
+            self._disk_entries[directory] = size
+            self._size += size
+
+    def _download(self, directory, download, download_compiled=None):
+        """Stores downloaded package in directory and returns it."""
+        package_data = download()
+        compiled = download_compiled() if download_compiled else None
+        parent = os.path.dirname(directory)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        # store the archive next to the final location and rename so that a
+        # partially written package is never visible in the cache
+        target_dir = os.path.join(parent,
+                                  TEMPORARY_PREFIX + uuid.uuid4().hex)
+        try:
+            os.mkdir(target_dir)
+            archive_path = os.path.join(target_dir, ARCHIVE_NAME)
+            with open(archive_path, 'wb') as f:
+                f.write(package_data)
+            if compiled:
+                with open(os.path.join(target_dir, COMPILED_CLASSES_NAME),
+                          'wb') as f:
+                    f.write(compiled)
+            # the archive is mapped into memory, so it stays readable after
+            # the directory is renamed or removed
+            package = load_utils.load_from_file(
+                archive_path, loader=yaql_yaml_loader.YaqlYamlLoader,
+                compiled_classes=compiled)
+        except Exception:
+            shutil.rmtree(target_dir, ignore_errors=True)
+            raise
+        try:
+            os.rename(target_dir, directory)
+        except OSError:
+            # another process has put the same package into the cache, the
+            # package read from the temporary copy stays usable
+            shutil.rmtree(target_dir, ignore_errors=True)
+        return package
+
+    def _add(self, key, package, directory, lock):
+        size = _get_directory_size(directory) if lock is not None else 0
+        entry = _CacheEntry(package, directory, size, lock)
+        entry.references = 1
+        with self._lock:
+            self._size -= self._disk_entries.pop(directory, 0)
+            self._entries[key] = entry
+            self._size += entry.size
+            self._key_locks.pop(key, None)
+            # previous versions of the package cannot be requested anymore
+            for other_key, other in self._entries.items():
+                if other_key[0] == key[0] and other_key != key:
+                    if other.references:
+                        other.stale = True
+                    else:
+                        self._remove(other_key)
+            package_dir = os.path.dirname(directory)
+            for other_dir in self._disk_entries.keys():
+                if os.path.dirname(other_dir) == package_dir:
+                    self._remove_disk_entry(other_dir)
+            self._evict()
+
+    def _evict(self):
+        if self._size <= self._max_size:
+            return
+        for directory in self._disk_entries.keys():
+            if self._size <= self._max_size:
+                return
+            self._remove_disk_entry(directory)
+            self._evictions += 1
+        for key, entry in self._entries.items():
+            if self._size <= self._max_size:
+                break
+            if not entry.references:
+                self._remove(key)
+                self._evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        if entry.lock is not None:
+            entry.lock.remove()
+        LOG.debug('Package {0} version {1} removed from cache'.format(*key))
+
+    def _remove_disk_entry(self, directory):
+        self._size -= self._disk_entries.pop(directory)
+        lock = _DirectoryLock.acquire(directory)
+        if lock is not None:
+            lock.remove()
+        LOG.debug('Package directory {0} removed from cache'.format(
+            directory))
+
+    def clear(self):
+        with self._lock:
+            for key, entry in self._entries.items():
+                if not entry.references:
+                    self._remove(key)
+
+
+def _get_directory_size(directory):
+    size = 0
+    for root, dirs, files in os.walk(directory):
+        for f in files:
+            try:
+                size += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return size
+
+
+def get_cache():
+    global _CACHE
+
+    if _CACHE is None:
+        opts = config.CONF.packages_opts
+        base_directory = (
+            opts.packages_cache or
+            os.path.join(tempfile.gettempdir(), 'murano-packages-cache')
+        )
+        if not opts.persistent_packages_cache:
+            # non-persistent caches are private to the engine process
+            base_directory = os.path.join(base_directory, str(uuid.uuid4()))
+        _CACHE = PackageCache(base_directory,
+                              opts.packages_cache_size * 1024 * 1024,
+                              opts.persistent_packages_cache)
+        if not opts.persistent_packages_cache:
+            atexit.register(shutil.rmtree, base_directory, True)
+    return _CACHE
@@ -16,13 +16,17 @@
 import json
 import os.path
 import sys
+import types
+import weakref
 
+import eventlet
 from oslo.config import cfg
 import yaml
 
 from murano.dsl import class_loader
 from murano.dsl import exceptions
 from murano.dsl import murano_package
+from murano.dsl import namespace_resolver
 from murano.engine.system import yaql_functions
 from murano.openstack.common import log as logging
 from murano.packages import exceptions as pkg_exceptions
@@ -30,6 +34,12 @@ from murano.packages import exceptions as pkg_exceptions
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+# MuranoClass objects built from package classes, shared by the loaders of
+# all tasks. Packages are cached by id and version, so a package updated in
+# the catalog comes as a new object and its classes are built again, while
+# classes of evicted packages are released together with the package.
+_shared_classes = weakref.WeakKeyDictionary()
+
 
 class PackageClassLoader(class_loader.MuranoClassLoader):
     def __init__(self, package_loader):
@@ -37,6 +47,32 @@ class PackageClassLoader(class_loader.MuranoClassLoader):
         self._class_packages = {}
         super(PackageClassLoader, self).__init__()
 
+    def get_class(self, name, create_missing=False):
+        if name in self._loaded_types:
+            return self._loaded_types[name]
+        try:
+            package = self._get_package_for(name)
+        except Exception:
+            package = None
+        if package is None:
+            return super(PackageClassLoader, self).get_class(
+                name, create_missing)
+
+        classes = _shared_classes.get(package)
+        type_obj = classes.get(name) if classes else None
+        # a class may only be reused if none of its ancestors was changed
+        if type_obj is not None and all(
+                self.get_class(parent.name) is parent
+                for parent in type_obj.parents):
+            self._loaded_types[name] = type_obj
+            return type_obj
+
+        type_obj = super(PackageClassLoader, self).get_class(
+            name, create_missing)
+        if type_obj.package is not None:
+            _shared_classes.setdefault(package, {})[name] = type_obj
+        return type_obj
+
     def _get_package_for(self, class_name):
         package = self._class_packages.get(class_name, None)
         if package is None:
@@ -46,6 +82,63 @@ class PackageClassLoader(class_loader.MuranoClassLoader):
                     self._class_packages[cn] = package
         return package
 
+    def prefetch(self, class_names, pool_size):
+        """Resolves packages for classes and their ancestors concurrently.
+
+        Failures are ignored here: classes that could not be prefetched are
+        loaded lazily and report their errors as usual.
+        """
+        pool = eventlet.GreenPool(pool_size)
+        seen = set()
+        pending = set(class_names)
+        while pending:
+            seen.update(pending)
+            # classes of fetched packages are not downloaded again, but
+            # their parents may still live in other packages
+            names = [name for name in pending
+                     if name not in self._class_packages]
+            known = pending.difference(names)
+            pending = set()
+            for name in known:
+                pending.update(self._get_parent_names(
+                    self._class_packages[name], name))
+            try:
+                self.package_loader.resolve_classes(names)
+            except Exception as e:
+                LOG.debug('Unable to resolve classes {0}: {1}'.format(
+                    names, e))
+            for name, package in pool.imap(self._fetch_package, names):
+                if package is None:
+                    continue
+                for cn in package.classes:
+                    self._class_packages.setdefault(cn, package)
+                pending.update(self._get_parent_names(package, name))
+            pending -= seen
+
+    def _fetch_package(self, class_name):
+        try:
+            return class_name, self.package_loader.get_package_by_class(
+                class_name)
+        except Exception as e:
+            LOG.debug('Unable to prefetch package for class {0}: '
+                      '{1}'.format(class_name, e))
+            return class_name, None
+
+    @staticmethod
+    def _get_parent_names(package, class_name):
+        try:
+            data = package.get_class(class_name)
+            ns_resolver = namespace_resolver.NamespaceResolver(
+                dict(data.get('Namespaces') or {}))
+            parent_names = data.get('Extends') or []
+            if not isinstance(parent_names, types.ListType):
+                parent_names = [parent_names]
+            return [ns_resolver.resolve_name(name) for name in parent_names]
+        except Exception as e:
+            LOG.debug('Unable to get parent classes of {0}: '
+                      '{1}'.format(class_name, e))
+            return []
+
     def load_definition(self, name):
         try:
             package = self._get_package_for(name)
@@ -69,8 +162,8 @@ class PackageClassLoader(class_loader.MuranoClassLoader):
         app_pkg = self._get_package_for(class_name)
         return None if app_pkg is None else app_pkg.full_name
 
-    def create_root_context(self):
-        context = super(PackageClassLoader, self).create_root_context()
+    def create_base_context(self):
+        context = super(PackageClassLoader, self).create_base_context()
         yaql_functions.register(context)
         return context
 
@@ -14,17 +14,15 @@
 # limitations under the License.
 
 import abc
+import collections
 import os
-import shutil
 import sys
-import tempfile
-import uuid
 
 from muranoclient.common import exceptions as muranoclient_exc
 import six
 
-from murano.common import config
 from murano.dsl import exceptions
+from murano.engine import package_cache
 from murano.engine import yaql_yaml_loader
 from murano.openstack.common import log as logging
 from murano.packages import exceptions as pkg_exc
@@ -32,6 +30,9 @@ from murano.packages import load_utils
 
 LOG = logging.getLogger(__name__)
 
+PackageDefinition = collections.namedtuple(
+    'PackageDefinition', ['id', 'fully_qualified_name', 'updated'])
+
 
 class PackageLoader(six.with_metaclass(abc.ABCMeta)):
     @abc.abstractmethod
@@ -42,13 +43,40 @@ class PackageLoader(six.with_metaclass(abc.ABCMeta)):
     def get_package_by_class(self, name):
         pass
 
+    def resolve_classes(self, names):
+        """Hint that packages for the classes are going to be requested."""
+        pass
+
 
 class ApiPackageLoader(PackageLoader):
     def __init__(self, murano_client_factory):
-        self._cache_directory = self._get_cache_directory()
+        self._cache = package_cache.get_cache()
         self._murano_client_factory = murano_client_factory
+        self._acquired = []
+        self._class_definitions = {}
+
+    def resolve_classes(self, names):
+        names = [name for name in names
+                 if name not in self._class_definitions]
+        if not names:
+            return
+        try:
+            resp, body = self._murano_client_factory().json_request(
+                'POST', '/v1/catalog/packages/resolve',
+                body={'class_names': names})
+        except muranoclient_exc.HTTPException:
+            LOG.debug('Failed to resolve classes in the repository, '
+                      'falling back to per-class lookup')
+            return
+        for class_name, package in body['classes'].iteritems():
+            self._class_definitions[class_name] = PackageDefinition(
+                package['id'], package['fully_qualified_name'],
+                package['updated'])
 
     def get_package_by_class(self, name):
+        package_definition = self._class_definitions.get(name)
+        if package_definition is not None:
+            return self._get_package_by_definition(package_definition)
         filter_opts = {'class_name': name, 'limit': 1}
         try:
             package_definition = self._get_definition(filter_opts)
@@ -66,19 +94,6 @@ class ApiPackageLoader(PackageLoader):
             raise exceptions.NoPackageFound(name), None, exc_info[2]
         return self._get_package_by_definition(package_definition)
 
-    @staticmethod
-    def _get_cache_directory():
-        base_directory = (
-            config.CONF.packages_opts.packages_cache or
-            os.path.join(tempfile.gettempdir(), 'murano-packages-cache')
-        )
-        directory = os.path.abspath(os.path.join(base_directory,
-                                                 str(uuid.uuid4())))
-        os.makedirs(directory)
-
-        LOG.debug('Cache for package loader is located at: %s' % directory)
-        return directory
-
     def _get_definition(self, filter_opts):
         try:
             packages = self._murano_client_factory().packages.filter(
@@ -97,50 +112,46 @@ class ApiPackageLoader(PackageLoader):
 
     def _get_package_by_definition(self, package_def):
         package_id = package_def.id
-        package_name = package_def.fully_qualified_name
-        package_directory = os.path.join(self._cache_directory, package_name)
+        version = getattr(package_def, 'updated', None)
 
-        if os.path.exists(package_directory):
+        def download():
             try:
-                return load_utils.load_from_dir(
-                    package_directory, preload=True,
-                    loader=yaql_yaml_loader.YaqlYamlLoader)
-            except pkg_exc.PackageLoadError:
-                LOG.exception('Unable to load package from cache. Clean-up...')
-                shutil.rmtree(package_directory, ignore_errors=True)
-        try:
-            package_data = self._murano_client_factory().packages.download(
-                package_id)
-        except muranoclient_exc.HTTPException as e:
-            msg = 'Error loading package id {0}: {1}'.format(
-                package_id, str(e)
-            )
-            exc_info = sys.exc_info()
-            raise pkg_exc.PackageLoadError(msg), None, exc_info[2]
-        package_file = None
+                return self._murano_client_factory().packages.download(
+                    package_id)
+            except muranoclient_exc.HTTPException as e:
+                msg = 'Error loading package id {0}: {1}'.format(
+                    package_id, str(e)
+                )
+                exc_info = sys.exc_info()
+                raise pkg_exc.PackageLoadError(msg), None, exc_info[2]
+
+        def download_compiled():
+            # compiled classes are optional, the package is parsed from its
+            # archive whenever they cannot be obtained
+            try:
+                resp, body_iter = self._murano_client_factory().raw_request(
+                    'GET', '/v1/catalog/packages/{0}/classes'.format(
+                        package_id))
+                return ''.join(body_iter)
+            except Exception:
+                LOG.debug('There are no compiled classes for package '
+                          '{0}'.format(package_id), exc_info=True)
+                return None
+
         try:
-            with tempfile.NamedTemporaryFile(delete=False) as package_file:
-                package_file.write(package_data)
-
-            return load_utils.load_from_file(
-                package_file.name,
-                target_dir=package_directory,
-                drop_dir=False,
-                loader=yaql_yaml_loader.YaqlYamlLoader
-            )
+            package = self._cache.acquire(package_id, version, download,
+                                          download_compiled)
         except IOError:
             msg = 'Unable to extract package data for %s' % package_id
             exc_info = sys.exc_info()
             raise pkg_exc.PackageLoadError(msg), None, exc_info[2]
-        finally:
-            try:
-                if package_file:
-                    os.remove(package_file.name)
-            except OSError:
-                pass
+        self._acquired.append((package_id, version))
+        return package
 
     def cleanup(self):
-        shutil.rmtree(self._cache_directory, ignore_errors=True)
+        while self._acquired:
+            self._cache.release(*self._acquired.pop())
+        LOG.debug('Package cache stats: {0}'.format(self._cache.stats()))
 
     def __enter__(self):
         return self
@@ -159,6 +170,10 @@ class DirectoryPackageLoader(PackageLoader):
 
         self._build_index()
 
+    @property
+    def packages(self):
+        return self._packages_by_name.values()
+
     def get_package(self, name):
         return self._packages_by_name.get(name)
 
@@ -185,3 +200,41 @@ class DirectoryPackageLoader(PackageLoader):
             self._packages_by_name[package.full_name] = package
 
             self._processed_entries.add(entry)
+
+
+class CombinedPackageLoader(PackageLoader):
+    """Serves local packages first and falls back to the catalog."""
+
+    def __init__(self, api_loader, local_loaders):
+        self._api_loader = api_loader
+        self._local_loaders = local_loaders
+
+    def get_package(self, name):
+        for loader in self._local_loaders:
+            package = loader.get_package(name)
+            if package is not None:
+                return package
+        return self._api_loader.get_package(name)
+
+    def get_package_by_class(self, name):
+        for loader in self._local_loaders:
+            package = loader.get_package_by_class(name)
+            if package is not None:
+                return package
+        return self._api_loader.get_package_by_class(name)
+
+    def resolve_classes(self, names):
+        names = [name for name in names if not any(
+            loader.get_package_by_class(name) is not None
+            for loader in self._local_loaders)]
+        self._api_loader.resolve_classes(names)
+
+    def cleanup(self):
+        self._api_loader.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+        return False
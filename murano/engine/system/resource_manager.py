@@ -17,6 +17,7 @@ import json as jsonlib
 import yaml as yamllib
 
 import murano.dsl.helpers as helpers
+import murano.dsl.murano_class as murano_class
 import murano.dsl.murano_object as murano_object
 
 if hasattr(yamllib, 'CSafeLoader'):
@@ -39,15 +40,15 @@ yaml_loader.add_constructor(u'tag:yaml.org,2002:timestamp',
                             _construct_yaml_str)
 
 
+@murano_class.classname('io.murano.system.Resources')
 class ResourceManager(murano_object.MuranoObject):
-    def initialize(self, package_loader, _context):
-        murano_class = helpers.get_type(_context)
-        self._package = package_loader.get_package(murano_class.package.name)
+    def initialize(self, _context):
+        package_name = helpers.get_type(_context).package.name
+        package_loader = helpers.get_class_loader(_context).package_loader
+        self._package = package_loader.get_package(package_name)
 
     def string(self, name):
-        path = self._package.get_resource(name)
-        with open(path) as file:
-            return file.read()
+        return self._package.read_resource(name)
 
     def json(self, name):
         return jsonlib.loads(self.string(name))
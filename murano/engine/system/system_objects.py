@@ -15,7 +15,6 @@
 
 import inspect
 
-from murano.dsl import murano_class
 from murano.engine.system import agent
 from murano.engine.system import agent_listener
 from murano.engine.system import heat_stack
@@ -36,19 +35,13 @@ def _auto_register(class_loader):
                     class_loader.import_class(class_def)
 
 
-def register(class_loader, package_loader):
+def register(class_loader):
     _auto_register(class_loader)
 
-    @murano_class.classname('io.murano.system.Resources')
-    class ResourceManagerWrapper(resource_manager.ResourceManager):
-        def initialize(self, _context):
-            super(ResourceManagerWrapper, self).initialize(
-                package_loader, _context)
-
     class_loader.import_class(agent.Agent)
     class_loader.import_class(agent_listener.AgentListener)
     class_loader.import_class(heat_stack.HeatStack)
-    class_loader.import_class(ResourceManagerWrapper)
+    class_loader.import_class(resource_manager.ResourceManager)
     class_loader.import_class(instance_reporter.InstanceReportNotifier)
     class_loader.import_class(status_reporter.StatusReporter)
     class_loader.import_class(net_explorer.NetworkExplorer)
@@ -16,6 +16,7 @@
 import yaml
 import yaml.composer
 import yaml.constructor
+import yaml.resolver
 
 from murano.dsl import yaql_expression
 
@@ -33,8 +34,18 @@ class MuranoPlYamlConstructor(yaml.constructor.Constructor):
         data.update(value)
 
 
-class YaqlYamlLoader(yaml.Loader, MuranoPlYamlConstructor):
-    pass
+if hasattr(yaml, 'CParser'):
+    # libyaml based parser; marks of the nodes it produces carry the same
+    # position information as the pure-Python ones
+    class YaqlYamlLoader(yaml.CParser, MuranoPlYamlConstructor,
+                         yaml.resolver.Resolver):
+        def __init__(self, stream):
+            yaml.CParser.__init__(self, stream)
+            MuranoPlYamlConstructor.__init__(self)
+            yaml.resolver.Resolver.__init__(self)
+else:
+    class YaqlYamlLoader(yaml.Loader, MuranoPlYamlConstructor):
+        pass
 
 
 YaqlYamlLoader.add_constructor(u'tag:yaml.org,2002:map',
@@ -43,20 +54,53 @@ YaqlYamlLoader.add_constructor(u'tag:yaml.org,2002:map',
 
 # workaround for PyYAML bug: http://pyyaml.org/ticket/221
 resolvers = {}
-for k, v in yaml.Loader.yaml_implicit_resolvers.items():
+for k, v in yaml.resolver.Resolver.yaml_implicit_resolvers.items():
     resolvers[k] = v[:]
 YaqlYamlLoader.yaml_implicit_resolvers = resolvers
 
 
+class NodePosition(yaql_expression.YaqlExpressionFilePosition):
+    """File position that is derived from node marks only when requested.
+
+    Positions are built for every mapping and expression of a class but are
+    read only to report errors, so the marks are kept as they are.
+    """
+
+    def __init__(self, start_mark, end_mark):
+        self._start_mark = start_mark
+        self._end_mark = end_mark
+
+    @property
+    def file_path(self):
+        return self._start_mark.name
+
+    @property
+    def start_line(self):
+        return self._start_mark.line + 1
+
+    @property
+    def start_column(self):
+        return self._start_mark.column + 1
+
+    @property
+    def start_index(self):
+        return self._start_mark.index
+
+    @property
+    def end_line(self):
+        return self._end_mark.line + 1
+
+    @property
+    def end_column(self):
+        return self._end_mark.column + 1
+
+    @property
+    def length(self):
+        return self._end_mark.index - self._start_mark.index
+
+
 def build_position(node):
-    return yaql_expression.YaqlExpressionFilePosition(
-        node.start_mark.name,
-        node.start_mark.line + 1,
-        node.start_mark.column + 1,
-        node.start_mark.index,
-        node.end_mark.line + 1,
-        node.end_mark.column + 1,
-        node.end_mark.index - node.start_mark.index)
+    return NodePosition(node.start_mark, node.end_mark)
 
 
 def yaql_constructor(loader, node):
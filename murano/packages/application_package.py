@@ -15,10 +15,12 @@
 
 import imghdr
 import io
+import mmap
 import os
 import sys
 import zipfile
 
+from murano.packages import compiled_classes
 import murano.packages.exceptions as e
 
 
@@ -28,10 +30,105 @@ class PackageTypes(object):
     ALL = [Library, Application]
 
 
+class DirectorySource(object):
+    """Package files stored in a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def exists(self, *path):
+        return os.path.isfile(os.path.join(self.directory, *path))
+
+    def open(self, *path):
+        return open(os.path.join(self.directory, *path))
+
+    def read(self, *path):
+        with self.open(*path) as stream:
+            return stream.read()
+
+    def get_path(self, *path):
+        return os.path.join(self.directory, *path)
+
+    @property
+    def blob(self):
+        return _pack_dir(self.directory)
+
+
+class ZipSource(object):
+    """Package files read directly from a zip archive.
+
+    The archive is either kept in memory or mapped from a file, and the
+    original archive bytes are used as the package blob.
+    """
+
+    def __init__(self, data=None, archive_path=None):
+        if archive_path is not None:
+            with open(archive_path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = data
+        self._zip = zipfile.ZipFile(_ArchiveReader(data))
+        self._names = {}
+        for info in self._zip.infolist():
+            name = info.filename.replace('\\', '/')
+            while name.startswith('./'):
+                name = name[2:]
+            if not name.endswith('/'):
+                self._names[name] = info
+
+    def exists(self, *path):
+        return '/'.join(path) in self._names
+
+    def open(self, *path):
+        return self._zip.open(self._get_info(path))
+
+    def read(self, *path):
+        return self._zip.read(self._get_info(path))
+
+    def _get_info(self, path):
+        info = self._names.get('/'.join(path))
+        if info is None:
+            raise IOError('No such file in package: ' + '/'.join(path))
+        return info
+
+    def get_path(self, *path):
+        raise e.PackageLoadError(
+            'Package archive files are not accessible by path')
+
+    @property
+    def blob(self):
+        return self._data[:]
+
+
+class _ArchiveReader(object):
+    # file-like access to archive bytes; unlike BytesIO it does not copy the
+    # data and works for mmap objects
+    def __init__(self, data):
+        self._data = data
+        self._position = 0
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += len(self._data)
+        self._position = offset
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        end = len(self._data) if size < 0 else self._position + size
+        result = self._data[self._position:end]
+        self._position += len(result)
+        return result
+
+
 class ApplicationPackage(object):
-    def __init__(self, source_directory, manifest, loader):
+    def __init__(self, source, manifest, loader):
+        if isinstance(source, basestring):
+            source = DirectorySource(source)
         self.yaml_loader = loader
-        self._source_directory = source_directory
+        self._source = source
         self._full_name = None
         self._package_type = None
         self._display_name = None
@@ -44,6 +141,7 @@ class ApplicationPackage(object):
         self._logo_cache = None
         self._supplier_logo_cache = None
         self._blob_cache = None
+        self._compiled_classes = None
 
     @property
     def full_name(self):
@@ -88,31 +186,47 @@ class ApplicationPackage(object):
     @property
     def blob(self):
         if not self._blob_cache:
-            self._blob_cache = _pack_dir(self._source_directory)
+            self._blob_cache = self._source.blob
         return self._blob_cache
 
     def get_resource(self, name):
-        resources_dir = os.path.join(self._source_directory, 'Resources')
+        resources_dir = self._source.get_path('Resources')
         if not os.path.exists(resources_dir):
             os.makedirs(resources_dir)
         return os.path.join(resources_dir, name)
 
+    def read_resource(self, name):
+        if not self._source.exists('Resources', name):
+            raise e.PackageLoadError('Resource {0} not found'.format(name))
+        return self._source.read('Resources', name)
+
+    def set_compiled_classes(self, data):
+        """Use pre-parsed class definitions instead of parsing classes.
+
+        Definitions in an unsupported format are ignored.
+        """
+        self._compiled_classes = compiled_classes.load(data)
+
+    def _get_compiled_class(self, name):
+        if not self._compiled_classes or name not in self._compiled_classes:
+            return None
+        return compiled_classes.decode_class(self._compiled_classes[name])
+
     def validate(self):
         self._load_logo(True)
         self._load_supplier_logo(True)
 
     def _load_logo(self, validate=False):
         logo_file = self._logo or 'logo.png'
-        full_path = os.path.join(self._source_directory, logo_file)
-        if not os.path.isfile(full_path) and logo_file == 'logo.png':
+        if not self._source.exists(logo_file) and logo_file == 'logo.png':
             self._logo_cache = None
             return
         try:
+            logo = self._source.read(logo_file)
             if validate:
-                if imghdr.what(full_path) != 'png':
+                if imghdr.what('', logo) != 'png':
                     raise e.PackageLoadError("Logo is not in PNG format")
-            with open(full_path) as stream:
-                self._logo_cache = stream.read()
+            self._logo_cache = logo
         except Exception as ex:
             trace = sys.exc_info()[2]
             raise e.PackageLoadError(
@@ -122,17 +236,17 @@ class ApplicationPackage(object):
         if 'Logo' not in self._supplier:
             self._supplier['Logo'] = None
         logo_file = self._supplier['Logo'] or 'supplier_logo.png'
-        full_path = os.path.join(self._source_directory, logo_file)
-        if not os.path.isfile(full_path) and logo_file == 'supplier_logo.png':
+        if not self._source.exists(logo_file) and \
+                logo_file == 'supplier_logo.png':
             del self._supplier['Logo']
             return
         try:
+            logo = self._source.read(logo_file)
             if validate:
-                if imghdr.what(full_path) != 'png':
+                if imghdr.what('', logo) != 'png':
                     raise e.PackageLoadError(
                         "Supplier Logo is not in PNG format")
-            with open(full_path) as stream:
-                self._supplier_logo_cache = stream.read()
+            self._supplier_logo_cache = logo
         except Exception as ex:
             trace = sys.exc_info()[2]
             raise e.PackageLoadError(
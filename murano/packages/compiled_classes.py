@@ -0,0 +1,128 @@
+#    Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Pre-parsed form of package classes.
+
+Class definitions are stored as JSON. Mappings and YAQL expressions are
+encoded as tagged objects carrying their source file positions, so that
+a decoded definition is equivalent to the one loaded from the class YAML
+file. Expressions are validated at compile time and stored as source
+text; they are parsed through the process-wide expression cache when the
+class is decoded.
+"""
+
+import json
+import types
+
+from murano.dsl import namespace_resolver
+from murano.dsl import yaql_expression
+from murano.engine import yaql_yaml_loader
+
+FORMAT_VERSION = 1
+
+_MAP = '!map'
+_YAQL = '!yaql'
+_POSITION = '@'
+
+
+def compile_package(package):
+    """Return serialized pre-parsed definitions of all package classes."""
+    classes = {}
+    for name in package.classes:
+        classes[name] = _encode(_resolve_parents(package.get_class(name)))
+    return json.dumps({'Version': FORMAT_VERSION, 'Classes': classes},
+                      separators=(',', ':'))
+
+
+def load(data):
+    """Return encoded classes by name or None for an unsupported format."""
+    try:
+        content = json.loads(data)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(content, types.DictType) or \
+            content.get('Version') != FORMAT_VERSION:
+        return None
+    return content.get('Classes')
+
+
+def decode_class(encoded):
+    return _decode(encoded)
+
+
+def _resolve_parents(definition):
+    parents = definition.get('Extends')
+    if not parents:
+        return definition
+    resolver = namespace_resolver.NamespaceResolver(
+        dict(definition.get('Namespaces') or {}))
+    if not isinstance(parents, types.ListType):
+        parents = [parents]
+    try:
+        resolved = [':' + resolver.resolve_name(name) for name in parents]
+    except (KeyError, NameError, ValueError):
+        return definition
+    result = yaql_yaml_loader.MuranoPlDict(definition)
+    result.source_file_position = getattr(
+        definition, 'source_file_position', None)
+    result['Extends'] = resolved
+    return result
+
+
+def _encode_position(value):
+    position = getattr(value, 'source_file_position', None)
+    if position is None:
+        return None
+    return [position.file_path, position.start_line, position.start_column,
+            position.start_index, position.end_line, position.end_column,
+            position.length]
+
+
+def _encode(value):
+    if isinstance(value, yaql_expression.YaqlExpression):
+        return {_YAQL: value.expression, _POSITION: _encode_position(value)}
+    elif isinstance(value, types.DictionaryType):
+        return {
+            _MAP: [[_encode(k), _encode(v)] for k, v in value.iteritems()],
+            _POSITION: _encode_position(value)
+        }
+    elif isinstance(value, (types.ListType, types.TupleType)):
+        return [_encode(t) for t in value]
+    return value
+
+
+def _decode_position(value):
+    if value is None:
+        return None
+    return yaql_expression.YaqlExpressionFilePosition(*value)
+
+
+def _decode(value):
+    if isinstance(value, types.DictType):
+        if _YAQL in value:
+            result = yaql_expression.YaqlExpression(value[_YAQL])
+        else:
+            result = yaql_yaml_loader.MuranoPlDict(
+                (_decode(k), _decode(v)) for k, v in value[_MAP])
+        result.source_file_position = _decode_position(value[_POSITION])
+        return result
+    elif isinstance(value, types.ListType):
+        return [_decode(t) for t in value]
+    elif isinstance(value, types.UnicodeType):
+        # the same as PyYAML does for plain ASCII scalars
+        try:
+            return value.encode('ascii')
+        except UnicodeEncodeError:
+            return value
+    return value
@@ -12,8 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import os
-import shutil
 import sys
 import types
 import yaml
@@ -37,10 +35,9 @@ Dumper.add_representer(YAQL, yaql_representer)
 
 
 class HotPackage(murano.packages.application_package.ApplicationPackage):
-    def __init__(self, source_directory, manifest, loader):
-        super(HotPackage, self).__init__(source_directory, manifest, loader)
+    def __init__(self, source, manifest, loader):
+        super(HotPackage, self).__init__(source, manifest, loader)
         self._translated_class = None
-        self._source_directory = source_directory
         self._translated_ui = None
 
     @property
@@ -63,10 +60,18 @@ class HotPackage(murano.packages.application_package.ApplicationPackage):
         if name != self.full_name:
             raise exceptions.PackageClassLoadError(
                 name, 'Class not defined in this package')
+        if not self._translated_class:
+            self._translated_class = self._get_compiled_class(name)
         if not self._translated_class:
             self._translate_class()
         return self._translated_class
 
+    def read_resource(self, name):
+        # the generated class deploys the package template itself
+        if name == self.full_name:
+            return self._source.read('template.yaml')
+        return super(HotPackage, self).read_resource(name)
+
     def validate(self):
         self.get_class(self.full_name)
         if not self._translated_ui:
@@ -74,16 +79,9 @@ class HotPackage(murano.packages.application_package.ApplicationPackage):
         super(HotPackage, self).validate()
 
     def _translate_class(self):
-        template_file = os.path.join(self._source_directory, 'template.yaml')
-        shutil.copy(template_file, self.get_resource(self.full_name))
-
-        if not os.path.isfile(template_file):
-            raise exceptions.PackageClassLoadError(
-                self.full_name, 'File with class definition not found')
-        with open(template_file) as stream:
-            hot = yaml.safe_load(stream)
-            if 'resources' not in hot:
-                raise exceptions.PackageFormatError('Not a HOT template')
+        hot = self._load_template()
+        if 'resources' not in hot:
+            raise exceptions.PackageFormatError('Not a HOT template')
         translated = {
             'Name': self.full_name,
             'Extends': 'io.murano.Application'
@@ -381,14 +379,14 @@ class HotPackage(murano.packages.application_package.ApplicationPackage):
 
         return app
 
-    def _translate_ui(self):
-        template_file = os.path.join(self._source_directory, 'template.yaml')
-
-        if not os.path.isfile(template_file):
+    def _load_template(self):
+        if not self._source.exists('template.yaml'):
             raise exceptions.PackageClassLoadError(
                 self.full_name, 'File with class definition not found')
-        with open(template_file) as stream:
-            hot = yaml.safe_load(stream)
+        return yaml.safe_load(self._source.read('template.yaml'))
+
+    def _translate_ui(self):
+        hot = self._load_template()
 
         translated = {
             'Version': 2,
@@ -12,10 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import io
 import os
 import shutil
 import sys
-import tempfile
 import yaml
 import zipfile
 
@@ -26,15 +26,38 @@ import murano.packages.versions.hot_v1
 import murano.packages.versions.mpl_v1
 
 
+def load_from_archive(data, loader=yaql_yaml_loader.YaqlYamlLoader):
+    """Load package from zip archive data without extracting it."""
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        raise e.PackageFormatError("Uploading file should be a "
+                                   "zip' archive")
+    return _load_from_source(
+        murano.packages.application_package.ZipSource(data=data),
+        preload=True, loader=loader)
+
+
 def load_from_file(archive_path, target_dir=None, drop_dir=False,
-                   loader=yaql_yaml_loader.YaqlYamlLoader):
+                   loader=yaql_yaml_loader.YaqlYamlLoader,
+                   compiled_classes=None):
+    """Load package from zip archive file.
+
+    When no target directory is given the archive is read in place
+    instead of being extracted. Pre-parsed class definitions produced by
+    murano.packages.compiled_classes are used instead of class files when
+    given.
+    """
     if not os.path.isfile(archive_path):
         raise e.PackageLoadError('Unable to find package file')
-    created = False
     if not target_dir:
-        target_dir = tempfile.mkdtemp()
-        created = True
-    elif not os.path.exists(target_dir):
+        if not zipfile.is_zipfile(archive_path):
+            raise e.PackageFormatError("Uploading file should be a "
+                                       "zip' archive")
+        return _load_from_source(
+            murano.packages.application_package.ZipSource(
+                archive_path=archive_path),
+            preload=True, loader=loader, compiled_classes=compiled_classes)
+    created = False
+    if not os.path.exists(target_dir):
         os.mkdir(target_dir)
         created = True
     else:
@@ -59,22 +82,29 @@ def load_from_file(archive_path, target_dir=None, drop_dir=False,
 
 def load_from_dir(source_directory, filename='manifest.yaml', preload=False,
                   loader=yaql_yaml_loader.YaqlYamlLoader):
+    if not os.path.isdir(source_directory) or not os.path.exists(
+            source_directory):
+        raise e.PackageLoadError('Invalid package directory')
+    return _load_from_source(
+        murano.packages.application_package.DirectorySource(
+            source_directory),
+        filename, preload, loader)
+
+
+def _load_from_source(source, filename='manifest.yaml', preload=False,
+                      loader=yaql_yaml_loader.YaqlYamlLoader,
+                      compiled_classes=None):
     formats = {
         '1.0': murano.packages.versions.mpl_v1,
         'MuranoPL/1.0': murano.packages.versions.mpl_v1,
         'Heat.HOT/1.0': murano.packages.versions.hot_v1
     }
 
-    if not os.path.isdir(source_directory) or not os.path.exists(
-            source_directory):
-        raise e.PackageLoadError('Invalid package directory')
-    full_path = os.path.join(source_directory, filename)
-    if not os.path.isfile(full_path):
+    if not source.exists(filename):
         raise e.PackageLoadError('Unable to find package manifest')
 
     try:
-        with open(full_path) as stream:
-            content = yaml.safe_load(stream)
+        content = yaml.safe_load(source.read(filename))
     except Exception as ex:
         trace = sys.exc_info()[2]
         raise e.PackageLoadError(
@@ -84,8 +114,10 @@ def load_from_dir(source_directory, filename='manifest.yaml', preload=False,
         if not p_format or p_format not in formats:
             raise e.PackageFormatError(
                 'Unknown or missing format version')
-        package = formats[p_format].create(source_directory, content, loader)
+        package = formats[p_format].create(source, content, loader)
         formats[p_format].load(package, content)
+        if compiled_classes:
+            package.set_compiled_classes(compiled_classes)
         if preload:
             package.validate()
         return package
@@ -12,7 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import os
 import sys
 import yaml
 
@@ -21,9 +20,8 @@ from murano.packages import exceptions
 
 
 class MuranoPlPackage(murano.packages.application_package.ApplicationPackage):
-    def __init__(self, source_directory, manifest, loader):
-        super(MuranoPlPackage, self).__init__(
-            source_directory, manifest, loader)
+    def __init__(self, source, manifest, loader):
+        super(MuranoPlPackage, self).__init__(source, manifest, loader)
 
         self._classes = None
         self._ui = None
@@ -58,17 +56,15 @@ class MuranoPlPackage(murano.packages.application_package.ApplicationPackage):
             self._ui_cache = yaml.load(self._raw_ui_cache, self.yaml_loader)
         else:
             ui_file = self._ui
-            full_path = os.path.join(self._source_directory, 'UI', ui_file)
-            if not os.path.isfile(full_path):
+            if not self._source.exists('UI', ui_file):
                 self._raw_ui_cache = None
                 self._ui_cache = None
                 return
             try:
-                with open(full_path) as stream:
-                    self._raw_ui_cache = stream.read()
-                    if load_yaml:
-                        self._ui_cache = yaml.load(self._raw_ui_cache,
-                                                   self.yaml_loader)
+                self._raw_ui_cache = self._source.read('UI', ui_file)
+                if load_yaml:
+                    self._ui_cache = yaml.load(self._raw_ui_cache,
+                                               self.yaml_loader)
             except Exception as ex:
                 trace = sys.exc_info()[2]
                 raise exceptions.PackageUILoadError(str(ex)), None, trace
@@ -77,14 +73,20 @@ class MuranoPlPackage(murano.packages.application_package.ApplicationPackage):
         if name not in self._classes:
             raise exceptions.PackageClassLoadError(
                 name, 'Class not defined in this package')
+        compiled = self._get_compiled_class(name)
+        if compiled is not None:
+            self._classes_cache[name] = compiled
+            return
         def_file = self._classes[name]
-        full_path = os.path.join(self._source_directory, 'Classes', def_file)
-        if not os.path.isfile(full_path):
+        if not self._source.exists('Classes', def_file):
             raise exceptions.PackageClassLoadError(
                 name, 'File with class definition not found')
         try:
-            with open(full_path) as stream:
+            stream = self._source.open('Classes', def_file)
+            try:
                 self._classes_cache[name] = yaml.load(stream, self.yaml_loader)
+            finally:
+                stream.close()
         except Exception as ex:
             trace = sys.exc_info()[2]
             msg = 'Unable to load class definition due to "{0}"'.format(
@@ -16,14 +16,21 @@
 import cgi
 import cStringIO
 import imghdr
+import json
 import mock
 import os
 
+import yaml
+
 from murano.api.v1 import catalog
 from murano.common import policy
+from murano.common import process_pool
 from murano.db.catalog import api as db_catalog_api
+from murano.packages import exceptions as pkg_exc
 from murano.packages import load_utils
 import murano.tests.unit.api.base as test_base
+from murano.tests.unit import base
+from murano.tests.unit import utils
 
 
 class TestCatalogApi(test_base.ControllerTest, test_base.MuranoApiTestCase):
@@ -112,8 +119,8 @@ Content-Type: application/json
 %s
 --BOUNDARY--''' % package_metadata
 
-        with mock.patch('murano.packages.load_utils.load_from_file') as lff:
-            lff.return_value = package_from_dir
+        with mock.patch('murano.packages.load_utils.load_from_archive') as lfa:
+            lfa.return_value = package_from_dir
             req = self._post(
                 '/catalog/packages',
                 body,
@@ -131,3 +138,89 @@ Content-Type: application/json
                 content_type='multipart/form-data; ; boundary=BOUNDARY',
                 params={"is_public": "true"})
             res = req.get_response(self.api)
+
+    def test_resolve_classes(self):
+        self._set_policy_rules({'search_packages': '@'})
+        self.expect_policy_check('search_packages')
+        package_from_dir, package = self._test_package()
+        saved_package = db_catalog_api.package_upload(package, '')
+
+        package['fully_qualified_name'] = 'test.private.app'
+        package['is_public'] = False
+        package['class_definitions'] = ['test.private.app.Thing']
+        db_catalog_api.package_upload(package, 'other_tenant')
+
+        body = {'class_names': ['test.mpl.v1.app.Thing',
+                                'test.private.app.Thing',
+                                'test.unknown.Thing']}
+        req = self._post('/catalog/packages/resolve', json.dumps(body))
+        res = req.get_response(self.api)
+
+        self.assertEqual(200, res.status_code)
+        classes = json.loads(res.body)['classes']
+        self.assertEqual(['test.mpl.v1.app.Thing'], classes.keys())
+        self.assertEqual(saved_package.id,
+                         classes['test.mpl.v1.app.Thing']['id'])
+        self.assertEqual('test.mpl.v1.app', classes[
+            'test.mpl.v1.app.Thing']['fully_qualified_name'])
+
+    def test_resolve_unknown_classes(self):
+        self._set_policy_rules({'search_packages': '@'})
+        self.expect_policy_check('search_packages')
+
+        req = self._post('/catalog/packages/resolve',
+                         json.dumps({'class_names': ['test.unknown.Thing']}))
+        result = self.controller.resolve_classes(
+            req, {'class_names': ['test.unknown.Thing']})
+
+        self.assertEqual({'classes': {}}, result)
+
+    def test_resolve_classes_unauthorized(self):
+        self.expect_policy_check('search_packages')
+
+        body = {'class_names': ['test.mpl.v1.app.Thing']}
+        req = self._post('/catalog/packages/resolve', json.dumps(body))
+        res = req.get_response(self.api)
+
+        self.assertEqual(403, res.status_code)
+
+    def test_resolve_classes_invalid_body(self):
+        self._set_policy_rules({'search_packages': '@'})
+        self.expect_policy_check('search_packages')
+
+        req = self._post('/catalog/packages/resolve',
+                         json.dumps({'class_names': 'test.mpl.v1.app.Thing'}))
+        res = req.get_response(self.api)
+
+        self.assertEqual(400, res.status_code)
+
+
+class _UnpicklableError(Exception):
+    def __init__(self, message, callback):
+        super(_UnpicklableError, self).__init__(message)
+        self.callback = callback
+
+
+class TestLoadPackageMeta(base.MuranoTestCase):
+    def setUp(self):
+        super(TestLoadPackageMeta, self).setUp()
+        self.pool = process_pool.ProcessPool(1)
+
+    def test_package_meta_loaded_in_child_process(self):
+        package_meta = self.pool.execute(catalog._load_package_meta,
+                                         utils.package_archive())
+
+        self.assertEqual('test.mpl.v1.app',
+                         package_meta['fully_qualified_name'])
+        self.assertIn('compiled_classes', package_meta)
+
+    def test_validation_errors_passed_back(self):
+        errors = [yaml.YAMLError('invalid manifest'),
+                  _UnpicklableError('invalid class', lambda: None)]
+        for error in errors:
+            with mock.patch.object(load_utils, 'load_from_archive',
+                                   side_effect=error):
+                e = self.assertRaises(pkg_exc.PackageLoadError,
+                                      self.pool.execute,
+                                      catalog._load_package_meta, 'data')
+            self.assertEqual(str(error), str(e))
@@ -0,0 +1,71 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from oslo.utils import timeutils
+
+from murano.api.v1 import deployments
+from murano.db import models
+import murano.tests.unit.api.base as tb
+import murano.tests.unit.utils as test_utils
+
+
+class TestDeploymentsApi(tb.ControllerTest, tb.MuranoApiTestCase):
+    def setUp(self):
+        super(TestDeploymentsApi, self).setUp()
+        self.controller = deployments.Controller()
+        self._set_policy_rules({'list_deployments': '@'})
+
+        environment = models.Environment(id='env', name='env',
+                                         tenant_id=self.tenant,
+                                         description={})
+        finished = models.Task(id='finished', environment_id='env',
+                               finished=timeutils.utcnow(),
+                               description={'applications': []},
+                               action={'method': 'deploy'})
+        running = models.Task(id='running', environment_id='env',
+                              description={'applications': []},
+                              action={'method': 'deploy'})
+        action = models.Task(id='action', environment_id='env',
+                             description={}, action={'method': 'restart'})
+        statuses = [
+            models.Status(task_id='finished', text='', level='warning'),
+            models.Status(task_id='finished', text='', level='info'),
+            models.Status(task_id='running', text='', level='error'),
+            models.Status(task_id='running', text='', level='warning')
+        ]
+        test_utils.save_models(environment, finished, running, action,
+                               *statuses)
+
+    def _list(self, params=None):
+        self.expect_policy_check('list_deployments',
+                                 {'environment_id': 'env'})
+        req = self._get('/environments/env/deployments', params)
+        result = req.get_response(self.api)
+        self.assertEqual(200, result.status_code)
+        return dict((d['id'], d)
+                    for d in json.loads(result.body)['deployments'])
+
+    def test_list_states(self):
+        result = self._list()
+
+        self.assertEqual(['finished', 'running'], sorted(result))
+        self.assertEqual('completed_w_warnings', result['finished']['state'])
+        self.assertEqual('running_w_errors', result['running']['state'])
+        self.assertNotIn('description', result['running'])
+
+    def test_list_with_description(self):
+        result = self._list({'include_description': 'true'})
+
+        self.assertEqual({'services': []}, result['running']['description'])
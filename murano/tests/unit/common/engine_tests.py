@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+from muranoclient.common import exceptions as muranoclient_exc
+from muranoclient.v1 import client as muranoclient
+
+from murano.common import engine
+from murano.engine import client_manager
+from murano.engine import package_cache
+from murano.engine import package_class_loader
+from murano.engine import package_loader
+from murano.tests.unit import base
+from murano.tests.unit import utils
+
+CORE_LIBRARY_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', '..', '..', 'meta'))
+UPDATED = '2014-12-12T12:00:00'
+
+
+class TestPreloadPackages(base.MuranoTestCase):
+    def setUp(self):
+        super(TestPreloadPackages, self).setUp()
+        patcher = mock.patch.object(engine, 'LOCAL_PACKAGE_LOADERS', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.cache = package_cache.PackageCache(directory, 10 * 1024 * 1024)
+        patcher = mock.patch.object(package_cache, 'get_cache',
+                                    return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = muranoclient.Client('http://localhost:8082',
+                                          token='token')
+        patcher = mock.patch.object(client_manager,
+                                    'get_service_murano_client',
+                                    return_value=self.client)
+        self.get_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_shared_classes(self, package):
+        return sorted(package_class_loader._shared_classes.get(package, {}))
+
+    def test_nothing_to_preload(self):
+        engine.preload_packages()
+
+        self.assertEqual([], engine.get_local_package_loaders())
+        self.assertFalse(self.get_client.called)
+
+    def test_local_packages(self):
+        self.override_config('load_packages_from',
+                             [utils.TEST_PACKAGES_DIR, CORE_LIBRARY_DIR],
+                             'engine')
+
+        engine.preload_packages()
+
+        loaders = engine.get_local_package_loaders()
+        package = loaders[0].get_package('test.mpl.v1.app')
+        self.assertEqual(['test.mpl.v1.app.Thing'],
+                         self._get_shared_classes(package))
+        package = loaders[1].get_package('io.murano')
+        self.assertIn('io.murano.Object', self._get_shared_classes(package))
+        # local packages are never requested from the catalog
+        self.assertFalse(self.get_client.called)
+
+    def test_catalog_packages(self):
+        self.override_config('load_packages_from', [CORE_LIBRARY_DIR],
+                             'engine')
+        self.override_config('preload_packages',
+                             ['test.mpl.v1.app', 'test.missing.app'],
+                             'engine')
+
+        def filter_packages(limit, fqn=None, class_name=None):
+            if fqn == 'test.mpl.v1.app' or \
+                    class_name == 'test.mpl.v1.app.Thing':
+                yield package_loader.PackageDefinition(
+                    'package_id', 'test.mpl.v1.app', UPDATED)
+
+        with mock.patch.object(self.client.packages, 'filter',
+                               side_effect=filter_packages), \
+                mock.patch.object(self.client.packages, 'download',
+                                  return_value=utils.package_archive()), \
+                mock.patch.object(self.client, 'raw_request',
+                                  side_effect=muranoclient_exc.HTTPNotFound):
+            # a package that cannot be preloaded is skipped
+            engine.preload_packages()
+
+            self.client.raw_request.assert_called_once_with(
+                'GET', '/v1/catalog/packages/package_id/classes')
+
+        entry = self.cache._entries[('package_id', UPDATED)]
+        self.assertEqual(['test.mpl.v1.app.Thing'],
+                         self._get_shared_classes(entry.package))
+        # preloaded packages stay in the cache
+        self.assertTrue(entry.references)
+        self.assertEqual(1, self.get_client.call_count)
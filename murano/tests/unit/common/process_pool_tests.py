@@ -0,0 +1,41 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from murano.common import process_pool
+from murano.packages import exceptions as pkg_exc
+from murano.tests.unit import base
+
+
+def _get_pid():
+    return os.getpid()
+
+
+def _fail(message):
+    raise pkg_exc.PackageLoadError(message)
+
+
+class TestProcessPool(base.MuranoTestCase):
+    def setUp(self):
+        super(TestProcessPool, self).setUp()
+        self.pool = process_pool.ProcessPool(1)
+
+    def test_executed_in_child_process(self):
+        self.assertNotEqual(os.getpid(), self.pool.execute(_get_pid))
+        self.assertEqual(0, self.pool.running)
+
+    def test_exception_passed_back(self):
+        e = self.assertRaises(pkg_exc.PackageLoadError,
+                              self.pool.execute, _fail, 'broken')
+        self.assertEqual('broken', str(e))
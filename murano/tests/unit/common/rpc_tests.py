@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from murano.common import rpc
+from murano.tests.unit import base
+
+
+class TestEngineClient(base.MuranoTestCase):
+    def setUp(self):
+        super(TestEngineClient, self).setUp()
+        patcher = mock.patch('oslo.messaging.rpc.RPCClient')
+        self.rpc_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.client = rpc.EngineClient(mock.Mock())
+        patcher = mock.patch.object(rpc, '_engine_workers', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_worker_not_routed(self):
+        self.client.handle_task({'id': 'env'})
+
+        self.assertFalse(self.rpc_client.prepare.called)
+        self.rpc_client.cast.assert_called_once_with(
+            {}, 'handle_task', task={'id': 'env'})
+
+    def test_not_routed_by_default(self):
+        self.override_config('workers', 4, 'engine')
+
+        self.client.handle_task({'id': 'env'})
+
+        self.assertFalse(self.rpc_client.call.called)
+        self.assertFalse(self.rpc_client.prepare.called)
+        self.rpc_client.cast.assert_called_once_with(
+            {}, 'handle_task', task={'id': 'env'})
+
+    def test_environment_routed_to_same_worker(self):
+        self.override_config('workers', 4, 'engine')
+        self.override_config('route_tasks', True, 'engine')
+        self.rpc_client.call.return_value = 4
+
+        for env_id in ('env1', 'env2', 'env1'):
+            self.client.handle_task({'id': env_id})
+
+        # the workers of the engine are checked once
+        self.rpc_client.call.assert_called_once_with({}, 'get_workers')
+        servers = [c[1]['server']
+                   for c in self.rpc_client.prepare.call_args_list]
+        self.assertEqual(servers[0], servers[2])
+        for server in servers:
+            self.assertIn(server, [rpc.get_engine_worker_id(i)
+                                   for i in range(4)])
+
+    def test_workers_mismatch(self):
+        self.override_config('workers', 4, 'engine')
+        self.override_config('route_tasks', True, 'engine')
+        self.rpc_client.call.return_value = 1
+
+        self.assertRaises(rpc.WorkersMismatchError,
+                          self.client.handle_task, {'id': 'env'})
+        self.assertFalse(self.rpc_client.cast.called)
+
+        # the engine is checked again until its workers match
+        self.rpc_client.call.return_value = 4
+        self.client.handle_task({'id': 'env'})
+        self.assertEqual(2, self.rpc_client.call.call_count)
+        self.assertTrue(self.rpc_client.prepare.return_value.cast.called)
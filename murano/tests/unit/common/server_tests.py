@@ -0,0 +1,77 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from murano.common import server
+from murano.db import models
+from murano.db import session as db_session
+from murano.tests.unit import base
+import murano.tests.unit.utils as test_utils
+
+
+class TestStatusBuffer(base.MuranoWithDBTestCase):
+    def setUp(self):
+        super(TestStatusBuffer, self).setUp()
+        test_utils.save_models(
+            models.Environment(id='env', name='env', tenant_id='tenant',
+                               description={}),
+            models.Task(id='task', environment_id='env', description={}))
+
+    def _report(self, level, text):
+        return {'entity_id': 'entity', 'text': text, 'details': None,
+                'level': level, 'environment_id': 'env'}
+
+    def _get_statuses(self):
+        unit = db_session.get_session()
+        return unit.query(models.Status).order_by(models.Status.created).all()
+
+    def test_reports_written_on_flush(self):
+        buf = server.StatusBuffer(batch_size=10, flush_interval=1)
+        for i, level in enumerate(('info', 'error', 'warning', 'error')):
+            buf.add(self._report(level, str(i)))
+        self.assertEqual([], self._get_statuses())
+
+        buf.flush()
+
+        statuses = self._get_statuses()
+        self.assertEqual(['0', '1', '2', '3'], [s.text for s in statuses])
+        self.assertEqual(['task'] * 4, [s.task_id for s in statuses])
+        task = db_session.get_session().query(models.Task).get('task')
+        self.assertEqual((2, 1, 1), (task.error_count, task.warning_count,
+                                     task.info_count))
+
+    def test_reports_written_when_batch_is_full(self):
+        buf = server.StatusBuffer(batch_size=2, flush_interval=1)
+        buf.add(self._report('info', '0'))
+        buf.add(self._report('info', '1'))
+
+        self.assertEqual(2, len(self._get_statuses()))
+
+    def test_reports_not_buffered_without_interval(self):
+        buf = server.StatusBuffer(batch_size=10, flush_interval=0)
+        buf.add(self._report('info', '0'))
+
+        self.assertEqual(1, len(self._get_statuses()))
+
+    def test_bad_report_does_not_lose_batch(self):
+        buf = server.StatusBuffer(batch_size=10, flush_interval=1)
+        buf.add(self._report('info', '0'))
+        buf.add(self._report('error', None))
+        buf.add(self._report('warning', '2'))
+
+        buf.flush()
+
+        statuses = self._get_statuses()
+        self.assertEqual(['0', '2'], [s.text for s in statuses])
+        task = db_session.get_session().query(models.Task).get('task')
+        self.assertEqual((0, 1, 1), (task.error_count, task.warning_count,
+                                     task.info_count))
@@ -0,0 +1,44 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import errno
+import os
+
+import mock
+
+from murano.common import worker_service
+from murano.tests.unit import base
+
+
+class TestWorkerSlots(base.MuranoTestCase):
+    def test_same_process_keeps_slot(self):
+        slots = worker_service.WorkerSlots(2)
+
+        self.assertEqual(0, slots.take())
+        self.assertEqual(0, slots.take())
+
+    @mock.patch('os.kill')
+    def test_slot_of_dead_worker_reused(self, kill):
+        slots = worker_service.WorkerSlots(2)
+        slots._pids[0] = os.getpid() + 1
+        slots._pids[1] = os.getpid() + 2
+        kill.side_effect = [None, OSError(errno.ESRCH, 'No such process')]
+
+        self.assertEqual(1, slots.take())
+
+    @mock.patch('os.kill')
+    def test_no_free_slot(self, kill):
+        slots = worker_service.WorkerSlots(1)
+        slots._pids[0] = os.getpid() + 1
+
+        self.assertRaises(RuntimeError, slots.take)
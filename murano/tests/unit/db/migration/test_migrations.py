@@ -16,10 +16,13 @@ import uuid
 
 from oslo.config import cfg
 from oslo.db.sqlalchemy import utils as db_utils
+from oslo.serialization import jsonutils
 from sqlalchemy import exc
 
 from murano.db.migration import migration
 from murano.db import models  # noqa
+from murano.db import snapshots
+from murano.db.sqla import types as st
 from murano.tests.unit.db.migration import test_migrations_base as base
 
 CONF = cfg.CONF
@@ -123,3 +126,110 @@ class TestMigrations(base.BaseWalkMigrationTestCase, base.CommonTestsMixIn):
         self.assertEqual('003', migration.version(engine))
         self.assertColumnExists(engine, 'task', 'action')
         self.assertColumnExists(engine, 'status', 'task_id')
+
+    def _check_005(self, engine, data):
+        self.assertEqual('005', migration.version(engine))
+        self.assertColumnExists(engine, 'package', 'compiled_classes')
+
+    def _pre_upgrade_006(self, engine):
+        now = datetime.datetime.utcnow()
+        env_table = db_utils.get_table(engine, 'environment')
+        task_table = db_utils.get_table(engine, 'task')
+        status_table = db_utils.get_table(engine, 'status')
+        engine.execute(env_table.insert().values(
+            id='env', name='env', tenant_id='tenant', version=0,
+            description='{}', created=now, updated=now))
+        engine.execute(task_table.insert().values(
+            id='task', environment_id='env', description='{}',
+            started=now, created=now, updated=now))
+        for level in ('error', 'warning', 'warning', 'info', 'debug'):
+            engine.execute(status_table.insert().values(
+                id=str(uuid.uuid4()), task_id='task', text='', level=level,
+                created=now, updated=now))
+
+    def _check_006(self, engine, data):
+        self.assertEqual('006', migration.version(engine))
+        self.assertColumnsExists(engine, 'task', ['error_count',
+                                                  'warning_count',
+                                                  'info_count'])
+        task_table = db_utils.get_table(engine, 'task')
+        task = engine.execute(task_table.select()).first()
+        self.assertEqual((1, 2, 1), (task.error_count, task.warning_count,
+                                     task.info_count))
+
+    def _check_007(self, engine, data):
+        self.assertEqual('007', migration.version(engine))
+        self.assertColumnExists(engine, 'session', 'patch_count')
+        self.assertColumnsExists(engine, 'session_patch',
+                                 ['id', 'session_id', 'changes'])
+        self.assertIndexMembers(engine, 'session_patch',
+                                'ix_session_patch_session_id',
+                                ['session_id'])
+
+    def _pre_upgrade_008(self, engine):
+        now = datetime.datetime.utcnow()
+        task_table = db_utils.get_table(engine, 'task')
+        description = {'?': {'id': 'env', 'type': 'Environment'},
+                       'services': [{'?': {'id': 'app', 'type': 'App'}}]}
+        for task_id in ('first', 'second'):
+            engine.execute(task_table.insert().values(
+                id=task_id, environment_id='env',
+                description=jsonutils.dumps(description),
+                started=now, created=now, updated=now))
+        return description
+
+    def _check_008(self, engine, data):
+        self.assertEqual('008', migration.version(engine))
+        self.assertColumnsExists(engine, 'object_chunk',
+                                 ['hash', 'content', 'ref_count'])
+        chunk_table = db_utils.get_table(engine, 'object_chunk')
+        chunks = engine.execute(chunk_table.select()).fetchall()
+        # the environment is referenced by both tasks, the app by the
+        # environment
+        self.assertEqual([1, 2], sorted(c.ref_count for c in chunks))
+
+        task_table = db_utils.get_table(engine, 'task')
+        task = engine.execute(task_table.select().where(
+            task_table.c.id == 'first')).first()
+        snapshot = jsonutils.loads(task.description)
+        self.assertEqual([data],
+                         snapshots.load(engine.connect(), [snapshot]))
+
+    def _post_downgrade_008(self, engine):
+        self.assertEqual('007', migration.version(engine))
+        task_table = db_utils.get_table(engine, 'task')
+        tasks = engine.execute(task_table.select().where(
+            task_table.c.id.in_(['first', 'second']))).fetchall()
+        descriptions = [jsonutils.loads(task.description) for task in tasks]
+        self.assertEqual([{'?': {'id': 'env', 'type': 'Environment'},
+                           'services': [{'?': {'id': 'app', 'type': 'App'}}]}
+                          ] * 2, descriptions)
+
+    def _pre_upgrade_009(self, engine):
+        now = datetime.datetime.utcnow()
+        env_table = db_utils.get_table(engine, 'environment')
+        description = {'services': [{'name': 'app-{0}'.format(i)}
+                                    for i in range(100)]}
+        engine.execute(env_table.insert().values(
+            id='compressed', name='compressed', tenant_id='tenant',
+            version=0, description=jsonutils.dumps(description),
+            created=now, updated=now))
+        return description
+
+    def _check_009(self, engine, data):
+        self.assertEqual('009', migration.version(engine))
+        env_table = db_utils.get_table(engine, 'environment')
+        environment = engine.execute(env_table.select().where(
+            env_table.c.id == 'compressed')).first()
+        self.assertTrue(environment.description.startswith(
+            st.ZLIB_JSON.header))
+        self.assertEqual(data, st.decode(environment.description))
+
+    def _post_downgrade_009(self, engine):
+        self.assertEqual('008', migration.version(engine))
+        env_table = db_utils.get_table(engine, 'environment')
+        environment = engine.execute(env_table.select().where(
+            env_table.c.id == 'compressed')).first()
+        self.assertEqual({'services': [{'name': 'app-{0}'.format(i)}
+                                       for i in range(100)]},
+                         jsonutils.loads(environment.description))
@@ -87,3 +87,47 @@ class CatalogDBTestCase(base.MuranoWithDBTestCase):
 
         self.assertRaises(exc.HTTPNotFound,
                           api.package_get, package.id, self.context)
+
+    def test_package_resolve_classes(self):
+        values = self._stub_package()
+        values['class_definitions'] = ['com.example.Foo', 'com.example.Bar']
+        package = api.package_upload(values, self.tenant_id)
+
+        values = self._stub_package()
+        values['fully_qualified_name'] = 'com.example.private'
+        values['class_definitions'] = ['com.example.Private']
+        api.package_upload(values, str(uuid.uuid4()))
+
+        res = api.package_resolve_classes(
+            ['com.example.Foo', 'com.example.Bar', 'com.example.Private',
+             'com.example.Missing'], self.context)
+
+        self.assertEqual(set(['com.example.Foo', 'com.example.Bar']),
+                         set(res.keys()))
+        self.assertEqual(package.id, res['com.example.Foo']['id'])
+        self.assertEqual('com.example.package',
+                         res['com.example.Bar']['fully_qualified_name'])
+
+    def test_package_get_defers_blobs(self):
+        package_id = api.package_upload(self._stub_package(),
+                                        self.tenant_id).id
+
+        package = api.package_get(package_id, self.context)
+        self.assertNotIn('archive', package.__dict__)
+        self.assertNotIn('logo', package.__dict__)
+        self.assertEqual('package', package.name)
+
+        package = api.package_get('com.example.package', self.context,
+                                  undefer=['archive'])
+        self.assertEqual('archive blob here', package.archive)
+        self.assertNotIn('logo', package.__dict__)
+
+    def test_package_search_defers_blobs(self):
+        api.package_upload(self._stub_package(), self.tenant_id)
+
+        packages = api.package_search({}, self.context)
+
+        self.assertEqual(1, len(packages))
+        for column in ('archive', 'logo', 'supplier_logo', 'ui_definition',
+                       'compiled_classes'):
+            self.assertNotIn(column, packages[0].__dict__)
@@ -0,0 +1,123 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from murano.common import utils
+from murano.common import uuidutils
+from murano.db import models
+from murano.db.services import environments
+from murano.db import session as db_session
+from murano.services import states
+from murano.tests.unit import base
+
+
+class EnvironmentServicesTestCase(base.MuranoWithDBTestCase):
+    def _create_environment(self, name, *session_states):
+        unit = db_session.get_session()
+        environment = models.Environment(id=uuidutils.generate_uuid(),
+                                         name=name, tenant_id='tenant',
+                                         description={})
+        with unit.begin():
+            unit.add(environment)
+            for version, state in enumerate(session_states):
+                unit.add(models.Session(environment_id=environment.id,
+                                        user_id='user', state=state,
+                                        version=version, description={}))
+        return environment.id
+
+    def test_get_statuses(self):
+        session_state = states.SessionState
+        env_ids = [
+            self._create_environment('ready'),
+            self._create_environment('deployed', session_state.DEPLOYED),
+            self._create_environment('pending', session_state.DEPLOYED,
+                                     session_state.OPENED),
+            self._create_environment('failed', session_state.DELETING,
+                                     session_state.DEPLOY_FAILURE,
+                                     session_state.OPENED)
+        ]
+
+        statuses = environments.EnvironmentServices.get_statuses(env_ids)
+
+        env_status = states.EnvironmentStatus
+        self.assertEqual([env_status.READY, env_status.READY,
+                          env_status.PENDING, env_status.DEPLOY_FAILURE],
+                         [statuses[env_id] for env_id in env_ids])
+        for env_id in env_ids:
+            self.assertEqual(
+                environments.EnvironmentServices.get_status(env_id),
+                statuses[env_id])
+
+    def _add_service(self, env_id, session_id, name):
+        env_services = environments.EnvironmentServices
+        changes = [('insert', '/services', {'name': name})]
+        description = env_services.get_environment_description(
+            env_id, session_id)
+        utils.TraverseHelper.apply(changes, description)
+        env_services.save_environment_changes(session_id, description,
+                                              changes)
+
+    def _get_session(self, session_id):
+        # the unit is kept for lazy loading of the patches
+        self.unit = db_session.get_session()
+        return self.unit.query(models.Session).get(session_id)
+
+    def _get_names(self, description):
+        return [service['name'] for service in
+                description['Objects']['services']]
+
+    def test_save_environment_changes(self):
+        self.override_config('patches_limit', 2, 'session')
+        env_id = self._create_environment('patched',
+                                          states.SessionState.OPENED)
+        session_id = db_session.get_session().query(models.Session).filter_by(
+            environment_id=env_id).one().id
+        environments.EnvironmentServices.save_environment_description(
+            session_id, {'services': []})
+
+        self._add_service(env_id, session_id, 'first')
+        self._add_service(env_id, session_id, 'second')
+
+        session = self._get_session(session_id)
+        self.assertEqual(2, session.patch_count)
+        self.assertEqual([], self._get_names(session.base_description))
+        self.assertEqual(['first', 'second'],
+                         self._get_names(session.description))
+
+        self._add_service(env_id, session_id, 'third')
+
+        session = self._get_session(session_id)
+        self.assertEqual(0, session.patch_count)
+        self.assertEqual(['first', 'second', 'third'],
+                         self._get_names(session.base_description))
+        self.assertEqual(0, db_session.get_session().query(
+            models.SessionPatch).count())
+
+    def test_compact(self):
+        env_id = self._create_environment('compacted',
+                                          states.SessionState.OPENED)
+        session_id = db_session.get_session().query(models.Session).filter_by(
+            environment_id=env_id).one().id
+        environments.EnvironmentServices.save_environment_description(
+            session_id, {'services': []})
+        self._add_service(env_id, session_id, 'first')
+
+        unit = db_session.get_session()
+        session = unit.query(models.Session).get(session_id)
+        with unit.begin():
+            session.compact()
+
+        session = self._get_session(session_id)
+        self.assertEqual(0, session.patch_count)
+        self.assertEqual(['first'], self._get_names(session.base_description))
+        self.assertEqual(0, db_session.get_session().query(
+            models.SessionPatch).count())
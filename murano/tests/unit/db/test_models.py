@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
+
 from murano.db import models
 from murano.db import session
 from murano.tests.unit import base
@@ -30,3 +32,27 @@ class TestModels(base.MuranoWithDBTestCase):
                     "'Application', NULL)")
         loaded_e = session.get_session().query(models.Package).get(1)
         self.assertEqual(None, loaded_e.supplier)
+
+    def test_status_counters(self):
+        updated = datetime.datetime(2014, 12, 8, 12, 0, 0)
+        unit = session.get_session()
+        with unit.begin():
+            unit.add(models.Environment(id='env', name='env',
+                                        tenant_id='tenant', description={}))
+            unit.add(models.Task(id='task', environment_id='env',
+                                 description={}, updated=updated))
+
+        unit = session.get_session()
+        for level in ('error', 'warning', 'warning', 'info', 'debug'):
+            with unit.begin():
+                unit.add(models.Status(task_id='task', text='', level=level))
+        with unit.begin():
+            models.count_statuses(unit.connection(), 'task',
+                                  {'info': 2, 'debug': 3})
+
+        unit = session.get_session()
+        task = unit.query(models.Task).get('task')
+        self.assertEqual((1, 2, 3), (task.error_count, task.warning_count,
+                                     task.info_count))
+        self.assertEqual(updated, task.updated)
+        self.assertEqual(5, len(task.statuses))
@@ -0,0 +1,187 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from murano.db import models
+from murano.db import session as db_session
+from murano.db import snapshots
+from murano.tests.unit import base
+
+
+def _object(object_id, **properties):
+    properties['?'] = {'id': object_id, 'type': 'Object'}
+    return properties
+
+
+class SnapshotsTestCase(base.MuranoTestCase):
+    def test_split_and_join(self):
+        model = _object('env', name='env', services=[
+            _object('app', instance=_object('vm', flavor='small')),
+            {'plain': 'dict'}
+        ])
+
+        snapshot, chunks = snapshots.split(model)
+
+        self.assertEqual(3, len(chunks))
+        self.assertEqual([snapshots.get_hash(c) for c in chunks.values()],
+                         chunks.keys())
+        self.assertEqual(chunks.keys()[-1:],
+                         snapshots.get_references(snapshot))
+        self.assertEqual(model, snapshots.join(snapshot, chunks))
+
+    def test_split_without_objects(self):
+        model = {'services': [{'name': 'app'}]}
+
+        self.assertEqual((model, {}), snapshots.split(model))
+
+
+class TaskDescriptionTestCase(base.MuranoWithDBTestCase):
+    def setUp(self):
+        super(TaskDescriptionTestCase, self).setUp()
+        environment = models.Environment(id='env', name='env',
+                                         tenant_id='tenant', description={})
+        unit = db_session.get_session()
+        with unit.begin():
+            unit.add(environment)
+
+    def _add_task(self, task_id, description):
+        unit = db_session.get_session()
+        with unit.begin():
+            unit.add(models.Task(id=task_id, environment_id='env',
+                                 description=description))
+
+    def _get_chunks(self):
+        unit = db_session.get_session()
+        return dict((chunk.hash, chunk.ref_count)
+                    for chunk in unit.query(models.ObjectChunk))
+
+    def _get_description(self, task_id):
+        unit = db_session.get_session()
+        return unit.query(models.Task).get(task_id).description
+
+    def test_chunks_are_shared(self):
+        first = _object('env', services=[_object('app', port=80),
+                                         _object('db', port=3306)])
+        second = _object('env', services=[_object('app', port=8080),
+                                          _object('db', port=3306)])
+
+        self._add_task('first', first)
+        self._add_task('second', second)
+
+        chunks = self._get_chunks()
+        # the environments and apps differ, the db is shared
+        self.assertEqual(5, len(chunks))
+        self.assertEqual([1, 1, 1, 1, 2], sorted(chunks.values()))
+        self.assertEqual(first, self._get_description('first'))
+        self.assertEqual(second, self._get_description('second'))
+
+    def test_chunks_are_released(self):
+        first = _object('env', services=[_object('app', port=80)])
+        second = _object('env', services=[_object('app', port=8080)])
+        self._add_task('first', first)
+        self._add_task('second', first)
+        self._add_task('third', second)
+
+        unit = db_session.get_session()
+        with unit.begin():
+            unit.delete(unit.query(models.Task).get('first'))
+        self.assertEqual(4, len(self._get_chunks()))
+        self.assertEqual(first, self._get_description('second'))
+
+        unit = db_session.get_session()
+        with unit.begin():
+            task = unit.query(models.Task).get('second')
+            task.description = second
+        # both tasks reference the same environment chunk
+        self.assertEqual([1, 2], sorted(self._get_chunks().values()))
+        self.assertEqual(second, self._get_description('second'))
+
+        unit = db_session.get_session()
+        with unit.begin():
+            unit.delete(unit.query(models.Environment).get('env'))
+        self.assertEqual({}, self._get_chunks())
+
+    def _store_interleaved(self, value, actions):
+        """Store value running actions before its statements.
+
+        Actions take the connection and stand for concurrent transactions
+        committed before chunks are fetched or inserted, None means no
+        action.
+        """
+        actions = list(actions)
+        running = []
+
+        def interleave(original):
+            def wrapper(connection, *args, **kwargs):
+                if actions and not running:
+                    action = actions.pop(0)
+                    running.append(True)
+                    try:
+                        if action:
+                            action(connection)
+                    finally:
+                        running.pop()
+                return original(connection, *args, **kwargs)
+            return wrapper
+
+        unit = db_session.get_session()
+        with unit.begin():
+            with mock.patch.object(snapshots, '_fetch',
+                                   interleave(snapshots._fetch)):
+                with mock.patch.object(snapshots, '_savepoint',
+                                       interleave(snapshots._savepoint)):
+                    snapshot = snapshots.store(unit.connection(), value)
+        self.assertEqual([], actions)
+        return snapshot
+
+    def _check_snapshot(self, snapshot, value):
+        unit = db_session.get_session()
+        self.assertEqual([value], snapshots.load(unit.connection(),
+                                                 [snapshot]))
+
+    def test_concurrent_store(self):
+        model = _object('env', services=[_object('app', port=80),
+                                         _object('db', port=3306)])
+        snapshot, chunks = snapshots.split(model)
+
+        # the environment is inserted concurrently after the chunks are
+        # fetched, so the insert fails and the chunks are fetched again
+        self._store_interleaved(model, [
+            None, lambda connection: snapshots.store(connection, model)])
+
+        self.assertEqual(dict(zip(chunks.keys(), [1, 1, 2])),
+                         self._get_chunks())
+        self._check_snapshot(snapshot, model)
+
+        unit = db_session.get_session()
+        with unit.begin():
+            snapshots.release(unit.connection(), snapshot)
+            snapshots.release(unit.connection(), snapshot)
+        self.assertEqual({}, self._get_chunks())
+
+    def test_store_with_concurrent_release(self):
+        model = _object('env', services=[_object('app', port=80),
+                                         _object('db', port=3306)])
+        snapshot, chunks = snapshots.split(model)
+
+        # the chunks inserted concurrently are deleted before they are
+        # fetched again, so all of them are inserted on the second attempt
+        self._store_interleaved(model, [
+            None,
+            lambda connection: snapshots.store(connection, model),
+            lambda connection: snapshots.release(connection, snapshot)])
+
+        self.assertEqual(dict(zip(chunks.keys(), [1, 1, 1])),
+                         self._get_chunks())
+        self._check_snapshot(snapshot, model)
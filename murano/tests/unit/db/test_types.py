@@ -0,0 +1,70 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from murano.db import models
+from murano.db import session
+from murano.db.sqla import types as st
+from murano.tests.unit import base
+
+
+class TestJsonBlob(base.MuranoTestCase):
+    def setUp(self):
+        super(TestJsonBlob, self).setUp()
+        self.value = {'services': [{'name': 'app-{0}'.format(i)}
+                                   for i in range(100)]}
+
+    def test_compressed(self):
+        blob = st.CompressedJsonBlob()
+
+        data = blob.process_bind_param(self.value, None)
+
+        self.assertTrue(data.startswith(st.ZLIB_JSON.header))
+        self.assertLess(len(data), len(st.JSON.encode(self.value)) / 4)
+        self.assertEqual(self.value, blob.process_result_value(data, None))
+
+    def test_small_value_is_not_compressed(self):
+        blob = st.CompressedJsonBlob()
+
+        data = blob.process_bind_param({'name': 'app'}, None)
+
+        self.assertEqual('{"name":"app"}', data)
+        self.assertEqual({'name': 'app'},
+                         blob.process_result_value(data, None))
+
+    def test_formats_are_readable_by_any_column(self):
+        compressed = st.ZLIB_JSON.encode(self.value)
+        plain = st.JSON.encode(self.value)
+
+        for blob in (st.JsonBlob(), st.CompressedJsonBlob()):
+            self.assertEqual(self.value,
+                             blob.process_result_value(compressed, None))
+            self.assertEqual(self.value,
+                             blob.process_result_value(plain, None))
+
+
+class TestCompressedColumns(base.MuranoWithDBTestCase):
+    def test_environment_description(self):
+        description = {'Objects': {'services': [{'name': 'app-{0}'.format(i)}
+                                                for i in range(100)]}}
+        environment = models.Environment(id='env', name='env',
+                                         tenant_id='tenant',
+                                         description=description)
+        unit = session.get_session()
+        with unit.begin():
+            unit.add(environment)
+
+        data = unit.connection().execute(
+            'SELECT description FROM environment').scalar()
+        self.assertTrue(data.startswith(st.ZLIB_JSON.header))
+        loaded = session.get_session().query(models.Environment).get('env')
+        self.assertEqual(description, loaded.description)
@@ -47,7 +47,7 @@ class Runner(object):
             if item.startswith('test'):
                 return call
 
-    def __init__(self, model, class_loader):
+    def __init__(self, model, class_loader, inline_calls=True):
         if isinstance(model, types.StringTypes):
             model = object_model.Object(model)
         model = object_model.build_model(model)
@@ -55,7 +55,7 @@ class Runner(object):
             model = {'Objects': model}
 
         self.executor = executor.MuranoDslExecutor(
-            class_loader, environment.Environment())
+            class_loader, environment.Environment(), inline_calls)
         self._root = self.executor.load(model)
 
     def _execute(self, name, object_id, *args, **kwargs):
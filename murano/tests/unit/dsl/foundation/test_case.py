@@ -41,8 +41,8 @@ class DslTestCase(base.MuranoTestCase):
         test_class_loader.TestClassLoader.clear_configs()
         eventlet.debug.hub_exceptions(False)
 
-    def new_runner(self, model):
-        return runner.Runner(model, self.class_loader)
+    def new_runner(self, model, inline_calls=True):
+        return runner.Runner(model, self.class_loader, inline_calls)
 
     @property
     def traces(self):
@@ -83,9 +83,13 @@ class TestClassLoader(class_loader.MuranoClassLoader):
         class_name = ns.resolve_name(data['Name'])
         self._classes[class_name] = data
 
+    def create_base_context(self):
+        context = super(TestClassLoader, self).create_base_context()
+        yaql_functions.register(context)
+        return context
+
     def create_root_context(self):
         context = super(TestClassLoader, self).create_root_context()
-        yaql_functions.register(context)
         for name, func in self._functions.iteritems():
             context.register_function(func, name)
         return context
@@ -290,3 +290,100 @@ class TestContracts(test_case.DslTestCase):
     def test_default(self):
         self.assertEqual('value', self._runner.testDefault('value'))
         self.assertEqual('DEFAULT', self._runner.testDefault())
+
+    def test_not_null_int_contract(self):
+        self.assertEqual(5, self._runner.testNotNullIntContract('5'))
+
+    def test_not_null_int_contract_failure(self):
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNotNullIntContract, None)
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNotNullIntContract, 'nan')
+
+    def test_not_null_class_contract(self):
+        arg = om.Object('SampleClass2', class2Property='qwerty')
+        result = self._runner.testNotNullClassContract(arg)
+        self.assertEqual(arg.id, result.object_id)
+
+    def test_not_null_class_contract_failure(self):
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNotNullClassContract, None)
+
+    def test_class_contract_incompatible_type_failure(self):
+        arg = om.Object('SampleClass1', stringProperty='string1',
+                        classProperty=om.Object('SampleClass2',
+                                                class2Property='string2'))
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testClassContract, arg)
+
+    def test_unknown_class_contract_failure(self):
+        self.assertRaises(
+            exceptions.NoClassFound,
+            self._runner.testUnknownClassContract, None)
+
+    def test_nested_list_contract(self):
+        self.assertEqual(
+            [[1, 2], [3]],
+            self._runner.testNestedListContract([['1', 2], '3']))
+
+    def test_nested_list_contract_failure(self):
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNestedListContract, [[1], []])
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNestedListContract, [[1], ['nan']])
+
+    def test_nested_dict_contract(self):
+        self.assertEqual(
+            {'name': 'web', 'ports': [{'port': 80, 'protocol': 'TCP'},
+                                      {'port': 53, 'protocol': None}]},
+            self._runner.testNestedDictContract({
+                'name': 'web',
+                'ports': [{'port': '80', 'protocol': 'TCP'},
+                          {'port': 53, 'extra': True}]}))
+
+    def test_nested_dict_contract_failure(self):
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNestedDictContract,
+            {'ports': [{'port': 80}]})
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNestedDictContract,
+            {'name': 'web', 'ports': [{'protocol': 'TCP'}]})
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNestedDictContract,
+            {'name': 'web', 'ports': ['80']})
+
+    def test_list_of_class_contract(self):
+        self.assertEqual(
+            ['first', 'second'],
+            self._runner.testListOfClassContract([
+                om.build_model(om.Object('SampleClass2',
+                                         class2Property='first')),
+                {'class2Property': 'second'}]))
+
+    def test_list_of_class_contract_failure(self):
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testListOfClassContract,
+            [om.build_model(om.Object('SampleClass2',
+                                      class2Property='first')), None])
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testListOfClassContract, [42])
+
+    def test_repeated_validation(self):
+        for value in range(3):
+            self.assertEqual(value,
+                             self._runner.testNotNullIntContract(value))
+        self.assertRaises(
+            exceptions.ContractViolationException,
+            self._runner.testNotNullIntContract, None)
+        self.assertEqual(3, self._runner.testNotNullIntContract(3))
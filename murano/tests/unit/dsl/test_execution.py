@@ -12,8 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
+
+import eventlet
+import mock
+
 from murano.dsl import dsl_exception
 from murano.dsl import exceptions
+from murano.dsl import executor
 from murano.tests.unit.dsl.foundation import object_model as om
 from murano.tests.unit.dsl.foundation import test_case
 
@@ -60,3 +66,46 @@ class TestExecution(test_case.DslTestCase):
 
     def test_return(self):
         self.assertEqual(3, self._load().testReturn(3))
+
+    def test_recursion_deeper_than_inline_limit(self):
+        depth = executor.MAX_INLINE_DEPTH + 4
+        self.assertEqual(depth, self._load().testRecursion(depth))
+
+    def _visit_cycle(self, nodes, count, inline_calls=True):
+        # objects call each other around the cycle, so calls past the
+        # inline limit re-enter methods of objects locked by the caller
+        root = om.Object('RecursionNode')
+        last = root
+        for i in range(nodes - 1):
+            last.data['next'] = om.Object('RecursionNode')
+            last = last.data['next']
+        last.data['next'] = om.Ref(root)
+        runner = self.new_runner(root, inline_calls)
+
+        # the first marker is the one that must not be mistaken for none
+        with mock.patch.object(executor, '_thread_markers',
+                               itertools.count()):
+            gt = eventlet.spawn(runner.testVisit, count)
+            with eventlet.Timeout(5):
+                return gt.wait()
+
+    def test_reentrant_calls_past_inline_limit(self):
+        nodes = executor.MAX_INLINE_DEPTH + 4
+        self.assertEqual(nodes + 5, self._visit_cycle(nodes, nodes + 5))
+
+    def test_reentrant_calls_without_inlining(self):
+        self.assertEqual(5, self._visit_cycle(2, 5, inline_calls=False))
+
+    def test_function_tables_are_shared(self):
+        runner1 = self._load()
+        runner2 = self._load()
+        context1 = self.class_loader.create_root_context()
+        context2 = self.class_loader.create_root_context()
+        self.assertIsNot(context1, context2)
+        self.assertIs(context1.parent_context, context2.parent_context)
+
+        cls = runner1.root.type
+        self.assertIs(cls, runner2.root.type)
+        self.assertIs(
+            self.class_loader.create_local_context(context1, cls).functions,
+            self.class_loader.create_local_context(context2, cls).functions)
@@ -13,9 +13,13 @@
 #    under the License.
 
 
+import mock
 from testtools import matchers
 
 from murano.dsl import exceptions
+from murano.dsl import expressions
+from murano.dsl import macros
+from murano.dsl import yaql_expression
 
 from murano.tests.unit.dsl.foundation import object_model as om
 from murano.tests.unit.dsl.foundation import test_case
@@ -111,3 +115,73 @@ class TestMacros(test_case.DslTestCase):
         self.assertEqual(
             87654321,
             self._runner.testScopeWithinMacro())
+
+    def test_compiled_branches_are_reused(self):
+        self.assertIsNone(self._runner.testIfLoop())
+        self.assertIsNone(self._runner.testMatchLoop())
+        self.assertIsNone(self._runner.testSwitchLoop())
+        expected = ['gt', 'le', 'gt', 'one', 'two', 'def', 'one',
+                    'gt', 'def', 'lt']
+        self.assertEqual(expected, self.traces)
+        del self.traces
+
+        # code blocks are compiled with the class, not when executed
+        with mock.patch.object(expressions, 'parse_expression') as parse:
+            self._runner.testIfLoop()
+            self._runner.testMatchLoop()
+            self._runner.testSwitchLoop()
+        self.assertFalse(parse.called)
+        self.assertEqual(expected, self.traces)
+
+    def test_default_branches(self):
+        self.assertEqual('def', self._runner.testMatchDefault(0))
+        self.assertEqual('y', self._runner.testMatchDefault(1))
+        self.assertEqual('def', self._runner.testMatchDefault(0))
+        self.assertIsNone(self._runner.testSwitchDefault(5))
+        self.assertIsNone(self._runner.testSwitchDefault(20))
+        self.assertIsNone(self._runner.testSwitchDefault(5))
+        self.assertEqual(['def', 'gt', 'def'], self.traces)
+
+
+class TestMacroCompilation(test_case.DslTestCase):
+    """Branches are compiled when the macro is built, even if not taken."""
+
+    def setUp(self):
+        super(TestMacroCompilation, self).setUp()
+        self._invalid = {'Break': 'value'}
+        self._condition = yaql_expression.YaqlExpression('$x > 0')
+
+    def test_if_branches(self):
+        self.assertRaises(exceptions.DslSyntaxError, macros.IfMacro,
+                          If=self._condition, Then=[self._invalid])
+        self.assertRaises(exceptions.DslSyntaxError, macros.IfMacro,
+                          If=self._condition, Then=[],
+                          Else=[self._invalid])
+
+    def test_match_branches(self):
+        value = yaql_expression.YaqlExpression('$x')
+        self.assertRaises(exceptions.DslSyntaxError, macros.MatchMacro,
+                          Match={1: [self._invalid]}, Value=value)
+        self.assertRaises(exceptions.DslSyntaxError, macros.MatchMacro,
+                          Match={1: []}, Value=value,
+                          Default=[self._invalid])
+
+    def test_switch_branches(self):
+        self.assertRaises(exceptions.DslSyntaxError, macros.SwitchMacro,
+                          Switch={self._condition: [self._invalid]})
+        self.assertRaises(exceptions.DslSyntaxError, macros.SwitchMacro,
+                          Switch={self._condition: []},
+                          Default=[self._invalid])
+
+    def test_statements_are_compiled_once(self):
+        with mock.patch.object(
+                macros, '_compile_statement',
+                wraps=macros._compile_statement) as compile_statement:
+            macro = macros.MatchMacro(
+                Match={1: [yaql_expression.YaqlExpression('$x')]},
+                Value=yaql_expression.YaqlExpression('$x'),
+                Default=[yaql_expression.YaqlExpression('$x'),
+                         yaql_expression.YaqlExpression('$x')])
+        self.assertEqual(3, compile_statement.call_count)
+        self.assertEqual(1, len(macro._switch[0][1]._statements))
+        self.assertEqual(2, len(macro._default._statements))
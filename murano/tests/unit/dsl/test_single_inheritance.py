@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from murano.dsl import exceptions
+from murano.dsl import typespec
 from murano.tests.unit.dsl.foundation import object_model as om
 from murano.tests.unit.dsl.foundation import test_case
 
@@ -32,3 +34,29 @@ class TestSingleInheritance(test_case.DslTestCase):
              'SingleInheritanceChild::method2',
              'SingleInheritanceParent::method2'],
             self.traces)
+
+    def test_method_added_to_parent_is_visible_in_child(self):
+        child = self.class_loader.get_class('SingleInheritanceChild')
+        parent = self.class_loader.get_class('SingleInheritanceParent')
+        self.assertRaises(exceptions.NoMethodFound,
+                          child.find_single_method, 'method3')
+
+        method = parent.add_method('method3', {'Body': []})
+        self.assertIs(method, child.find_single_method('method3'))
+        self.assertEqual((method,), child.find_all_methods('method3'))
+
+    def test_property_added_to_parent_is_visible_in_child(self):
+        child = self.class_loader.get_class('SingleInheritanceChild')
+        parent = self.class_loader.get_class('SingleInheritanceParent')
+        self.assertEqual((), child.find_property('newProperty'))
+
+        parent.add_property('newProperty', typespec.PropertySpec(
+            {'Contract': '$.string()'}, parent))
+        self.assertEqual((parent,), child.find_property('newProperty'))
+
+    def test_initialize_order_is_stable(self):
+        model = om.Object('InitializeChild',
+                          nested=om.Object('InitializeChild'))
+        self.new_runner(model)
+        self.new_runner(om.Object('InitializeChild'))
+        self.assertEqual(['parent', 'child'] * 3, self.traces)
@@ -0,0 +1,53 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+from murano.dsl import yaql_expression
+from murano.packages import compiled_classes
+import murano.packages.load_utils as load_utils
+import murano.tests.unit.base as test_base
+
+
+class TestCompiledClasses(test_base.MuranoTestCase):
+    def _load_package(self, name):
+        package_dir = os.path.abspath(
+            os.path.join(__file__, '../test_packages', name))
+        return load_utils.load_from_dir(package_dir)
+
+    def test_compiled_classes_are_equivalent(self):
+        package = self._load_package('test.mpl.v1.app')
+        data = compiled_classes.compile_package(package)
+
+        compiled = self._load_package('test.mpl.v1.app')
+        compiled.set_compiled_classes(data)
+
+        for name in package.classes:
+            self.assertEqual(
+                compiled_classes._encode(package.get_class(name)),
+                compiled_classes._encode(compiled.get_class(name)))
+
+    def test_hot_translated_class_is_compiled(self):
+        package = self._load_package('test.hot.v1.app')
+        data = compiled_classes.compile_package(package)
+        definition = compiled_classes.decode_class(
+            compiled_classes.load(data)[package.full_name])
+
+        contract = definition['Properties']['name']['Contract']
+        self.assertIsInstance(contract, yaql_expression.YaqlExpression)
+        self.assertIsNone(contract.source_file_position)
+
+    def test_unsupported_version_is_ignored(self):
+        data = json.dumps({'Version': -1, 'Classes': {}})
+        self.assertIsNone(compiled_classes.load(data))
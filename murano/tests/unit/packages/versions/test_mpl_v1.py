@@ -42,3 +42,15 @@ class TestMplV1(test_base.MuranoTestCase):
         self.assertEqual(package.supplier['Logo'], 'test_supplier_logo.png')
 
         self.assertEqual(imghdr.what('', package.supplier_logo), 'png')
+
+    def test_load_from_archive(self):
+        package_dir = os.path.abspath(
+            os.path.join(__file__, '../../test_packages/test.mpl.v1.app')
+        )
+        blob = load_utils.load_from_dir(package_dir).blob
+        package = load_utils.load_from_archive(blob)
+
+        self.assertEqual(blob, package.blob)
+        self.assertEqual(('test.mpl.v1.app.Thing',), package.classes)
+        self.assertEqual(imghdr.what('', package.logo), 'png')
+        self.assertIsNotNone(package.get_class('test.mpl.v1.app.Thing'))
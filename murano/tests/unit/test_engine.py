@@ -21,6 +21,7 @@ import yaql
 import murano.dsl.helpers as helpers
 import murano.dsl.namespace_resolver as ns_resolver
 import murano.dsl.yaql_expression as yaql_expression
+from murano.engine import package_class_loader
 from murano.tests.unit import base
 
 ROOT_CLASS = 'io.murano.Object'
@@ -158,6 +159,8 @@ class TestYaqlExpression(base.MuranoTestCase):
 
     def setUp(self):
         super(TestYaqlExpression, self).setUp()
+        yaql_expression.parse_cache.clear()
+        self.addCleanup(yaql_expression.parse_cache.clear)
 
     def test_expression(self):
         yaql_expr = yaql_expression.YaqlExpression('string')
@@ -189,3 +192,131 @@ class TestYaqlExpression(base.MuranoTestCase):
         with mock.patch('yaql.parse') as parse_mock:
             parse_mock.side_effect = yaql.exceptions.YaqlLexicalException
             self.assertFalse(expr.match(''))
+
+    def test_parse_cache_shares_parsed_expressions(self):
+        expr1 = yaql_expression.YaqlExpression('$.foo')
+        expr2 = yaql_expression.YaqlExpression('$.foo')
+
+        self.assertIs(expr1._parsed_expression, expr2._parsed_expression)
+        self.assertTrue(yaql_expression.YaqlExpression.match('$.foo'))
+        self.assertEqual(1, yaql_expression.parse_cache.misses)
+        self.assertEqual(2, yaql_expression.parse_cache.hits)
+
+    def test_parse_cache_remembers_invalid_expressions(self):
+        with mock.patch('yaql.parse') as parse_mock:
+            parse_mock.side_effect = \
+                yaql.exceptions.YaqlGrammarException('foo(', 4)
+            self.assertFalse(yaql_expression.YaqlExpression.match('foo('))
+            self.assertFalse(yaql_expression.YaqlExpression.match('foo('))
+
+        self.assertEqual(1, parse_mock.call_count)
+
+    def test_parse_cache_evicts_least_recently_used(self):
+        cache = yaql_expression.ParsedExpressionCache(2)
+        cache.parse('$a')
+        cache.parse('$b')
+        cache.parse('$a')
+        cache.parse('$c')
+
+        self.assertEqual(2, len(cache))
+        cache.parse('$a')
+        self.assertEqual(2, cache.hits)
+        cache.parse('$b')
+        self.assertEqual(4, cache.misses)
+
+
+class TestPackagePrefetch(base.MuranoTestCase):
+    def _create_package(self, name, definition):
+        package = mock.Mock()
+        package.classes = (name,)
+        package.get_class.return_value = definition
+        return package
+
+    def test_prefetch_loads_parent_packages(self):
+        packages = {
+            'com.example.App': self._create_package('com.example.App', {
+                'Namespaces': {'=': 'com.example'},
+                'Extends': 'Base'
+            }),
+            'com.example.Base': self._create_package('com.example.Base', {})
+        }
+        pkg_loader = mock.Mock()
+        pkg_loader.get_package_by_class.side_effect = packages.get
+        class_loader = package_class_loader.PackageClassLoader(pkg_loader)
+        pkg_loader.get_package_by_class.reset_mock()
+
+        class_loader.prefetch(['com.example.App', 'com.example.Missing'], 4)
+
+        self.assertEqual(3, pkg_loader.get_package_by_class.call_count)
+        self.assertEqual(packages['com.example.Base'],
+                         class_loader._get_package_for('com.example.Base'))
+        self.assertEqual(3, pkg_loader.get_package_by_class.call_count)
+
+    def test_prefetch_follows_parents_across_packages(self):
+        definitions = {
+            'a.App': {'Namespaces': {'=': 'a'}, 'Extends': 'Base'},
+            'a.Base': {'Namespaces': {'b': 'b'}, 'Extends': 'b:Parent'},
+            'b.Parent': {}
+        }
+        package_a = mock.Mock()
+        package_a.classes = ('a.App', 'a.Base')
+        package_a.get_class.side_effect = definitions.get
+        package_b = self._create_package('b.Parent', {})
+        packages = {'a.App': package_a, 'a.Base': package_a,
+                    'b.Parent': package_b}
+        pkg_loader = mock.Mock()
+        pkg_loader.get_package_by_class.side_effect = packages.get
+        class_loader = package_class_loader.PackageClassLoader(pkg_loader)
+        pkg_loader.get_package_by_class.reset_mock()
+
+        class_loader.prefetch(['a.App'], 4)
+
+        self.assertEqual(
+            [mock.call('a.App'), mock.call('b.Parent')],
+            pkg_loader.get_package_by_class.call_args_list)
+        self.assertEqual(package_b,
+                         class_loader._get_package_for('b.Parent'))
+        self.assertEqual(2, pkg_loader.get_package_by_class.call_count)
+
+
+class TestSharedClasses(base.MuranoTestCase):
+    def _create_package(self, name, definition):
+        package = mock.Mock()
+        package.classes = (name,)
+        package.get_class.return_value = definition
+        return package
+
+    def setUp(self):
+        super(TestSharedClasses, self).setUp()
+        self.packages = {
+            'io.murano.Object': self._create_package(
+                'io.murano.Object', {'Name': 'io.murano.Object'}),
+            'com.example.Base': self._create_package(
+                'com.example.Base', {'Name': 'com.example.Base'}),
+            'com.example.App': self._create_package(
+                'com.example.App', {'Name': 'com.example.App',
+                                    'Extends': 'com.example.Base'})
+        }
+        self.pkg_loader = mock.Mock()
+        self.pkg_loader.get_package_by_class.side_effect = self.packages.get
+
+    def _create_class_loader(self):
+        return package_class_loader.PackageClassLoader(self.pkg_loader)
+
+    def test_classes_are_shared_between_loaders(self):
+        app = self._create_class_loader().get_class('com.example.App')
+
+        self.assertIs(app,
+                      self._create_class_loader().get_class('com.example.App'))
+
+    def test_class_is_rebuilt_when_parent_package_changes(self):
+        app = self._create_class_loader().get_class('com.example.App')
+        self.packages['com.example.Base'] = self._create_package(
+            'com.example.Base', {'Name': 'com.example.Base'})
+
+        class_loader = self._create_class_loader()
+        new_app = class_loader.get_class('com.example.App')
+
+        self.assertIsNot(app, new_app)
+        self.assertIs(class_loader.get_class('com.example.Base'),
+                      new_app.parents[0])
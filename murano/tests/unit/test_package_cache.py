@@ -0,0 +1,219 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+
+import eventlet
+
+from murano.engine import package_cache
+from murano.tests.unit import base
+from murano.tests.unit import utils
+
+
+class TestPackageCache(base.MuranoTestCase):
+    def setUp(self):
+        super(TestPackageCache, self).setUp()
+        self.archive = utils.package_archive()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.downloads = 0
+
+    def _download(self):
+        self.downloads += 1
+        return self.archive
+
+    def _cache(self, max_size=None, persistent=False):
+        if max_size is None:
+            max_size = len(self.archive) * 10
+        return package_cache.PackageCache(self.directory, max_size,
+                                          persistent)
+
+    def _references(self, cache, package_id, version):
+        return cache._entries[(package_id, version)].references
+
+    def test_acquire_and_release(self):
+        cache = self._cache()
+
+        package = cache.acquire('app', 1, self._download)
+        self.assertEqual('test.mpl.v1.app', package.full_name)
+        self.assertIs(package, cache.acquire('app', 1, self._download))
+        self.assertEqual(1, self.downloads)
+        self.assertEqual(2, self._references(cache, 'app', 1))
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+
+        cache.release('app', 1)
+        cache.release('app', 1)
+        self.assertEqual(0, self._references(cache, 'app', 1))
+        # releasing more than acquired does not make the count negative
+        cache.release('app', 1)
+        self.assertEqual(0, self._references(cache, 'app', 1))
+
+    def test_lru_eviction(self):
+        cache = self._cache(max_size=len(self.archive) * 2.5)
+        for package_id in ('first', 'second'):
+            cache.acquire(package_id, 1, self._download)
+            cache.release(package_id, 1)
+        # use the first package so that the second one is the oldest
+        cache.acquire('first', 1, self._download)
+        cache.release('first', 1)
+        second_dir = cache._entries[('second', 1)].directory
+
+        cache.acquire('third', 1, self._download)
+        cache.release('third', 1)
+
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual([('first', 1), ('third', 1)],
+                         sorted(cache._entries.keys()))
+        self.assertFalse(os.path.exists(second_dir))
+
+    def test_referenced_packages_are_not_evicted(self):
+        cache = self._cache(max_size=len(self.archive) / 2)
+        cache.acquire('first', 1, self._download)
+        cache.acquire('second', 1, self._download)
+
+        self.assertEqual(0, cache.evictions)
+        self.assertEqual(2, len(cache._entries))
+
+        cache.release('first', 1)
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual([('second', 1)], cache._entries.keys())
+
+    def test_stale_version_replacement(self):
+        cache = self._cache()
+        old = cache.acquire('app', 1, self._download)
+        old_dir = cache._entries[('app', 1)].directory
+
+        new = cache.acquire('app', 2, self._download)
+        self.assertIsNot(old, new)
+        self.assertTrue(cache._entries[('app', 1)].stale)
+        # the old version is still in use
+        self.assertTrue(os.path.isdir(old_dir))
+
+        cache.release('app', 1)
+        self.assertNotIn(('app', 1), cache._entries)
+        self.assertFalse(os.path.exists(old_dir))
+        self.assertIn(('app', 2), cache._entries)
+
+    def test_unused_old_version_is_removed(self):
+        cache = self._cache()
+        cache.acquire('app', 1, self._download)
+        cache.release('app', 1)
+        old_dir = cache._entries[('app', 1)].directory
+
+        cache.acquire('app', 2, self._download)
+
+        self.assertEqual([('app', 2)], cache._entries.keys())
+        self.assertFalse(os.path.exists(old_dir))
+
+    def test_concurrent_acquire(self):
+        cache = self._cache()
+
+        def download():
+            # let the other thread reach the cache while downloading
+            eventlet.sleep(0.01)
+            return self._download()
+
+        threads = [eventlet.spawn(cache.acquire, 'app', 1, download)
+                   for _ in range(3)]
+        packages = [thread.wait() for thread in threads]
+
+        self.assertEqual(1, self.downloads)
+        self.assertIs(packages[0], packages[1])
+        self.assertIs(packages[0], packages[2])
+        self.assertEqual(3, self._references(cache, 'app', 1))
+
+    def test_failed_download(self):
+        cache = self._cache()
+
+        def download():
+            raise RuntimeError('download failed')
+
+        self.assertRaises(RuntimeError, cache.acquire, 'app', 1, download)
+        self.assertEqual({}, dict(cache._entries))
+        self.assertEqual([], os.listdir(self.directory))
+
+        cache.acquire('app', 1, self._download)
+        self.assertEqual(1, self.downloads)
+
+    def test_persistent_cache_is_reused(self):
+        cache = self._cache(persistent=True)
+        cache.acquire('app', 1, self._download)
+        cache.release('app', 1)
+
+        restarted = self._cache(persistent=True)
+        package = restarted.acquire('app', 1, self._download)
+
+        self.assertEqual('test.mpl.v1.app', package.full_name)
+        self.assertEqual(1, self.downloads)
+        self.assertEqual(1, restarted.hits)
+
+    def test_shared_directories_are_not_removed(self):
+        other = self._cache(persistent=True)
+        other.acquire('app', 1, self._download)
+        shared_dir = other._entries[('app', 1)].directory
+
+        cache = self._cache(max_size=0, persistent=True)
+        # found on disk, but used by the other cache
+        self.assertEqual(1, cache.evictions)
+        self.assertTrue(os.path.isdir(shared_dir))
+        cache.acquire('app', 1, self._download)
+        self.assertEqual(1, self.downloads)
+
+        other.release('app', 1)
+        other.clear()
+        self.assertTrue(os.path.isdir(shared_dir))
+
+        # the last cache using the directory removes it, whichever has
+        # created it
+        cache.release('app', 1)
+        self.assertEqual(2, cache.evictions)
+        self.assertFalse(os.path.exists(shared_dir))
+
+    def _stop(self, cache):
+        """Release the package directories like an exiting process."""
+        for entry in cache._entries.values():
+            entry.lock._lock_file.close()
+
+    def test_restart_evicts_found_directories(self):
+        cache = self._cache(persistent=True)
+        directories = []
+        for package_id in ('first', 'second', 'app'):
+            cache.acquire(package_id, 1, self._download)
+            cache.release(package_id, 1)
+            directories.append(cache._entries[(package_id, 1)].directory)
+        # the oldest directory is evicted first
+        for age, directory in enumerate(directories):
+            os.utime(directory, (1000 + age, 1000 + age))
+        self._stop(cache)
+
+        restarted = self._cache(max_size=len(self.archive) * 2.5,
+                                persistent=True)
+        self.assertEqual(1, restarted.evictions)
+        self.assertFalse(os.path.exists(directories[0]))
+        self.assertTrue(os.path.isdir(directories[1]))
+
+        # a new version replaces the one found on disk
+        restarted.acquire('app', 2, self._download)
+        restarted.release('app', 2)
+        self.assertFalse(os.path.exists(directories[2]))
+
+        restarted.acquire('third', 1, self._download)
+        restarted.release('third', 1)
+        self.assertFalse(os.path.exists(directories[1]))
+        self.assertEqual(2, restarted.evictions)
+        self.assertEqual([('app', 2), ('third', 1)],
+                         sorted(restarted._entries.keys()))
+        self.assertLessEqual(restarted.size, len(self.archive) * 2.5)
@@ -0,0 +1,173 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+from muranoclient.common import exceptions as muranoclient_exc
+from muranoclient.v1 import client as muranoclient
+
+from murano.engine import package_cache
+from murano.engine import package_loader
+from murano.packages import compiled_classes
+from murano.packages import load_utils
+from murano.tests.unit import base
+from murano.tests.unit import utils
+
+CLASS_NAME = 'test.mpl.v1.app.Thing'
+UPDATED = '2014-12-12T12:00:00'
+
+
+class TestApiPackageLoader(base.MuranoTestCase):
+    def setUp(self):
+        super(TestApiPackageLoader, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.cache = package_cache.PackageCache(directory, 10 * 1024 * 1024)
+        patcher = mock.patch.object(package_cache, 'get_cache',
+                                    return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = muranoclient.Client('http://localhost:8082',
+                                          token='token')
+        for name in ('json_request', 'raw_request'):
+            patcher = mock.patch.object(self.client, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for name in ('filter', 'download'):
+            patcher = mock.patch.object(self.client.packages, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client.packages.download.return_value = utils.package_archive()
+        self.client.raw_request.side_effect = \
+            muranoclient_exc.HTTPNotFound()
+
+        self.client.packages.filter.side_effect = lambda **kwargs: iter([
+            package_loader.PackageDefinition(
+                'package_id', 'test.mpl.v1.app', UPDATED)])
+
+        self.loader = package_loader.ApiPackageLoader(lambda: self.client)
+        self.addCleanup(self.loader.cleanup)
+
+    def _get_compiled_path(self):
+        directory = self.cache._entries[('package_id', UPDATED)].directory
+        return os.path.join(directory, package_cache.COMPILED_CLASSES_NAME)
+
+    def test_compiled_classes_are_downloaded(self):
+        package = load_utils.load_from_dir(
+            os.path.join(utils.TEST_PACKAGES_DIR, 'test.mpl.v1.app'))
+        data = compiled_classes.compile_package(package)
+        self.client.raw_request.side_effect = None
+        self.client.raw_request.return_value = (None, iter([data]))
+
+        package = self.loader.get_package('test.mpl.v1.app')
+
+        self.client.raw_request.assert_called_once_with(
+            'GET', '/v1/catalog/packages/package_id/classes')
+        self.assertEqual([CLASS_NAME], list(package.classes))
+        self.assertIsNotNone(package.get_class(CLASS_NAME))
+        with open(self._get_compiled_path()) as f:
+            self.assertEqual(data, f.read())
+
+    def test_compiled_classes_failures_are_ignored(self):
+        for error in (muranoclient_exc.HTTPNotFound(),
+                      muranoclient_exc.CommunicationError(),
+                      ValueError()):
+            self.client.raw_request.side_effect = error
+
+            package = self.loader.get_package('test.mpl.v1.app')
+
+            self.assertEqual('test.mpl.v1.app', package.full_name)
+            self.assertIsNotNone(package.get_class(CLASS_NAME))
+            self.assertFalse(os.path.exists(self._get_compiled_path()))
+            self.loader.cleanup()
+            self.cache.clear()
+
+    def test_resolved_definitions_are_used(self):
+        self.client.json_request.return_value = (None, {'classes': {
+            CLASS_NAME: {'id': 'resolved_id',
+                         'fully_qualified_name': 'test.mpl.v1.app',
+                         'updated': UPDATED}}})
+
+        self.loader.resolve_classes([CLASS_NAME, 'test.unknown.Thing'])
+        package = self.loader.get_package_by_class(CLASS_NAME)
+
+        self.client.json_request.assert_called_once_with(
+            'POST', '/v1/catalog/packages/resolve',
+            body={'class_names': [CLASS_NAME, 'test.unknown.Thing']})
+        self.assertEqual('test.mpl.v1.app', package.full_name)
+        self.client.packages.download.assert_called_once_with('resolved_id')
+        self.assertFalse(self.client.packages.filter.called)
+        self.assertIn(('resolved_id', UPDATED), self.cache._entries)
+
+        # resolved classes are not requested again
+        self.loader.resolve_classes([CLASS_NAME])
+        self.assertEqual(1, self.client.json_request.call_count)
+
+    def test_failed_resolution_falls_back_to_filter(self):
+        self.client.json_request.side_effect = \
+            muranoclient_exc.HTTPNotFound()
+
+        self.loader.resolve_classes([CLASS_NAME])
+        package = self.loader.get_package_by_class(CLASS_NAME)
+
+        self.assertEqual('test.mpl.v1.app', package.full_name)
+        self.client.packages.filter.assert_called_once_with(
+            class_name=CLASS_NAME, limit=1)
+
+
+class TestCombinedPackageLoader(base.MuranoTestCase):
+    def setUp(self):
+        super(TestCombinedPackageLoader, self).setUp()
+        self.local_loader = package_loader.DirectoryPackageLoader(
+            utils.TEST_PACKAGES_DIR)
+        self.api_loader = mock.Mock(spec=package_loader.ApiPackageLoader)
+        self.loader = package_loader.CombinedPackageLoader(
+            self.api_loader, [self.local_loader])
+
+    def test_local_packages_first(self):
+        package = self.loader.get_package('test.mpl.v1.app')
+        self.assertIs(self.local_loader.get_package('test.mpl.v1.app'),
+                      package)
+
+        package = self.loader.get_package_by_class(CLASS_NAME)
+        self.assertIs(self.local_loader.get_package('test.mpl.v1.app'),
+                      package)
+
+        self.assertFalse(self.api_loader.get_package.called)
+        self.assertFalse(self.api_loader.get_package_by_class.called)
+
+    def test_fallback_to_catalog(self):
+        self.assertIs(self.api_loader.get_package.return_value,
+                      self.loader.get_package('test.other.app'))
+        self.api_loader.get_package.assert_called_once_with('test.other.app')
+
+        self.assertIs(self.api_loader.get_package_by_class.return_value,
+                      self.loader.get_package_by_class('test.other.Thing'))
+        self.api_loader.get_package_by_class.assert_called_once_with(
+            'test.other.Thing')
+
+    def test_resolve_classes_skips_local_classes(self):
+        self.loader.resolve_classes([CLASS_NAME, 'test.other.Thing'])
+
+        self.api_loader.resolve_classes.assert_called_once_with(
+            ['test.other.Thing'])
+
+    def test_cleanup(self):
+        with self.loader as loader:
+            self.assertIs(self.loader, loader)
+            self.assertFalse(self.api_loader.cleanup.called)
+        self.api_loader.cleanup.assert_called_once_with()
@@ -0,0 +1,135 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import imp
+import os
+import sys
+
+import mock
+import testtools
+import yaml
+
+from murano.dsl import yaql_expression
+from murano.engine import yaql_yaml_loader
+from murano.tests.unit import base
+
+CLASS_SOURCE = """\
+Name: Example
+Methods:
+  test:
+    Body:
+      - Return: $.value + 1
+"""
+
+
+def _load_fallback_module():
+    """Load a copy of the loader module as if libyaml was not installed."""
+    path = os.path.splitext(yaql_yaml_loader.__file__)[0] + '.py'
+    name = 'murano_yaql_yaml_loader_fallback'
+    with mock.patch.dict(yaml.__dict__):
+        yaml.__dict__.pop('CParser', None)
+        try:
+            return imp.load_source(name, path)
+        finally:
+            sys.modules.pop(name, None)
+
+
+def _positions(value, path=()):
+    """Return source positions of all mappings and expressions by path."""
+    result = {}
+    position = getattr(value, 'source_file_position', None)
+    if position is not None:
+        result[path] = (position.start_line, position.start_column,
+                        position.start_index, position.end_line,
+                        position.end_column, position.length)
+    if isinstance(value, dict):
+        for k, v in value.iteritems():
+            result.update(_positions(v, path + (k,)))
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            result.update(_positions(v, path + (i,)))
+    return result
+
+
+class TestYaqlYamlLoader(base.MuranoTestCase):
+    def _check_class(self, module):
+        data = yaml.load(CLASS_SOURCE, Loader=module.YaqlYamlLoader)
+
+        self.assertIsInstance(data, module.MuranoPlDict)
+        self.assertEqual('Example', data['Name'])
+        expression = data['Methods']['test']['Body'][0]['Return']
+        self.assertIsInstance(expression, yaql_expression.YaqlExpression)
+        self.assertEqual('$.value + 1', expression.expression)
+
+        position = expression.source_file_position
+        self.assertIsInstance(position, module.NodePosition)
+        self.assertEqual(5, position.start_line)
+        self.assertEqual(17, position.start_column)
+        self.assertEqual(CLASS_SOURCE.index('$.value'), position.start_index)
+        self.assertEqual(5, position.end_line)
+        self.assertEqual(28, position.end_column)
+        self.assertEqual(len('$.value + 1'), position.length)
+
+        position = data.source_file_position
+        self.assertEqual((1, 1, 0), (position.start_line,
+                                     position.start_column,
+                                     position.start_index))
+        self.assertEqual(len(CLASS_SOURCE), position.length)
+        return data
+
+    def test_fallback_loader(self):
+        module = _load_fallback_module()
+
+        self.assertFalse(issubclass(module.YaqlYamlLoader,
+                                    getattr(yaml, 'CParser', ())))
+        self._check_class(module)
+
+    @testtools.skipUnless(hasattr(yaml, 'CParser'),
+                          'libyaml is not available')
+    def test_libyaml_loader(self):
+        self.assertTrue(issubclass(yaql_yaml_loader.YaqlYamlLoader,
+                                   yaml.CParser))
+        data = self._check_class(yaql_yaml_loader)
+
+        fallback = yaml.load(CLASS_SOURCE,
+                             Loader=_load_fallback_module().YaqlYamlLoader)
+        self.assertEqual(_positions(fallback), _positions(data))
+
+    def test_plain_strings_are_not_expressions(self):
+        data = yaml.load('{name: plain string, ref: some.Class}',
+                         Loader=yaql_yaml_loader.YaqlYamlLoader)
+
+        self.assertEqual({'name': 'plain string', 'ref': 'some.Class'}, data)
+        self.assertNotIsInstance(data['name'],
+                                 yaql_expression.YaqlExpression)
+
+    def test_explicit_yaql_tag(self):
+        data = yaml.load('expr: !yaql "$"',
+                         Loader=yaql_yaml_loader.YaqlYamlLoader)
+
+        self.assertIsInstance(data['expr'], yaql_expression.YaqlExpression)
+        self.assertEqual(1, data['expr'].source_file_position.start_line)
+        self.assertEqual(7, data['expr'].source_file_position.start_column)
+
+    def test_node_position(self):
+        position = yaql_yaml_loader.NodePosition(
+            yaml.Mark('Example.yaml', 10, 2, 4, None, None),
+            yaml.Mark('Example.yaml', 25, 3, 6, None, None))
+
+        self.assertEqual('Example.yaml', position.file_path)
+        self.assertEqual(3, position.start_line)
+        self.assertEqual(5, position.start_column)
+        self.assertEqual(10, position.start_index)
+        self.assertEqual(4, position.end_line)
+        self.assertEqual(7, position.end_column)
+        self.assertEqual(15, position.length)
@@ -13,9 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
+import os
+import zipfile
+
 from murano import context
 from murano.db import session
 
+TEST_PACKAGES_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), 'packages', 'test_packages'))
+
 
 def dummy_context(user='test_username', tenant_id='test_tenant_id',
                   password='password', roles=[], user_id=None,
@@ -33,3 +40,15 @@ def save_models(*models):
     s = session.get_session()
     for m in models:
         m.save(s)
+
+
+def package_archive(name='test.mpl.v1.app'):
+    """Return zip archive data of one of the test packages."""
+    package_dir = os.path.join(TEST_PACKAGES_DIR, name)
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as archive:
+        for root, dirs, files in os.walk(package_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                archive.write(path, os.path.relpath(path, package_dir))
+    return data.getvalue()